@@ -1,22 +1,29 @@
 import random
 import json
 
+from registre import registre
+from index_catalogues import indexer
+from elements import element_connu, noms_elements
+from pagination import Pagination, paginer_catalogue
+from persistance import enregistrer_personnage, lire_personnage, nom_fichier_personnage
+import stockage_sqlite
+import moteur
+import instrumentation
+import journal_combats
+from modeles import Personnage
+
 # ===============================================
 # SECTION 1: CONFIGURATION ET CONSTANTES
 # ===============================================
 
-# Dictionnaire des classes disponibles (lettre -> nom complet)
-dicoClasse = {"G": "Guerrier", "P": "Paladin", "B": "Barbare",
-              "D": "Druide", "V": "Voleur", "M": "Mage"}
-
-# Liste des attributs du personnage (code, nom complet)
-ATTRS = [("F", "Force"), ("H", "Habileté"), ("E", "Endurance"),
-         ("I", "Intelligence"), ("S", "Sagesse"), ("C", "Charisme")]
-
-# Règles pour les attributs
-MIN_ATTR = 1    # Minimum pour chaque attribut
-MAX_ATTR = 5    # Maximum pour chaque attribut
-TOTAL_POINTS = 18  # Total de points à répartir
+# Les règles du personnage (classes, attributs, création, statistiques)
+# sont dans regles.py pour pouvoir servir sans lancer le jeu
+from regles import (dicoClasse, ATTRS, MIN_ATTR, MAX_ATTR, TOTAL_POINTS,
+                    generer_attributs, generer_attributs_optimises,
+                    creer_personnage, calculer_stats_personnage,
+                    initialiser_stats_personnage, initialiser_equipement,
+                    objets_portes, details_objet, champ_objet, compter_objets,
+                    migrer_inventaire, initialiser_missions, mission_terminee)
 
 # ===============================================
 # SECTION 2: FONCTIONS DE CRÉATION DU PERSONNAGE
@@ -40,73 +47,6 @@ def choisir_classe():
         else:
             print("Choix invalide ! Réessayez.\n")
 
-def generer_attributs():
-    """Crée des attributs aléatoires qui respectent les règles du jeu"""
-    # Commencer avec 1 point dans chaque attribut (le minimum)
-    attributs = [1, 1, 1, 1, 1, 1]
-
-    # Calculer combien de points il reste à distribuer
-    points_restants = TOTAL_POINTS - 6  # 18 - 6 = 12 points
-
-    # Distribuer les points restants un par un
-    for _ in range(points_restants):
-        # Trouver quels attributs peuvent encore recevoir des points
-        indices_possibles = []
-        for i in range(6):
-            if attributs[i] < MAX_ATTR:  # Si pas encore au maximum
-                indices_possibles.append(i)
-
-        # Ajouter 1 point à un attribut choisi au hasard
-        if indices_possibles:
-            attribut_choisi = random.choice(indices_possibles)
-            attributs[attribut_choisi] += 1
-
-    return attributs
-
-def generer_attributs_optimises(classe):
-    """Crée des attributs optimisés selon la classe choisie"""
-    # Commencer avec 1 point dans chaque attribut (le minimum)
-    attributs = [1, 1, 1, 1, 1, 1]  # F, H, E, I, S, C
-
-    # Définir les attributs principaux selon la classe
-    if classe in ["Guerrier", "Barbare"]:
-        # Force (0) et Endurance (2) au maximum
-        attributs[0] = 5  # Force
-        attributs[2] = 5  # Endurance
-    elif classe == "Paladin":
-        # Charisme (5) et Sagesse (4) au maximum
-        attributs[5] = 5  # Charisme
-        attributs[4] = 5  # Sagesse
-    elif classe == "Voleur":
-        # Habileté (1) et Endurance (2) au maximum
-        attributs[1] = 5  # Habileté
-        attributs[2] = 5  # Endurance
-    elif classe == "Druide":
-        # Sagesse (4) et Intelligence (3) au maximum
-        attributs[4] = 5  # Sagesse
-        attributs[3] = 5  # Intelligence
-    elif classe == "Mage":
-        # Intelligence (3) et Charisme (5) au maximum
-        attributs[3] = 5  # Intelligence
-        attributs[5] = 5  # Charisme
-
-    # Calculer les points restants et les répartir
-    points_utilises = sum(attributs)
-    points_restants = TOTAL_POINTS - points_utilises
-
-    # Distribuer les points restants sur les autres attributs
-    for _ in range(points_restants):
-        indices_possibles = []
-        for i in range(6):
-            if attributs[i] < MAX_ATTR:
-                indices_possibles.append(i)
-
-        if indices_possibles:
-            attribut_choisi = random.choice(indices_possibles)
-            attributs[attribut_choisi] += 1
-
-    return attributs
-
 def choisir_type_attributs():
     """Demande au joueur comment il veut générer ses attributs"""
     print("\n=== GÉNÉRATION DES ATTRIBUTS ===")
@@ -124,76 +64,30 @@ def choisir_type_attributs():
         else:
             print("Choix invalide ! Tapez 1 ou 2.\n")
 
-def creer_personnage(nom, classe, type_attributs):
-    """Crée un personnage complet avec tous ses détails"""
-    # Générer les valeurs d'attributs selon le type choisi
-    if type_attributs == "optimise":
-        valeurs_attributs = generer_attributs_optimises(classe)
-    else:
-        valeurs_attributs = generer_attributs()
-
-    # Créer un dictionnaire pour les attributs (plus facile à lire)
-    mes_attributs = {}
-    for i in range(len(ATTRS)):
-        nom_attribut = ATTRS[i][1]  # Prendre le nom complet
-        valeur = valeurs_attributs[i]
-        mes_attributs[nom_attribut] = valeur
-
-    # Inventaire de départ avec équipement de base
-    inventaire_depart = [
-        {
-            "nom": "Vêtements",
-            "type": "armure",
-            "prix": 0,
-            "stats": {"defense": 1},
-            "description": "Vêtements simples",
-            "slot": "torse",
-            "porte": True
-        },
-        {
-            "nom": "Dague",
-            "type": "arme",
-            "prix": 15,
-            "stats": {"degats": 3, "precision": 85},
-            "description": "Une dague simple mais efficace",
-            "slot": "main_droite",
-            "porte": True
-        }
-    ]
-
-    # Créer le personnage final
-    mon_personnage = {
-        "nom": nom,
-        "classe": classe,
-        "attributs": mes_attributs,
-        "total_points": sum(valeurs_attributs),
-        "type_creation": type_attributs,
-        "experience": 0,
-        "pieces_or": 50,  # Un peu d'argent de départ
-        "inventaire": inventaire_depart,
-        "points_de_vie_actuels": 10 + (mes_attributs.get("Endurance", 1) * 3) # Initialiser les PV actuels
-    }
-
-    return mon_personnage
-
 # ===============================================
 # SECTION 3: FONCTIONS SAUVEGARDE/CHARGEMENT JSON
 # ===============================================
 
+@instrumentation.chronometrer('personnage.sauvegarde')
 def sauvegarder_personnage(personnage):
-    """Sauvegarde un personnage dans un fichier JSON"""
-    nom_fichier = f"personnage_{personnage['nom'].lower().replace(' ', '_')}.json"
+    """Sauvegarde un personnage (changements ajoutés au journal, instantané atomique)"""
+    base = stockage_sqlite.base_configuree()
+    nom_fichier = nom_fichier_personnage(personnage['nom'])
     try:
-        with open(nom_fichier, 'w', encoding='utf-8') as fichier:
-            json.dump(personnage, fichier, indent=2, ensure_ascii=False)
+        if base is not None:
+            stockage_sqlite.sauvegarder_personnage(base, personnage)
+            print(f"Personnage sauvegardé dans la base")
+            return True
+        enregistrer_personnage(personnage, nom_fichier)
         print(f"Personnage sauvegardé dans {nom_fichier}")
         return True
     except Exception as e:
         print(f"Erreur lors de la sauvegarde : {e}")
         return False
 
+@instrumentation.chronometrer('personnage.chargement')
 def charger_personnage(nom_fichier=None):
-    """Charge un personnage depuis un fichier JSON"""
+    """Charge un personnage depuis un fichier JSON (ou par son nom avec la base SQLite)"""
     if nom_fichier is None:
         # Afficher d'abord la liste des personnages disponibles
         fichiers_personnages = lister_personnages_sauvegardes()
@@ -216,9 +110,25 @@ def charger_personnage(nom_fichier=None):
             return None
 
     try:
-        with open(nom_fichier, 'r', encoding='utf-8') as fichier:
-            personnage = json.load(fichier)
+        base = stockage_sqlite.base_configuree()
+        if base is not None:
+            personnage = stockage_sqlite.charger_personnage(base, nom_fichier)
+            if personnage is None:
+                raise FileNotFoundError(nom_fichier)
+        else:
+            # Instantané puis changements du journal
+            personnage = lire_personnage(nom_fichier)
+        # Le personnage de la partie est un modèle compact (modeles.py)
+        personnage = Personnage.depuis_dict(personnage)
         print(f"Personnage {personnage['nom']} chargé avec succès !")
+        # Convertir une ancienne sauvegarde (un objet par entrée) en piles
+        if migrer_inventaire(personnage):
+            print("Inventaire converti au format en piles")
+        # Construire une fois la carte d'équipement et le cache des statistiques
+        # (mis à jour ensuite à chaque changement d'équipement)
+        initialiser_equipement(personnage)
+        initialiser_stats_personnage(personnage)
+        initialiser_missions(personnage)
         # Assurer que points_de_vie_actuels existe, sinon le calculer
         if 'points_de_vie_actuels' not in personnage:
             stats_base = calculer_stats_personnage(personnage)
@@ -232,8 +142,19 @@ def charger_personnage(nom_fichier=None):
         return None
 
 def lister_personnages_sauvegardes():
-    """Liste tous les fichiers de personnages sauvegardés"""
+    """Liste tous les fichiers de personnages sauvegardés (ou les noms dans la base SQLite)"""
     import os
+    base = stockage_sqlite.base_configuree()
+    if base is not None:
+        noms = stockage_sqlite.lister_personnages(base)
+        if noms:
+            print("\nPersonnages sauvegardés :")
+            for i, nom in enumerate(noms, 1):
+                print(f"{i}. {nom}")
+        else:
+            print("Aucun personnage sauvegardé trouvé.")
+        return noms
+
     fichiers_personnages = [f for f in os.listdir('.') if f.startswith('personnage_') and f.endswith('.json')]
     if fichiers_personnages:
         print("\nPersonnages sauvegardés :")
@@ -268,6 +189,9 @@ def afficher_details_personnage(personnage):
         print("❤️  STATUT : VIVANT")
     print(f"Attaque : {stats['attaque']}")
     print(f"Défense : {stats['defense']}")
+    print(f"Initiative : {stats['initiative']}")
+    if stats['precision']:
+        print(f"Précision : {stats['precision']}")
     
     print(f"\n=== ATTRIBUTS ===")
     for nom_attr, valeur in personnage['attributs'].items():
@@ -275,7 +199,7 @@ def afficher_details_personnage(personnage):
     print(f"Total des points : {personnage['total_points']}/18")
     
     # Afficher l'équipement porté
-    equipement_porte = [obj for obj in personnage['inventaire'] if obj.get('porte', False)]
+    equipement_porte = [details_objet(obj) for obj in objets_portes(personnage)]
     
     if equipement_porte:
         print(f"\n=== ÉQUIPEMENT PORTÉ ===")
@@ -295,15 +219,14 @@ def afficher_details_personnage(personnage):
         print(f"\n=== ÉQUIPEMENT PORTÉ ===")
         print("Aucun équipement porté")
     
-    # Afficher le nombre d'objets dans l'inventaire
-    objets_non_equipes = len([obj for obj in personnage['inventaire'] if not obj.get('porte', False)])
+    # Afficher le nombre d'objets dans l'inventaire (en comptant les piles)
+    objets_non_equipes = compter_objets(personnage, portes=False)
     print(f"\n=== INVENTAIRE ===")
     print(f"Objets en inventaire : {objets_non_equipes}")
-    print(f"Total d'objets : {len(personnage['inventaire'])}")
+    print(f"Total d'objets : {compter_objets(personnage)}")
 
-def menu_personnage():
-    """Menu pour gérer les personnages"""
-    global personnage_actuel
+def menu_personnage(personnage_actuel=None):
+    """Menu pour gérer les personnages (retourne le personnage créé ou chargé)"""
     while True:
         print("\n=== GESTION DES PERSONNAGES ===")
         print("1. Créer un nouveau personnage")
@@ -319,7 +242,9 @@ def menu_personnage():
             nom_personnage = input("Quel est le nom de votre personnage ? ")
             classe_choisie = choisir_classe()
             type_attributs = choisir_type_attributs()
-            personnage = creer_personnage(nom_personnage, classe_choisie, type_attributs)
+            # Le personnage de la partie est un modèle compact (modeles.py)
+            personnage = Personnage.depuis_dict(
+                creer_personnage(nom_personnage, classe_choisie, type_attributs))
 
             # Afficher le personnage créé
             print(f"\n=== PERSONNAGE CREE ===")
@@ -363,11 +288,59 @@ def menu_personnage():
 # SECTION 4: FONCTIONS BOUTIQUE ET INVENTAIRE
 # ===============================================
 
+def ouvrir_liste_catalogue(nom_fichier):
+    """Retourne une Pagination sur un catalogue (lu en flux s'il est très gros), ou None"""
+    try:
+        return paginer_catalogue(nom_fichier)
+    except FileNotFoundError:
+        print(f"Erreur : Le fichier {nom_fichier} n'a pas été trouvé")
+    except json.JSONDecodeError:
+        print(f"Erreur : Le fichier {nom_fichier} est mal formaté")
+    return None
+
+def parcourir_pages(titre, pagination, formater, action):
+    """Affiche une liste page par page ; taper un numéro appelle action(entrée)"""
+    page = 1
+    while True:
+        try:
+            entrees = pagination.page(page)
+            page_suivante = pagination.page_suivante_existe(page)
+        except json.JSONDecodeError:
+            print("Erreur : Le fichier est mal formaté")
+            return
+        if not entrees:
+            print("Aucune entrée à afficher")
+            return
+
+        # Le nombre de pages n'est connu qu'une fois toute la source lue
+        total_pages = pagination.total_pages()
+        if total_pages is None:
+            print(f"\n=== {titre} - PAGE {page} ===")
+        else:
+            print(f"\n=== {titre} - PAGE {page}/{total_pages} ===")
+        for i, entree in enumerate(entrees, (page - 1) * pagination.taille_page + 1):
+            print(f"{i}. {formater(entree)}")
+
+        choix = input("Tapez un numéro, 'p' (suivant), 'a' (arrière) ou 'r' (retour) : ").lower()
+
+        if choix == 'r':
+            break
+        elif choix == 'p' and page_suivante:
+            page += 1
+        elif choix == 'a' and page > 1:
+            page -= 1
+        elif choix.isdigit():
+            entree = pagination.entree(int(choix))
+            if entree is not None:
+                action(entree)
+            else:
+                print("Numéro invalide")
+
+@instrumentation.chronometrer('catalogue.charger_boutique')
 def charger_boutique():
-    """Charge la base de données des objets de la boutique"""
+    """Charge la base de données des objets de la boutique (gardée en mémoire par le registre)"""
     try:
-        with open('boutique.json', 'r', encoding='utf-8') as fichier:
-            boutique = json.load(fichier)
+        boutique = registre.obtenir('boutique.json')
         return boutique
     except FileNotFoundError:
         print("Erreur : Le fichier boutique.json n'a pas été trouvé")
@@ -376,6 +349,10 @@ def charger_boutique():
         print("Erreur : Le fichier boutique.json est mal formaté")
         return []
 
+def index_boutique():
+    """Retourne l'index des objets de la boutique (par nom, type et slot)"""
+    return indexer('boutique', charger_boutique())
+
 def afficher_objet(objet):
     """Affiche les détails d'un objet"""
     print(f"\n=== {objet['nom']} ===")
@@ -393,107 +370,25 @@ def afficher_objet(objet):
             else:
                 print(f"  {stat}: {valeur}")
 
-def peut_porter_objet(personnage, objet):
-    """Vérifie si le personnage peut porter cet objet (slot libre ou remplaçable)"""
-    slot = objet['slot']
-
-    # Les objets sans slot (consommables) peuvent toujours être ajoutés
-    if slot == "aucun":
-        return True
-
-    # Vérifier si le slot est déjà occupé
-    for item in personnage['inventaire']:
-        if item.get('porte', False) and item['slot'] == slot:
-            if slot == "deux_mains":
-                # Vérifier aussi main_droite et main_gauche
-                return not any(i.get('porte', False) and i['slot'] in ['main_droite', 'main_gauche']
-                              for i in personnage['inventaire'])
-            return True  # Peut remplacer l'objet existant
-
-    # Si l'objet nécessite deux mains, vérifier que les deux mains sont libres
-    if slot == "deux_mains":
-        mains_occupees = any(i.get('porte', False) and i['slot'] in ['main_droite', 'main_gauche']
-                            for i in personnage['inventaire'])
-        return not mains_occupees
-
-    return True
-
 def equiper_objet(personnage, nom_objet):
     """Équipe un objet de l'inventaire"""
-    for objet in personnage['inventaire']:
-        if objet['nom'] == nom_objet and not objet.get('porte', False):
-            slot = objet['slot']
-
-            if slot == "aucun":
-                print("Cet objet ne peut pas être équipé")
-                return False
-
-            # Déséquiper les objets du même slot
-            for item in personnage['inventaire']:
-                if item.get('porte', False) and item['slot'] == slot:
-                    item['porte'] = False
-                    print(f"{item['nom']} déséquipé")
-
-                # Cas spécial pour les armes à deux mains
-                if slot == "deux_mains" and item.get('porte', False) and item['slot'] in ['main_droite', 'main_gauche']:
-                    item['porte'] = False
-                    print(f"{item['nom']} déséquipé")
-
-            objet['porte'] = True
-            print(f"{nom_objet} équipé avec succès !")
-            return True
-
-    print("Objet non trouvé dans l'inventaire")
-    return False
+    reussi, _evenements = moteur.equiper(personnage, nom_objet, emettre=afficher_evenement)
+    return reussi
 
 def desequiper_objet(personnage, nom_objet):
     """Déséquipe un objet"""
-    for objet in personnage['inventaire']:
-        if objet['nom'] == nom_objet and objet.get('porte', False):
-            objet['porte'] = False
-            print(f"{nom_objet} déséquipé avec succès !")
-            return True
-
-    print("Objet non trouvé ou non équipé")
-    return False
+    reussi, _evenements = moteur.desequiper(personnage, nom_objet, emettre=afficher_evenement)
+    return reussi
 
 def acheter_objet(personnage, objet):
     """Achète un objet de la boutique"""
-    if personnage['pieces_or'] >= objet['prix']:
-        personnage['pieces_or'] -= objet['prix']
-
-        # Créer une copie de l'objet pour l'inventaire
-        nouvel_objet = objet.copy()
-        nouvel_objet['porte'] = False
-
-        personnage['inventaire'].append(nouvel_objet)
-        print(f"{objet['nom']} acheté pour {objet['prix']} pièces d'or !")
-        return True
-    else:
-        print(f"Pas assez d'argent ! Il vous faut {objet['prix']} pièces d'or (vous avez {personnage['pieces_or']})")
-        return False
+    reussi, _evenements = moteur.acheter(personnage, objet, emettre=afficher_evenement)
+    return reussi
 
 def vendre_objet(personnage, nom_objet):
     """Vend un objet de l'inventaire à 50% de sa valeur"""
-    for i, objet in enumerate(personnage['inventaire']):
-        if objet['nom'] == nom_objet:
-            # Vérifier que l'objet peut être vendu
-            if objet['prix'] == 0:
-                print("Cet objet ne peut pas être vendu")
-                return False
-
-            # Déséquiper l'objet s'il est porté
-            if objet.get('porte', False):
-                objet['porte'] = False
-
-            prix_vente = objet['prix'] // 2
-            personnage['pieces_or'] += prix_vente
-            personnage['inventaire'].pop(i)
-            print(f"{nom_objet} vendu pour {prix_vente} pièces d'or !")
-            return True
-
-    print("Objet non trouvé dans l'inventaire")
-    return False
+    reussi, _evenements = moteur.vendre(personnage, nom_objet, emettre=afficher_evenement)
+    return reussi
 
 def afficher_inventaire(personnage):
     """Affiche l'inventaire du personnage"""
@@ -504,8 +399,8 @@ def afficher_inventaire(personnage):
         print("Inventaire vide")
         return
 
-    equipés = [obj for obj in personnage['inventaire'] if obj.get('porte', False)]
-    non_equipés = [obj for obj in personnage['inventaire'] if not obj.get('porte', False)]
+    equipés = [details_objet(obj) for obj in objets_portes(personnage)]
+    non_equipés = [details_objet(obj) for obj in personnage['inventaire'] if not obj.get('porte', False)]
 
     if equipés:
         print("\n--- OBJETS ÉQUIPÉS ---")
@@ -525,7 +420,8 @@ def afficher_inventaire(personnage):
     if non_equipés:
         print("\n--- OBJETS NON ÉQUIPÉS ---")
         for i, objet in enumerate(non_equipés, 1):
-            print(f"  {i}. {objet['nom']} - {objet['prix']} po ({objet['type']})")
+            quantite = f" x{objet['quantite']}" if objet['quantite'] > 1 else ""
+            print(f"  {i}. {objet['nom']}{quantite} - {objet['prix']} po ({objet['type']})")
 
 def menu_boutique(personnage):
     """Menu de la boutique"""
@@ -552,43 +448,33 @@ def menu_boutique(personnage):
         choix = input("Votre choix (1-4) : ")
 
         if choix == "1":
-            boutique = charger_boutique()
+            boutique = ouvrir_liste_catalogue('boutique.json')
             if boutique:
-                print(f"\n=== OBJETS DISPONIBLES ({len(boutique)}) ===")
-                for i, objet in enumerate(boutique, 1):
-                    print(f"{i}. {objet['nom']} - {objet['prix']} po")
-
-                try:
-                    num = int(input("\nTapez le numéro d'un objet pour voir ses détails (0 pour annuler) : "))
-                    if 1 <= num <= len(boutique):
-                        afficher_objet(boutique[num-1])
-                except ValueError:
-                    print("Numéro invalide")
+                # Taper un numéro affiche les détails de l'objet
+                parcourir_pages("OBJETS DISPONIBLES", boutique,
+                                lambda objet: f"{objet['nom']} - {objet['prix']} po",
+                                afficher_objet)
 
         elif choix == "2":
-            boutique = charger_boutique()
+            boutique = ouvrir_liste_catalogue('boutique.json')
             if boutique:
-                print(f"\n=== ACHETER UN OBJET ===")
-                for i, objet in enumerate(boutique, 1):
-                    print(f"{i}. {objet['nom']} - {objet['prix']} po")
-
-                try:
-                    num = int(input("\nNuméro de l'objet à acheter (0 pour annuler) : "))
-                    if 1 <= num <= len(boutique):
-                        acheter_objet(personnage, boutique[num-1])
-                except ValueError:
-                    print("Numéro invalide")
+                # Taper un numéro achète l'objet
+                parcourir_pages("ACHETER UN OBJET", boutique,
+                                lambda objet: f"{objet['nom']} - {objet['prix']} po",
+                                lambda objet: acheter_objet(personnage, objet))
 
         elif choix == "3":
             if personnage['inventaire']:
                 print(f"\n=== VENDRE UN OBJET ===")
-                objets_vendables = [obj for obj in personnage['inventaire'] if obj['prix'] > 0]
+                objets_vendables = [details_objet(obj) for obj in personnage['inventaire']
+                                    if champ_objet(obj, 'prix') > 0]
 
                 if objets_vendables:
                     for i, objet in enumerate(objets_vendables, 1):
                         prix_vente = objet['prix'] // 2
                         equipe = " (équipé)" if objet.get('porte', False) else ""
-                        print(f"{i}. {objet['nom']} - {prix_vente} po{equipe}")
+                        quantite = f" x{objet['quantite']}" if objet['quantite'] > 1 else ""
+                        print(f"{i}. {objet['nom']}{quantite} - {prix_vente} po{equipe}")
 
                     try:
                         num = int(input("\nNuméro de l'objet à vendre (0 pour annuler) : "))
@@ -630,7 +516,8 @@ def menu_inventaire(personnage):
         choix = input("Votre choix (1-3) : ")
 
         if choix == "1":
-            objets_non_equipes = [obj for obj in personnage['inventaire'] if not obj.get('porte', False) and obj['slot'] != "aucun"]
+            objets_non_equipes = [details_objet(obj) for obj in personnage['inventaire']
+                                  if not obj.get('porte', False) and champ_objet(obj, 'slot') != "aucun"]
             if objets_non_equipes:
                 print("\nObjets à équiper :")
                 for i, objet in enumerate(objets_non_equipes, 1):
@@ -646,7 +533,7 @@ def menu_inventaire(personnage):
                 print("Aucun objet à équiper")
 
         elif choix == "2":
-            objets_equipes = [obj for obj in personnage['inventaire'] if obj.get('porte', False)]
+            objets_equipes = [details_objet(obj) for obj in objets_portes(personnage)]
             if objets_equipes:
                 print("\nObjets équipés :")
                 for i, objet in enumerate(objets_equipes, 1):
@@ -671,12 +558,15 @@ def menu_inventaire(personnage):
 # SECTION 5: FONCTIONS MONSTRES
 # ===============================================
 
+@instrumentation.chronometrer('catalogue.charger_monstres')
 def charger_monstres():
-    """Charge la base de données des monstres depuis le fichier JSON"""
+    """Charge la base de données des monstres (gardée en mémoire par le registre)"""
     try:
-        with open('monstres.json', 'r', encoding='utf-8') as fichier:
-            monstres = json.load(fichier)
-        print(f"Base de données chargée : {len(monstres)} monstres trouvés")
+        version = registre.version('monstres.json')
+        monstres = registre.obtenir('monstres.json')
+        # Chaque recherche passe par ici : n'annoncer que les vraies relectures
+        if registre.version('monstres.json') != version:
+            print(f"Base de données chargée : {len(monstres)} monstres trouvés")
         return monstres
     except FileNotFoundError:
         print("Erreur : Le fichier monstres.json n'a pas été trouvé")
@@ -685,6 +575,10 @@ def charger_monstres():
         print("Erreur : Le fichier JSON est mal formaté")
         return []
 
+def index_monstres():
+    """Retourne l'index des monstres (par nom et par élément)"""
+    return indexer('monstres', charger_monstres())
+
 def afficher_monstre(monstre):
     """Affiche les détails d'un monstre"""
     print(f"\n=== {monstre['nom']} ===")
@@ -705,31 +599,25 @@ def afficher_monstre(monstre):
         print("Capturable : Non")
 
 def lister_monstres():
-    """Affiche la liste de tous les monstres"""
-    monstres = charger_monstres()
+    """Affiche la liste de tous les monstres, page par page (un numéro montre les détails)"""
+    monstres = ouvrir_liste_catalogue('monstres.json')
     if not monstres:
         return
 
-    print("\n=== LISTE DES MONSTRES ===")
-    for i, monstre in enumerate(monstres, 1):
-        print(f"{i}. {monstre['nom']} (PV: {monstre['pvies']}, Element: {monstre['element']})")
+    parcourir_pages("LISTE DES MONSTRES", monstres,
+                    lambda monstre: f"{monstre['nom']} (PV: {monstre['pvies']}, Element: {monstre['element']})",
+                    afficher_monstre)
 
 def chercher_monstre_par_nom(nom):
     """Cherche un monstre par son nom"""
-    monstres = charger_monstres()
-    for monstre in monstres:
-        if monstre['nom'].lower() == nom.lower():
-            return monstre
-    return None
+    return index_monstres().chercher(nom)
 
 def filtrer_monstres_par_element(element):
-    """Filtre les monstres par élément"""
-    monstres = charger_monstres()
-    monstres_filtres = []
-    for monstre in monstres:
-        if monstre['element'].lower() == element.lower():
-            monstres_filtres.append(monstre)
-    return monstres_filtres
+    """Filtre les monstres par élément (None si l'élément n'existe pas dans elements.json)"""
+    if not element_connu(element):
+        print(f"Element inconnu : '{element}' (elements valides : {', '.join(noms_elements())})")
+        return None
+    return index_monstres().filtrer('element', element)
 
 def menu_monstres():
     """Menu pour explorer la base de données des monstres"""
@@ -744,14 +632,6 @@ def menu_monstres():
 
         if choix == "1":
             lister_monstres()
-            monstres = charger_monstres()
-            if monstres:
-                try:
-                    num = int(input("\nTapez le numéro d'un monstre pour voir ses détails (0 pour annuler) : "))
-                    if 1 <= num <= len(monstres):
-                        afficher_monstre(monstres[num-1])
-                except ValueError:
-                    print("Numéro invalide")
 
         elif choix == "2":
             nom = input("Nom du monstre à chercher : ")
@@ -762,8 +642,10 @@ def menu_monstres():
                 print(f"Aucun monstre trouvé avec le nom '{nom}'")
 
         elif choix == "3":
-            element = input("Element à filtrer (Feu, Nature, Eau, Electricite, Lumiere, Obscurite, Bien, Mal, Terre) : ")
+            element = input(f"Element à filtrer ({', '.join(noms_elements())}) : ")
             monstres_filtres = filtrer_monstres_par_element(element)
+            if monstres_filtres is None:
+                continue
             if monstres_filtres:
                 print(f"\nMonstres de l'element {element} :")
                 for monstre in monstres_filtres:
@@ -781,11 +663,11 @@ def menu_monstres():
 # SECTION 6: FONCTIONS MISSIONS
 # ===============================================
 
+@instrumentation.chronometrer('catalogue.charger_missions')
 def charger_missions():
-    """Charge la base de données des missions depuis le fichier JSON"""
+    """Charge la base de données des missions (gardée en mémoire par le registre)"""
     try:
-        with open('missions.json', 'r', encoding='utf-8') as fichier:
-            missions = json.load(fichier)
+        missions = registre.obtenir('missions.json')
         return missions
     except FileNotFoundError:
         print("Erreur : Le fichier missions.json n'a pas été trouvé")
@@ -794,24 +676,29 @@ def charger_missions():
         print("Erreur : Le fichier missions.json est mal formaté")
         return []
 
+def index_missions():
+    """Retourne l'index des missions (par nom, classe et niveau d'XP)"""
+    return indexer('missions', charger_missions())
+
 def missions_disponibles(personnage):
     """Retourne les missions disponibles pour un personnage"""
-    missions = charger_missions()
+    # Classe et niveau : l'index ne rend que les missions accessibles
+    accessibles = index_missions().accessibles(personnage['classe'], personnage['experience'])
     missions_dispo = []
 
-    for mission in missions:
-        # Vérifier si le personnage peut faire cette mission
-        classe_ok = (mission['classe'] == 'tous' or mission['classe'] == personnage['classe'])
-        niveau_ok = personnage['experience'] >= mission['niveauxp']
-        pas_faite = not mission['faite'] or mission['repetable']
-
-        if classe_ok and niveau_ok and pas_faite:
+    for mission in accessibles:
+        # Écarter les missions déjà réussies par CE personnage
+        if mission['repetable'] or not mission_terminee(personnage, mission):
             missions_dispo.append(mission)
 
     return missions_dispo
 
-def afficher_mission(mission):
-    """Affiche les détails d'une mission"""
+def prochaine_mission_debloquee(personnage):
+    """Retourne l'XP à laquelle une nouvelle mission se débloque, ou None"""
+    return index_missions().prochain_seuil(personnage['classe'], personnage['experience'])
+
+def afficher_mission(mission, personnage=None):
+    """Affiche les détails d'une mission (et son statut pour le personnage donné)"""
     print(f"\n=== {mission['nom']} ===")
     print(f"Description : {mission['description']}")
     print(f"Classe requise : {mission['classe']}")
@@ -824,219 +711,64 @@ def afficher_mission(mission):
         print("Mission répétable : Oui")
     else:
         print("Mission répétable : Non")
-    if mission['faite']:
-        print("Statut : Terminée")
-    else:
-        print("Statut : Disponible")
-
-def afficher_missions_par_page(missions, page=1, missions_par_page=10):
-    """Affiche les missions avec pagination"""
-    total_pages = (len(missions) + missions_par_page - 1) // missions_par_page
-    debut = (page - 1) * missions_par_page
-    fin = min(debut + missions_par_page, len(missions))
+    if personnage is not None:
+        if mission_terminee(personnage, mission):
+            print("Statut : Terminée")
+        else:
+            print("Statut : Disponible")
 
-    missions_page = missions[debut:fin]
+def afficher_missions_par_page(missions, page=1):
+    """Affiche une page de missions (missions est une Pagination)"""
+    missions_page = missions.page(page)
+    total_pages = missions.total_pages()
+    debut = (page - 1) * missions.taille_page
 
-    print(f"\n=== PAGE {page}/{total_pages} ({len(missions)} missions au total) ===")
+    if total_pages is None:
+        print(f"\n=== PAGE {page} ===")
+    else:
+        print(f"\n=== PAGE {page}/{total_pages} ({missions.total()} missions au total) ===")
     for i, mission in enumerate(missions_page, debut + 1):
         print(f"{i}. {mission['nom']} (XP: +{mission['xpwin']}, Or: +{mission['orwin']})")
 
     return missions_page, total_pages
 
+def ligne_mission(personnage, mission):
+    """Retourne la ligne d'une mission dans la liste complète (statut, classe, niveau)"""
+    statut = "✓" if mission_terminee(personnage, mission) else "○"
+    classe_ok = "✓" if (mission['classe'] == 'tous' or mission['classe'] == personnage['classe']) else "✗"
+    niveau_ok = "✓" if personnage['experience'] >= mission['niveauxp'] else "✗"
+    return f"{statut} {mission['nom']} [Classe:{classe_ok} Niveau:{niveau_ok}]"
+
 def repos(personnage):
     """Permet au personnage de se reposer pour récupérer ses PV"""
-    # Vérifier si le personnage est mort
-    if personnage['points_de_vie_actuels'] <= 0:
-        print("💀 Un personnage mort ne peut pas se reposer ! Il est définitivement mort.")
-        return
-
-    stats_base = calculer_stats_personnage(personnage)
-    pv_max = stats_base['pv']
-    pv_recupere = pv_max - personnage['points_de_vie_actuels']
-
-    if pv_recupere <= 0:
-        print("Vous êtes déjà au maximum de vos points de vie.")
+    reussi, _evenements = moteur.se_reposer(personnage, emettre=afficher_evenement)
+    if not reussi:
         return
 
-    personnage['points_de_vie_actuels'] = pv_max
-    print(f"Vous vous reposez et récupérez {pv_recupere} points de vie.")
-    print(f"Vos points de vie actuels sont maintenant : {personnage['points_de_vie_actuels']}/{pv_max}")
-    
     # Sauvegarder après le repos
     sauvegarder_personnage(personnage)
     print("✅ Progression sauvegardée")
 
-def commencer_combat(personnage, mission):
-    """Lance le combat pour une mission donnée"""
-    print(f"\n=== DÉBUT DU COMBAT - {mission['nom']} ===")
-    print(f"Vous devez affronter {mission['monstrenombre']} {mission['monstremission']}")
-
-    # Charger les données du monstre
-    monstres = charger_monstres()
-    monstre_template = None
-    for m in monstres:
-        if m['nom'] == mission['monstremission']:
-            monstre_template = m
-            break
-
-    if not monstre_template:
-        print("Erreur: Monstre non trouvé dans la base de données!")
-        return False
-
-    # Calculer les stats du personnage
-    stats_personnage = calculer_stats_personnage(personnage)
-
-    print(f"\n=== VOS STATISTIQUES ===")
-    # Utiliser les points de vie actuels du personnage
-    print(f"Points de vie: {personnage['points_de_vie_actuels']}/{stats_personnage['pv']}")
-    print(f"Attaque: {stats_personnage['attaque']}")
-    print(f"Défense: {stats_personnage['defense']}")
-
-    # Créer plusieurs instances des monstres
-    monstres_combat = []
-    for i in range(mission['monstrenombre']):
-        monstre_copie = monstre_template.copy()
-        monstre_copie['nom'] = f"{monstre_template['nom']}{i+1}"
-        monstre_copie['vivant'] = True
-        # Utiliser les PV du monstre du template
-        monstre_copie['pvies'] = monstre_template['pvies']
-        monstres_combat.append(monstre_copie)
-
-    print(f"\n=== MONSTRES À AFFRONTER ===")
-    for i, monstre in enumerate(monstres_combat):
-        print(f"{i+1}. {monstre['nom']} (PV: {monstre['pvies']})")
-
-    # Combat tour par tour
-    pv_personnage = personnage['points_de_vie_actuels'] # Initialiser avec les PV actuels
-    monstres_vivants = len(monstres_combat)
-    tour = 1
-
-    while pv_personnage > 0 and monstres_vivants > 0:
-        print(f"\n=== TOUR {tour} ===")
-        print(f"Vos PV: {pv_personnage}")
-
-        # Afficher les monstres vivants
-        print("Monstres encore en vie:")
-        monstres_actifs = []
-        for i, monstre in enumerate(monstres_combat):
-            if monstre['vivant']:
-                monstres_actifs.append((i, monstre))
-                print(f"  {len(monstres_actifs)}. {monstre['nom']} (PV: {monstre['pvies']})")
-
-        # Le joueur choisit sa cible
-        if len(monstres_actifs) > 1:
-            try:
-                choix = int(input(f"Choisissez votre cible (1-{len(monstres_actifs)}) : "))
-                if 1 <= choix <= len(monstres_actifs):
-                    cible_index, cible = monstres_actifs[choix-1]
-                else:
-                    print("Choix invalide, attaque le premier monstre disponible")
-                    cible_index, cible = monstres_actifs[0]
-            except ValueError:
-                print("Choix invalide, attaque le premier monstre disponible")
-                cible_index, cible = monstres_actifs[0]
-        else:
-            cible_index, cible = monstres_actifs[0]
-
-        # Attaque du personnage
-        degats_perso = max(1, stats_personnage['attaque'] - random.randint(0, 2))
-        cible['pvies'] -= degats_perso
-        print(f"\nVous attaquez {cible['nom']} et infligez {degats_perso} dégâts !")
-
-        if cible['pvies'] <= 0:
-            print(f"💀 {cible['nom']} est vaincu !")
-            cible['vivant'] = False
-            monstres_vivants -= 1
-
-            if monstres_vivants == 0:
-                break
-        else:
-            print(f"{cible['nom']} a encore {cible['pvies']} PV")
-
-        # Attaque des monstres survivants
-        for monstre in monstres_combat:
-            if monstre['vivant']:
-                degats_monstre = max(1, random.randint(2, 6) - (stats_personnage['defense'] // 2))
-                pv_personnage -= degats_monstre
-                print(f"{monstre['nom']} vous attaque et inflige {degats_monstre} dégâts !")
-
-                if pv_personnage <= 0:
-                    break
-
-        if pv_personnage <= 0:
-            break
-
-        tour += 1
-
-        # Éviter les combats infiniment longs
-        if tour > 30:
-            print("Le combat s'éternise... Les monstres fuient!")
-            monstres_vivants = 0
-            break
-
-    # Résultats
-    if monstres_vivants == 0 and pv_personnage > 0:
-        print(f"\n🎉 MISSION RÉUSSIE ! 🎉")
-        print(f"Vous avez vaincu tous les {mission['monstremission']} !")
-
-        # Distribuer les récompenses
-        personnage['experience'] += mission['xpwin']
-        personnage['pieces_or'] += mission['orwin']
-
-        print(f"Récompenses obtenues:")
-        print(f"  +{mission['xpwin']} XP (Total: {personnage['experience']})")
-        print(f"  +{mission['orwin']} pièces d'or (Total: {personnage['pieces_or']})")
-
-        # Mettre à jour les PV actuels du personnage
-        personnage['points_de_vie_actuels'] = pv_personnage
-
-        # Marquer la mission comme faite si elle n'est pas répétable
-        if not mission['repetable']:
-            mission['faite'] = True
-            # Sauvegarder les changements dans le fichier missions.json
-            missions = charger_missions()
-            for m in missions:
-                if m['nom'] == mission['nom']:
-                    m['faite'] = True
-                    break
-            try:
-                with open('missions.json', 'w', encoding='utf-8') as fichier:
-                    json.dump(missions, fichier, indent=2, ensure_ascii=False)
-            except Exception as e:
-                print(f"Erreur lors de la sauvegarde des missions: {e}")
+def choisir_cible_console(monstres_actifs):
+    """Demande au joueur quel monstre attaquer (indice, ou None si le choix est invalide)"""
+    try:
+        choix = int(input(f"Choisissez votre cible (1-{len(monstres_actifs)}) : "))
+    except ValueError:
+        return None
+    if 1 <= choix <= len(monstres_actifs):
+        return choix - 1
+    return None
 
-        return True
+def commencer_combat(personnage, mission):
+    """Lance le combat pour une mission donnée (noté au journal des combats s'il est activé)"""
+    if journal_combats.FICHIER is not None:
+        combattre = journal_combats.combattre_journalise
     else:
-        print(f"\n💀 MISSION ÉCHOUÉE 💀")
-        monstres_vaincus = mission['monstrenombre'] - monstres_vivants
-        print(f"Vous avez vaincu {monstres_vaincus}/{mission['monstrenombre']} monstres avant d'être défait")
-        # Mettre à jour les PV actuels du personnage même en cas d'échec
-        personnage['points_de_vie_actuels'] = pv_personnage
-        return False
-
-def calculer_stats_personnage(personnage):
-    """Calcule les statistiques de combat du personnage"""
-    # Stats de base
-    force = personnage['attributs']['Force']
-    endurance = personnage['attributs']['Endurance']
-    habilete = personnage['attributs']['Habileté']
-
-    stats = {
-        'pv': 10 + (endurance * 3),
-        'attaque': 5 + force,
-        'defense': 2 + (endurance // 2)
-    }
-
-    # Bonus d'équipement
-    for objet in personnage['inventaire']:
-        if objet.get('porte', False) and 'stats' in objet:
-            for stat, valeur in objet['stats'].items():
-                if stat == 'degats':
-                    stats['attaque'] += valeur
-                elif stat == 'defense':
-                    stats['defense'] += valeur
-
-    return stats
+        combattre = moteur.combattre
+    victoire, _evenements = combattre(personnage, mission,
+                                      choisir_cible=choisir_cible_console,
+                                      emettre=afficher_evenement)
+    return victoire
 
 def simuler_combat_simple(personnage_stats, monstre):
     """Simule un combat simple entre le personnage et un monstre"""
@@ -1088,6 +820,9 @@ def menu_missions(personnage):
     while True:
         print(f"\n=== MISSIONS POUR {personnage['nom']} ===")
         print(f"Classe: {personnage['classe']} | Expérience: {personnage['experience']} XP")
+        seuil = prochaine_mission_debloquee(personnage)
+        if seuil is not None:
+            print(f"Prochaine mission débloquée à {seuil} XP")
         print("1. Voir missions disponibles")
         print("2. Voir toutes les missions")
         print("3. Repos (Récupérer PV)")
@@ -1096,8 +831,8 @@ def menu_missions(personnage):
         choix = input("Votre choix (1-4) : ")
 
         if choix == "1":
-            missions_dispo = missions_disponibles(personnage)
-            if missions_dispo:
+            missions_dispo = Pagination(missions_disponibles(personnage))
+            if missions_dispo.entree(1) is not None:
                 page = 1
                 while True:
                     missions_page, total_pages = afficher_missions_par_page(missions_dispo, page)
@@ -1110,17 +845,17 @@ def menu_missions(personnage):
 
                     if choix_mission == 'r':
                         break
-                    elif choix_mission == 'p' and page < total_pages:
+                    elif choix_mission == 'p' and missions_dispo.page_suivante_existe(page):
                         page += 1
                     elif choix_mission == 'a' and page > 1:
                         page -= 1
                     elif choix_mission == 'c':
                         try:
                             num = int(input("Numéro de la mission à combattre : "))
-                            if 1 <= num <= len(missions_dispo):
-                                mission_choisie = missions_dispo[num-1]
+                            mission_choisie = missions_dispo.entree(num)
+                            if mission_choisie is not None:
                                 print(f"\n=== {mission_choisie['nom']} ===")
-                                afficher_mission(mission_choisie)
+                                afficher_mission(mission_choisie, personnage)
 
                                 confirmer = input("\nCommencer le combat ? (o/n) : ")
                                 if confirmer.lower() in ['o', 'oui', 'y', 'yes']:
@@ -1146,47 +881,27 @@ def menu_missions(personnage):
                         except ValueError:
                             print("Numéro invalide")
                     elif choix_mission.isdigit():
-                        num = int(choix_mission)
-                        if 1 <= num <= len(missions_dispo):
-                            afficher_mission(missions_dispo[num-1])
+                        mission = missions_dispo.entree(int(choix_mission))
+                        if mission is not None:
+                            afficher_mission(mission, personnage)
                         else:
                             print("Numéro invalide")
                     else:
                         print("Choix invalide")
             else:
                 print("\nAucune mission disponible pour votre personnage.")
-                print("Vous devez peut-être gagner plus d'expérience ou changer de classe.")
+                seuil = prochaine_mission_debloquee(personnage)
+                if seuil is not None:
+                    print(f"Une nouvelle mission se débloque à {seuil} XP.")
+                else:
+                    print("Vous devez peut-être gagner plus d'expérience ou changer de classe.")
 
         elif choix == "2":
-            missions = charger_missions()
+            missions = ouvrir_liste_catalogue('missions.json')
             if missions:
-                page = 1
-                while True:
-                    print(f"\n=== TOUTES LES MISSIONS - PAGE {page} ===")
-                    debut = (page - 1) * 10
-                    fin = min(debut + 10, len(missions))
-                    total_pages = (len(missions) + 9) // 10
-
-                    for i in range(debut, fin):
-                        mission = missions[i]
-                        statut = "✓" if mission['faite'] else "○"
-                        classe_ok = "✓" if (mission['classe'] == 'tous' or mission['classe'] == personnage['classe']) else "✗"
-                        niveau_ok = "✓" if personnage['experience'] >= mission['niveauxp'] else "✗"
-                        print(f"{i+1}. {statut} {mission['nom']} [Classe:{classe_ok} Niveau:{niveau_ok}]")
-
-                    print(f"\nPage {page}/{total_pages}")
-                    choix_page = input("Tapez un numéro, 'p' (suivant), 'a' (arrière) ou 'r' (retour) : ").lower()
-
-                    if choix_page == 'r':
-                        break
-                    elif choix_page == 'p' and page < total_pages:
-                        page += 1
-                    elif choix_page == 'a' and page > 1:
-                        page -= 1
-                    elif choix_page.isdigit():
-                        num = int(choix_page)
-                        if 1 <= num <= len(missions):
-                            afficher_mission(missions[num-1])
+                parcourir_pages("TOUTES LES MISSIONS", missions,
+                                lambda mission: ligne_mission(personnage, mission),
+                                lambda mission: afficher_mission(mission, personnage))
 
         elif choix == "3":
             repos(personnage)
@@ -1201,11 +916,11 @@ def menu_missions(personnage):
 # SECTION 7: FONCTIONS ATTAQUES
 # ===============================================
 
+@instrumentation.chronometrer('catalogue.charger_attaques')
 def charger_attaques():
-    """Charge la base de données des attaques depuis le fichier JSON"""
+    """Charge la base de données des attaques (gardée en mémoire par le registre)"""
     try:
-        with open('attaques.json', 'r', encoding='utf-8') as fichier:
-            attaques = json.load(fichier)
+        attaques = registre.obtenir('attaques.json')
         return attaques
     except FileNotFoundError:
         print("Erreur : Le fichier attaques.json n'a pas été trouvé")
@@ -1214,6 +929,10 @@ def charger_attaques():
         print("Erreur : Le fichier attaques.json est mal formaté")
         return []
 
+def index_attaques():
+    """Retourne l'index des attaques (par nom, type et élément)"""
+    return indexer('attaques', charger_attaques())
+
 def afficher_attaque(attaque):
     """Affiche les détails d'une attaque"""
     print(f"\n=== {attaque['nom']} ===")
@@ -1226,31 +945,29 @@ def afficher_attaque(attaque):
         print(f"Effet spécial : {attaque['effet']}")
 
 def lister_attaques():
-    """Affiche la liste de toutes les attaques"""
-    attaques = charger_attaques()
+    """Affiche la liste de toutes les attaques, page par page (un numéro montre les détails)"""
+    attaques = ouvrir_liste_catalogue('attaques.json')
     if not attaques:
         return
 
-    print("\n=== LISTE DES ATTAQUES ===")
-    for i, attaque in enumerate(attaques, 1):
-        print(f"{i}. {attaque['nom']} ({attaque['type']}) - {attaque['degats']} dégâts")
+    parcourir_pages("LISTE DES ATTAQUES", attaques,
+                    lambda attaque: f"{attaque['nom']} ({attaque['type']}) - {attaque['degats']} dégâts",
+                    afficher_attaque)
 
 def chercher_attaque_par_nom(nom):
     """Cherche une attaque par son nom"""
-    attaques = charger_attaques()
-    for attaque in attaques:
-        if attaque['nom'].lower() == nom.lower():
-            return attaque
-    return None
+    return index_attaques().chercher(nom)
 
 def filtrer_attaques_par_type(type_attaque):
     """Filtre les attaques par type"""
-    attaques = charger_attaques()
-    attaques_filtrees = []
-    for attaque in attaques:
-        if attaque['type'].lower() == type_attaque.lower():
-            attaques_filtrees.append(attaque)
-    return attaques_filtrees
+    return index_attaques().filtrer('type', type_attaque)
+
+def verifier_catalogues():
+    """Indexe tous les catalogues et signale les références inconnues entre eux"""
+    index_attaques()
+    index_monstres()
+    index_missions()
+    index_boutique()
 
 def menu_attaques():
     """Menu pour explorer la base de données des attaques"""
@@ -1265,14 +982,6 @@ def menu_attaques():
 
         if choix == "1":
             lister_attaques()
-            attaques = charger_attaques()
-            if attaques:
-                try:
-                    num = int(input("\nTapez le numéro d'une attaque pour voir ses détails (0 pour annuler) : "))
-                    if 1 <= num <= len(attaques):
-                        afficher_attaque(attaques[num-1])
-                except ValueError:
-                    print("Numéro invalide")
 
         elif choix == "2":
             nom = input("Nom de l'attaque à chercher : ")
@@ -1299,57 +1008,167 @@ def menu_attaques():
             print("Choix invalide")
 
 # ===============================================
-# SECTION 8: PROGRAMME PRINCIPAL ET MENUS
+# SECTION 8: AFFICHAGE DES ÉVÉNEMENTS DU MOTEUR
 # ===============================================
+# Les actions du jeu sont jouées par moteur.py, qui décrit ce qui se passe
+# par des événements ; la console les affiche ici, un par un.
+
+def _lignes_tour(evenement):
+    """Lignes affichées au début d'un tour de combat"""
+    lignes = [f"\n=== TOUR {evenement['numero']} ===", f"Vos PV: {evenement['pv']}",
+              "Monstres encore en vie:"]
+    for i, (nom, pv) in enumerate(evenement['monstres'], 1):
+        lignes.append(f"  {i}. {nom} (PV: {pv})")
+    return lignes
+
+def _lignes_attaque_personnage(evenement):
+    """Lignes affichées après l'attaque du personnage"""
+    lignes = [f"\nVous attaquez {evenement['cible']} et infligez {evenement['degats']} dégâts !"]
+    if evenement['pv_cible'] > 0:
+        lignes.append(f"{evenement['cible']} a encore {evenement['pv_cible']} PV")
+    return lignes
+
+def _lignes_affinite(evenement):
+    """Ligne affichée quand l'arme du personnage a une affinité avec l'élément du monstre"""
+    if evenement['pourcentage'] > 100:
+        return [f"Votre arme est efficace contre l'élément {evenement['element']} "
+                f"(dégâts x{evenement['pourcentage'] / 100:g})"]
+    return [f"Votre arme est peu efficace contre l'élément {evenement['element']} "
+            f"(dégâts x{evenement['pourcentage'] / 100:g})"]
+
+# Nom affiché des effets d'attaque
+NOMS_EFFETS_CONSOLE = {'poison': 'poison', 'brulure': 'brûlure', 'paralysie': 'paralysie',
+                       'initiative': 'initiative'}
+
+def _lignes_effet_applique(evenement):
+    """Lignes affichées quand une attaque de monstre pose un effet"""
+    effet = NOMS_EFFETS_CONSOLE.get(evenement['effet'], evenement['effet'])
+    tours = f"{evenement['tours']} tour{'s' if evenement['tours'] > 1 else ''}"
+    if evenement['sur_lanceur']:
+        return [f"{evenement['monstre']} utilise {evenement['attaque']} : {effet} "
+                f"{evenement['valeur']:+d} ({tours})"]
+    return [f"{evenement['attaque']} vous inflige : {effet} ({tours})"]
+
+# Type d'événement -> fonction qui retourne les lignes à afficher
+RENDUS_CONSOLE = {
+    'combat_debut': lambda e: [f"\n=== DÉBUT DU COMBAT - {e['mission']['nom']} ===",
+                               f"Vous devez affronter {e['mission']['monstrenombre']} {e['mission']['monstremission']}"],
+    'monstre_inconnu': lambda e: ["Erreur: Monstre non trouvé dans la base de données!"],
+    'statistiques': lambda e: ["\n=== VOS STATISTIQUES ===",
+                               f"Points de vie: {e['pv']}/{e['pv_max']}",
+                               f"Attaque: {e['attaque']}",
+                               f"Défense: {e['defense']}",
+                               f"Initiative: {e['initiative']}"],
+    'monstres': lambda e: ["\n=== MONSTRES À AFFRONTER ==="]
+                          + [f"{i}. {nom} (PV: {pv})" for i, (nom, pv) in enumerate(e['monstres'], 1)],
+    'affinite': _lignes_affinite,
+    'tour': _lignes_tour,
+    'cible_invalide': lambda e: ["Choix invalide, attaque le premier monstre disponible"],
+    'attaque_personnage': _lignes_attaque_personnage,
+    'monstre_vaincu': lambda e: [f"💀 {e['monstre']} est vaincu !"],
+    'attaque_monstre': lambda e: [f"{e['monstre']} utilise {e['attaque']} et vous inflige {e['degats']} dégâts !"],
+    'attaque_ratee': lambda e: [f"{e['monstre']} utilise {e['attaque']}... et vous rate !"],
+    'soin_monstre': lambda e: [f"{e['monstre']} utilise {e['attaque']} et récupère {e['soin']} PV (PV: {e['pv_monstre']})"],
+    'effet_applique': _lignes_effet_applique,
+    'degats_effet': lambda e: [f"{NOMS_EFFETS_CONSOLE.get(e['effet'], e['effet']).capitalize()} : vous perdez {e['degats']} PV (PV: {e['pv']})"],
+    'personnage_paralyse': lambda e: ["Vous êtes paralysé et ne pouvez pas attaquer ce tour-ci !"],
+    'fuite_monstres': lambda e: ["Le combat s'éternise... Les monstres fuient!"],
+    'mission_reussie': lambda e: ["\n🎉 MISSION RÉUSSIE ! 🎉",
+                                  f"Vous avez vaincu tous les {e['mission']['monstremission']} !",
+                                  "Récompenses obtenues:",
+                                  f"  +{e['xp']} XP (Total: {e['experience']})",
+                                  f"  +{e['pieces_or']} pièces d'or (Total: {e['total_or']})"],
+    'mission_echouee': lambda e: ["\n💀 MISSION ÉCHOUÉE 💀",
+                                  f"Vous avez vaincu {e['vaincus']}/{e['total']} monstres avant d'être défait"],
+    'objet_achete': lambda e: [f"{e['nom']} acheté pour {e['prix']} pièces d'or !"],
+    'or_insuffisant': lambda e: [f"Pas assez d'argent ! Il vous faut {e['prix']} pièces d'or (vous avez {e['pieces_or']})"],
+    'objet_vendu': lambda e: [f"{e['nom']} vendu pour {e['prix']} pièces d'or !"],
+    'objet_invendable': lambda e: ["Cet objet ne peut pas être vendu"],
+    'objet_introuvable': lambda e: ["Objet non trouvé dans l'inventaire"],
+    'objet_equipe': lambda e: [f"{e['nom']} équipé avec succès !"],
+    'objet_non_equipable': lambda e: ["Cet objet ne peut pas être équipé"],
+    'objet_desequipe': lambda e: [f"{e['nom']} déséquipé" if e['remplace']
+                                  else f"{e['nom']} déséquipé avec succès !"],
+    'objet_non_porte': lambda e: ["Objet non trouvé ou non équipé"],
+    'personnage_mort': lambda e: ["💀 Un personnage mort ne peut pas se reposer ! Il est définitivement mort."],
+    'pv_deja_au_maximum': lambda e: ["Vous êtes déjà au maximum de vos points de vie."],
+    'repos': lambda e: [f"Vous vous reposez et récupérez {e['pv_recupere']} points de vie.",
+                        f"Vos points de vie actuels sont maintenant : {e['pv']}/{e['pv_max']}"],
+}
+
+def afficher_evenement(evenement):
+    """Affiche un événement du moteur dans la console"""
+    rendu = RENDUS_CONSOLE.get(evenement['type'])
+    if rendu is None:
+        return
+    for ligne in rendu(evenement):
+        print(ligne)
 
-print("JEU DE ROLE - MENU PRINCIPAL\n")
+# ===============================================
+# SECTION 9: PROGRAMME PRINCIPAL ET MENUS
+# ===============================================
 
-personnage_actuel = None
+def menu_principal():
+    """Boucle du menu principal (le personnage actuel est propre à chaque partie)"""
+    print("JEU DE ROLE - MENU PRINCIPAL\n")
 
-while True:
-    print("\n=== MENU PRINCIPAL ===")
-    if personnage_actuel:
-        print(f"Personnage actuel : {personnage_actuel['nom']} ({personnage_actuel['classe']}) - {personnage_actuel['experience']} XP")
-    else:
-        print("Aucun personnage chargé")
+    personnage_actuel = None
 
-    print("1. Gestion des personnages")
-    print("2. Missions")
-    print("3. Boutique d'équipement")
-    print("4. Inventaire")
-    print("5. Explorer la base de donnees des monstres")
-    print("6. Explorer la base de donnees des attaques")
-    print("7. Quitter")
+    while True:
+        print("\n=== MENU PRINCIPAL ===")
+        if personnage_actuel:
+            print(f"Personnage actuel : {personnage_actuel['nom']} ({personnage_actuel['classe']}) - {personnage_actuel['experience']} XP")
+        else:
+            print("Aucun personnage chargé")
 
-    choix_menu = input("Votre choix (1-7) : ")
+        print("1. Gestion des personnages")
+        print("2. Missions")
+        print("3. Boutique d'équipement")
+        print("4. Inventaire")
+        print("5. Explorer la base de donnees des monstres")
+        print("6. Explorer la base de donnees des attaques")
+        print("7. Quitter")
 
-    if choix_menu == "1":
-        nouveau_personnage = menu_personnage()
-        if nouveau_personnage:
-            personnage_actuel = nouveau_personnage
+        choix_menu = input("Votre choix (1-7) : ")
 
-    elif choix_menu == "2":
-        menu_missions(personnage_actuel)
+        if choix_menu == "1":
+            nouveau_personnage = menu_personnage(personnage_actuel)
+            if nouveau_personnage:
+                personnage_actuel = nouveau_personnage
 
-    elif choix_menu == "3":
-        menu_boutique(personnage_actuel)
+        elif choix_menu == "2":
+            menu_missions(personnage_actuel)
 
-    elif choix_menu == "4":
-        menu_inventaire(personnage_actuel)
+        elif choix_menu == "3":
+            menu_boutique(personnage_actuel)
 
-    elif choix_menu == "5":
-        menu_monstres()
+        elif choix_menu == "4":
+            menu_inventaire(personnage_actuel)
 
-    elif choix_menu == "6":
-        menu_attaques()
+        elif choix_menu == "5":
+            menu_monstres()
 
-    elif choix_menu == "7":
-        if personnage_actuel:
-            sauver = input("Voulez-vous sauvegarder votre personnage avant de quitter ? (o/n) : ")
-            if sauver.lower() in ['o', 'oui', 'y', 'yes']:
-                sauvegarder_personnage(personnage_actuel)
-        print("Au revoir !")
-        break
+        elif choix_menu == "6":
+            menu_attaques()
 
-    else:
-        print("Choix invalide")
\ No newline at end of file
+        elif choix_menu == "7":
+            if personnage_actuel:
+                sauver = input("Voulez-vous sauvegarder votre personnage avant de quitter ? (o/n) : ")
+                if sauver.lower() in ['o', 'oui', 'y', 'yes']:
+                    sauvegarder_personnage(personnage_actuel)
+            print("Au revoir !")
+            break
+
+        else:
+            print("Choix invalide")
+
+def main():
+    """Point d'entrée du jeu en console (python Donjonreplit.py ou python -m Donjonreplit)"""
+    # Construire les index une fois et signaler les catalogues incohérents
+    verifier_catalogues()
+    menu_principal()
+
+# Importer ce module ne lit aucun fichier et n'affiche rien : les catalogues
+# sont chargés à leur première utilisation (registre)
+if __name__ == "__main__":
+    main()
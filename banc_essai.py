@@ -0,0 +1,289 @@
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+# ===============================================
+# BANC D'ESSAI DES PERFORMANCES
+# ===============================================
+# Mesure les opérations coûteuses du jeu sur des catalogues synthétiques de
+# grande taille (générés dans un dossier temporaire, avec une graine fixe)
+# et écrit les résultats en JSON pour comparer deux versions du code :
+#
+#   python banc_essai.py --sortie avant.json
+#   ... modification ...
+#   python banc_essai.py --sortie apres.json --comparer avant.json
+#
+# Chaque banc est joué en plusieurs séries ; on garde la durée minimale et la
+# médiane par opération (en microsecondes).
+
+# Tailles des catalogues synthétiques pour --echelle 1
+TAILLES = {
+    'monstres': 10_000,
+    'missions': 50_000,
+    'attaques': 200,
+    'boutique': 1_000,
+    'inventaire': 1_000,
+}
+
+SERIES = 5
+
+# -----------------------------------------------
+# Monde synthétique
+# -----------------------------------------------
+
+def generer_catalogues(rng, tailles):
+    """Retourne des catalogues synthétiques cohérents (références existantes)"""
+    # Importé ici : le générateur n'est utile qu'à la préparation du monde
+    import generateur_monde as generateur
+
+    # Les générateurs tirent dans cet ordre : même graine, mêmes catalogues
+    attaques = list(generateur.generer_attaques(rng, tailles['attaques']))
+    monstres = list(generateur.generer_monstres(rng, tailles['monstres'], len(attaques)))
+    missions = list(generateur.generer_missions(rng, tailles['missions'], len(monstres)))
+    boutique = list(generateur.generer_boutique(rng, tailles['boutique']))
+    return {'attaques': attaques, 'monstres': monstres, 'missions': missions, 'boutique': boutique}
+
+def preparer_monde(dossier, graine, echelle):
+    """Écrit les catalogues synthétiques dans le dossier et retourne le monde du banc"""
+    from regles import (creer_personnage, ajouter_objet, porter_objet, initialiser_missions,
+                        champ_objet)
+
+    rng = random.Random(graine)
+    tailles = {nom: max(1, int(taille * echelle)) for nom, taille in TAILLES.items()}
+    catalogues = generer_catalogues(rng, tailles)
+    for nom, entrees in catalogues.items():
+        with open(os.path.join(dossier, f"{nom}.json"), 'w', encoding='utf-8') as fichier:
+            json.dump(entrees, fichier, ensure_ascii=False)
+
+    # Personnage chargé : un exemplaire (ou plus) de chaque objet, un casque porté
+    personnage = creer_personnage("Banc", "Guerrier", "optimise", rng,
+                                  boutique=catalogues['boutique'])
+    personnage['experience'] = 500
+    for objet in rng.sample(catalogues['boutique'], min(tailles['inventaire'],
+                                                        len(catalogues['boutique']))):
+        ajouter_objet(personnage, objet, rng.randint(1, 3))
+    for entree in list(personnage['inventaire']):
+        if champ_objet(entree, 'slot') == 'tete' and not entree.get('porte'):
+            porter_objet(personnage, entree)
+            break
+    initialiser_missions(personnage)
+
+    return {'rng': rng, 'tailles': tailles, 'catalogues': catalogues, 'personnage': personnage}
+
+# -----------------------------------------------
+# Bancs : chacun retourne (fonction à mesurer, appels par série)
+# -----------------------------------------------
+
+def banc_combat_mission(jeu, monde, graine):
+    """commencer_combat sans affichage (moteur.combattre)"""
+    import moteur
+    from regles import calculer_stats_personnage
+    personnage = monde['personnage']
+    pv_max = calculer_stats_personnage(personnage)['pv']
+    missions = monde['catalogues']['missions'][:200]
+    rng = random.Random(graine)
+    etat = {'rang': 0}
+
+    def combat():
+        mission = missions[etat['rang'] % len(missions)]
+        etat['rang'] += 1
+        personnage['points_de_vie_actuels'] = pv_max
+        moteur.combattre(personnage, mission, rng=rng)
+    return combat, 200
+
+def banc_combat_simple(jeu, monde, graine):
+    """simuler_combat_simple (affichage envoyé vers os.devnull)"""
+    from regles import calculer_stats_personnage
+    stats = calculer_stats_personnage(monde['personnage'])
+    monstres = monde['catalogues']['monstres'][:100]
+    random.seed(graine)
+    etat = {'rang': 0}
+
+    def combat():
+        monstre = monstres[etat['rang'] % len(monstres)]
+        etat['rang'] += 1
+        jeu.simuler_combat_simple(stats, monstre)
+    return combat, 500
+
+def banc_stats_en_cache(jeu, monde, graine):
+    """calculer_stats_personnage (cache à jour)"""
+    personnage = monde['personnage']
+    return (lambda: jeu.calculer_stats_personnage(personnage)), 20_000
+
+def banc_stats_recalculees(jeu, monde, graine):
+    """recalcul complet des statistiques (inventaire de 1000 objets)"""
+    from regles import recalculer_stats_personnage
+    personnage = monde['personnage']
+    return (lambda: recalculer_stats_personnage(personnage)), 200
+
+def banc_missions_disponibles(jeu, monde, graine):
+    """missions_disponibles sur le catalogue synthétique"""
+    personnage = monde['personnage']
+    jeu.missions_disponibles(personnage)  # construction de l'index hors mesure
+    return (lambda: jeu.missions_disponibles(personnage)), 200
+
+def banc_chercher_monstre(jeu, monde, graine):
+    """chercher_monstre_par_nom (noms tirés au hasard)"""
+    rng = random.Random(graine)
+    noms = [rng.choice(monde['catalogues']['monstres'])['nom'].upper() for _ in range(1000)]
+    jeu.chercher_monstre_par_nom(noms[0])
+    etat = {'rang': 0}
+
+    def chercher():
+        jeu.chercher_monstre_par_nom(noms[etat['rang'] % len(noms)])
+        etat['rang'] += 1
+    return chercher, 5_000
+
+def banc_sauvegarder(jeu, monde, graine):
+    """sauvegarder_personnage (journal des changements, instantané périodique)"""
+    personnage = monde['personnage']
+
+    def sauvegarder():
+        personnage['pieces_or'] += 1
+        jeu.sauvegarder_personnage(personnage)
+    return sauvegarder, 100
+
+def banc_charger(jeu, monde, graine):
+    """charger_personnage (instantané + journal, 1000 objets)"""
+    from persistance import nom_fichier_personnage
+    jeu.sauvegarder_personnage(monde['personnage'])
+    nom_fichier = nom_fichier_personnage(monde['personnage']['nom'])
+    return (lambda: jeu.charger_personnage(nom_fichier)), 50
+
+def banc_generer_attributs(jeu, monde, graine):
+    """generer_attributs (répartition aléatoire)"""
+    rng = random.Random(graine)
+    return (lambda: jeu.generer_attributs(rng)), 5_000
+
+def banc_generer_attributs_optimises(jeu, monde, graine):
+    """generer_attributs_optimises"""
+    rng = random.Random(graine)
+    return (lambda: jeu.generer_attributs_optimises("Mage", rng)), 5_000
+
+def banc_generer_lot_attributs(jeu, monde, graine):
+    """generer_lot_attributs (1000 répartitions par appel)"""
+    from regles import generer_lot_attributs
+    rng = random.Random(graine)
+    return (lambda: generer_lot_attributs(1000, None, rng)), 50
+
+BANCS = {
+    'combat_mission': banc_combat_mission,
+    'combat_simple': banc_combat_simple,
+    'stats_en_cache': banc_stats_en_cache,
+    'stats_recalculees': banc_stats_recalculees,
+    'missions_disponibles': banc_missions_disponibles,
+    'chercher_monstre': banc_chercher_monstre,
+    'sauvegarder_personnage': banc_sauvegarder,
+    'charger_personnage': banc_charger,
+    'generer_attributs': banc_generer_attributs,
+    'generer_attributs_optimises': banc_generer_attributs_optimises,
+    'generer_lot_attributs': banc_generer_lot_attributs,
+}
+
+# -----------------------------------------------
+# Mesure et comparaison
+# -----------------------------------------------
+
+def mesurer(fonction, appels, series=SERIES):
+    """Retourne la durée (secondes) de chaque série de `appels` appels"""
+    durees = []
+    for _ in range(series):
+        debut = time.perf_counter()
+        for _ in range(appels):
+            fonction()
+        durees.append(time.perf_counter() - debut)
+    return durees
+
+def lancer(noms=None, graine=0, echelle=1.0, series=SERIES, facteur_appels=1.0):
+    """Joue les bancs demandés (tous par défaut) et retourne le rapport JSON"""
+    noms = list(BANCS) if noms is None else noms
+    rapport = {
+        'python': platform.python_version(),
+        'plateforme': platform.platform(),
+        'graine': graine,
+        'echelle': echelle,
+        'series': series,
+        'resultats': {},
+    }
+    dossier_initial = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix='banc_') as dossier, \
+            open(os.devnull, 'w', encoding='utf-8') as muet:
+        # Les fonctions mesurées lisent les catalogues et écrivent les
+        # sauvegardes dans le dossier courant : celui du monde synthétique
+        os.chdir(dossier)
+        try:
+            with contextlib.redirect_stdout(muet):
+                import Donjonreplit as jeu
+                monde = preparer_monde(dossier, graine, echelle)
+                rapport['tailles'] = monde['tailles']
+                for nom in noms:
+                    fonction, appels = BANCS[nom](jeu, monde, graine)
+                    appels = max(1, int(appels * facteur_appels))
+                    durees = mesurer(fonction, appels, series)
+                    rapport['resultats'][nom] = {
+                        'description': BANCS[nom].__doc__,
+                        'appels': appels,
+                        'us_min': min(durees) / appels * 1e6,
+                        'us_mediane': statistics.median(durees) / appels * 1e6,
+                    }
+        finally:
+            os.chdir(dossier_initial)
+    return rapport
+
+def comparer(ancien, nouveau):
+    """Retourne {banc: rapport nouveau/ancien des durées minimales}"""
+    ratios = {}
+    for nom, resultat in nouveau['resultats'].items():
+        avant = ancien['resultats'].get(nom)
+        if avant and avant['us_min'] > 0:
+            ratios[nom] = resultat['us_min'] / avant['us_min']
+    return ratios
+
+def main():
+    """Point d'entrée en ligne de commande"""
+    parser = argparse.ArgumentParser(description="Banc d'essai des performances du jeu")
+    parser.add_argument('bancs', nargs='*',
+                        help=f"bancs à jouer parmi : {', '.join(BANCS)} (tous par défaut)")
+    parser.add_argument('--graine', type=int, default=0)
+    parser.add_argument('--echelle', type=float, default=1.0,
+                        help="multiplie la taille des catalogues synthétiques")
+    parser.add_argument('--series', type=int, default=SERIES)
+    parser.add_argument('--appels', type=float, default=1.0,
+                        help="multiplie le nombre d'appels par série")
+    parser.add_argument('--sortie', help="fichier JSON du rapport (sinon affiché)")
+    parser.add_argument('--comparer', help="rapport JSON d'une version précédente")
+    args = parser.parse_args()
+    inconnus = [nom for nom in args.bancs if nom not in BANCS]
+    if inconnus:
+        parser.error(f"banc inconnu : {', '.join(inconnus)}")
+
+    # Les modules du jeu sont à côté de ce fichier
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    rapport = lancer(args.bancs or None, args.graine, args.echelle, args.series, args.appels)
+
+    if args.comparer:
+        with open(args.comparer, 'r', encoding='utf-8') as fichier:
+            rapport['comparaison'] = comparer(json.load(fichier), rapport)
+
+    texte = json.dumps(rapport, indent=2, ensure_ascii=False)
+    if args.sortie:
+        with open(args.sortie, 'w', encoding='utf-8') as fichier:
+            fichier.write(texte + '\n')
+    else:
+        print(texte)
+
+    for nom, resultat in rapport['resultats'].items():
+        ligne = f"{nom:30} {resultat['us_min']:12.2f} µs"
+        if nom in rapport.get('comparaison', {}):
+            ligne += f"   x{rapport['comparaison'][nom]:.2f}"
+        print(ligne, file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
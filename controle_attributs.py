@@ -0,0 +1,130 @@
+import argparse
+import math
+import random
+
+from regles import (MAX_ATTR, TOTAL_POINTS, ATTRIBUTS_PRINCIPAUX, attributs_de_depart,
+                    generer_lot_attributs, probabilites_attributs)
+
+# ===============================================
+# CONTRÔLE DE LA RÉPARTITION DES ATTRIBUTS
+# ===============================================
+# regles.generer_lot_attributs tire les attributs dans une table précalculée.
+# Ce contrôle vérifie qu'elle suit bien la loi de l'ancienne répartition point
+# par point (gardée ici comme référence) :
+#   1. exactement : la loi de la répartition point par point est recalculée
+#      en fractions et comparée à celle de la table ;
+#   2. statistiquement : des tirages de la table et de la référence sont
+#      comparés à la loi exacte par un test du khi-deux.
+#
+#   python controle_attributs.py --tirages 200000
+
+# Seuil de la p-valeur sous lequel un échantillon est jugé non conforme
+SEUIL = 0.001
+
+# Effectif attendu minimal d'une case du khi-deux (les plus petites sont regroupées)
+EFFECTIF_MIN = 5
+
+def repartition_point_par_point(classe=None, rng=random):
+    """Ancienne répartition : chaque point va à un attribut tiré parmi ceux qui ne sont pas au maximum"""
+    attributs = list(attributs_de_depart(classe))
+    for _ in range(TOTAL_POINTS - sum(attributs)):
+        indices_possibles = [i for i in range(len(attributs)) if attributs[i] < MAX_ATTR]
+        if indices_possibles:
+            attributs[rng.choice(indices_possibles)] += 1
+    return attributs
+
+def loi_exacte(classe=None):
+    """Loi exacte de la répartition point par point, calculée en fractions point après point"""
+    # Importé ici : Fraction n'est utile qu'à ce contrôle exact
+    from fractions import Fraction
+
+    depart = attributs_de_depart(classe)
+    loi = {depart: Fraction(1)}
+    for _ in range(TOTAL_POINTS - sum(depart)):
+        suivante = {}
+        for attributs, probabilite in loi.items():
+            possibles = [i for i in range(len(attributs)) if attributs[i] < MAX_ATTR]
+            if not possibles:
+                suivante[attributs] = suivante.get(attributs, 0) + probabilite
+            for i in possibles:
+                cle = attributs[:i] + (attributs[i] + 1,) + attributs[i + 1:]
+                suivante[cle] = suivante.get(cle, 0) + probabilite / len(possibles)
+        loi = suivante
+    return loi
+
+def khi_deux(effectifs, probabilites, nombre):
+    """Retourne (khi-deux, degrés de liberté, p-valeur) d'un échantillon contre une loi
+
+    Les cases d'effectif attendu inférieur à EFFECTIF_MIN sont regroupées.
+    La p-valeur utilise l'approximation de Wilson-Hilferty.
+    """
+    khi2 = 0.0
+    cases = 0
+    attendu_reste = observe_reste = 0.0
+    for repartition, probabilite in probabilites.items():
+        attendu = nombre * float(probabilite)
+        observe = effectifs.get(repartition, 0)
+        if attendu < EFFECTIF_MIN:
+            attendu_reste += attendu
+            observe_reste += observe
+            continue
+        khi2 += (observe - attendu) ** 2 / attendu
+        cases += 1
+    if attendu_reste > 0:
+        khi2 += (observe_reste - attendu_reste) ** 2 / attendu_reste
+        cases += 1
+
+    libertes = max(cases - 1, 1)
+    ecart = 2 / (9 * libertes)
+    z = ((khi2 / libertes) ** (1 / 3) - (1 - ecart)) / math.sqrt(ecart)
+    return khi2, libertes, 0.5 * math.erfc(z / math.sqrt(2))
+
+def compter(repartitions):
+    """Effectif de chaque répartition : {tuple: nombre}"""
+    effectifs = {}
+    for repartition in repartitions:
+        cle = tuple(repartition)
+        effectifs[cle] = effectifs.get(cle, 0) + 1
+    return effectifs
+
+def verifier_distribution(classe=None, nombre=100_000, graine=0):
+    """Contrôle la table d'une classe (None : répartition aléatoire) ; retourne un rapport
+
+    Rapport : {'classe', 'repartitions', 'loi_exacte' (bool), 'table' et
+    'reference' : (khi-deux, degrés de liberté, p-valeur), 'conforme' (bool)}.
+    """
+    probabilites = probabilites_attributs(classe)
+    rng = random.Random(graine)
+    table = khi_deux(compter(generer_lot_attributs(nombre, classe, rng)), probabilites, nombre)
+    reference = khi_deux(compter(repartition_point_par_point(classe, rng) for _ in range(nombre)),
+                         probabilites, nombre)
+    identique = loi_exacte(classe) == probabilites
+    return {
+        'classe': classe, 'repartitions': len(probabilites), 'loi_exacte': identique,
+        'table': table, 'reference': reference,
+        'conforme': identique and table[2] >= SEUIL and reference[2] >= SEUIL,
+    }
+
+def main():
+    """Point d'entrée en ligne de commande : contrôle la table de chaque classe"""
+    parser = argparse.ArgumentParser(description="Contrôle la loi des attributs générés")
+    parser.add_argument('--tirages', type=int, default=100_000)
+    parser.add_argument('--graine', type=int, default=0)
+    args = parser.parse_args()
+    if args.tirages < 1:
+        parser.error("--tirages doit être positif")
+
+    non_conformes = 0
+    for classe in (None, *ATTRIBUTS_PRINCIPAUX):
+        rapport = verifier_distribution(classe, args.tirages, args.graine)
+        non_conformes += not rapport['conforme']
+        print(f"{classe or 'Aléatoire'} : {rapport['repartitions']} répartitions, "
+              f"loi exacte {'identique' if rapport['loi_exacte'] else 'DIFFÉRENTE'}, "
+              f"p-valeur table {rapport['table'][2]:.3f}, "
+              f"référence {rapport['reference'][2]:.3f} : "
+              f"{'conforme' if rapport['conforme'] else 'NON CONFORME'}")
+    if non_conformes:
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+import json
+
+from registre import registre
+from index_catalogues import normaliser
+
+# ===============================================
+# ÉLÉMENTS ET AFFINITÉS
+# ===============================================
+# elements.json donne la liste des éléments valides et la matrice des
+# affinités : multiplicateurs[élément de l'attaque][élément de la cible], en
+# pourcentage (150 : dégâts x1,5 ; 50 : moitié). Une paire absente vaut 100.
+#
+# La matrice est compilée une fois par chargement du fichier : chaque élément
+# reçoit un code (0 pour Neutre) et les multiplicateurs forment un tuple à
+# plat, lu à l'indice code_attaque * nombre + code_cible. Les codes sont
+# calculés avant le combat : aucun nom n'est comparé pendant les tours.
+
+FICHIER_ELEMENTS = 'elements.json'
+
+# Élément des attaques et des objets qui n'en ont pas (toujours le code 0)
+NEUTRE = 0
+NOM_NEUTRE = 'Neutre'
+
+# Multiplicateur d'une paire absente de la matrice (en pourcentage)
+SANS_AFFINITE = 100
+
+# Fichier absent ou illisible : seul Neutre existe
+_SANS_FICHIER = {'elements': [], 'multiplicateurs': {}}
+
+# Affinités compilées pour la version actuelle du fichier
+_compilees = {'donnees': None, 'affinites': None}
+
+def compiler_affinites(donnees):
+    """Compile le contenu de elements.json : {'noms', 'codes', 'nombre', 'multiplicateurs'}
+
+    Lève ValueError si la matrice cite un élément absent de la liste.
+    """
+    noms = [NOM_NEUTRE] + [nom for nom in donnees.get('elements', ())
+                           if normaliser(nom) != normaliser(NOM_NEUTRE)]
+    codes = {normaliser(nom): code for code, nom in enumerate(noms)}
+    nombre = len(noms)
+
+    multiplicateurs = [SANS_AFFINITE] * (nombre * nombre)
+    for element_attaque, cibles in donnees.get('multiplicateurs', {}).items():
+        for element_cible, pourcentage in cibles.items():
+            for nom in (element_attaque, element_cible):
+                if normaliser(nom) not in codes:
+                    raise ValueError(f"Élément inconnu dans {FICHIER_ELEMENTS} : {nom}")
+            indice = codes[normaliser(element_attaque)] * nombre + codes[normaliser(element_cible)]
+            multiplicateurs[indice] = int(pourcentage)
+
+    return {'noms': tuple(noms), 'codes': codes, 'nombre': nombre,
+            'multiplicateurs': tuple(multiplicateurs)}
+
+def affinites():
+    """Retourne les affinités compilées, recompilées si elements.json a changé"""
+    try:
+        donnees = registre.obtenir(FICHIER_ELEMENTS)
+    except (FileNotFoundError, json.JSONDecodeError):
+        donnees = _SANS_FICHIER
+    if _compilees['donnees'] is not donnees:
+        _compilees['affinites'] = compiler_affinites(donnees)
+        _compilees['donnees'] = donnees
+    return _compilees['affinites']
+
+def noms_elements():
+    """Retourne les noms des éléments valides (Neutre en premier)"""
+    return affinites()['noms']
+
+def element_connu(nom):
+    """Vérifie qu'un nom d'élément existe (sans distinction de casse)"""
+    return normaliser(nom) in affinites()['codes']
+
+def code_element(nom):
+    """Retourne le code d'un élément ; None ou un élément inconnu comptent comme Neutre"""
+    if not nom:
+        return NEUTRE
+    return affinites()['codes'].get(normaliser(nom), NEUTRE)
+
+def multiplicateur(code_attaque, code_cible, table=None):
+    """Multiplicateur (en pourcentage) d'une attaque d'un élément contre un autre
+
+    table : affinités déjà obtenues par affinites() (évite de relire le registre).
+    """
+    if table is None:
+        table = affinites()
+    return table['multiplicateurs'][code_attaque * table['nombre'] + code_cible]
+
+def affinites_combat(elements_personnage, monstre, table=None):
+    """Retourne (affinité de l'arme du personnage contre le monstre, code de son armure)
+
+    elements_personnage vient de regles.elements_personnage ; None : Neutre.
+    """
+    if table is None:
+        table = affinites()
+    codes = table['codes']
+    element_arme, element_armure = elements_personnage or (None, None)
+    code_arme, code_armure, code_monstre = (
+        codes.get(normaliser(nom), NEUTRE) if nom else NEUTRE
+        for nom in (element_arme, element_armure, monstre.get('element')))
+    return multiplicateur(code_arme, code_monstre, table), code_armure
+
+def appliquer_affinite(degats, pourcentage):
+    """Dégâts multipliés par une affinité (en pourcentage), arrondis vers le bas"""
+    return degats * pourcentage // 100
@@ -0,0 +1,110 @@
+import json
+import os
+
+# ===============================================
+# LECTURE ET ÉCRITURE EN FLUX D'UN TABLEAU JSON
+# ===============================================
+# Les catalogues sont des tableaux JSON d'objets. Pour un très gros fichier,
+# on lit le texte par blocs et on décode les éléments un par un avec
+# json.JSONDecoder.raw_decode : seul l'élément en cours est en mémoire, et
+# le premier élément est disponible sans lire la suite du fichier.
+# À l'écriture, les éléments sont écrits un par ligne à mesure qu'ils sont
+# produits : un catalogue d'un million d'entrées n'est jamais en mémoire.
+
+TAILLE_BLOC = 64 * 1024
+
+# Caractères qui peuvent continuer un nombre JSON
+CARACTERES_NOMBRE = frozenset('0123456789+-.eE')
+
+def iterer_tableau_json(chemin, taille_bloc=TAILLE_BLOC):
+    """Rend un par un les éléments du tableau JSON contenu dans un fichier
+
+    Lève json.JSONDecodeError si le fichier n'est pas un tableau JSON valide
+    (au moment où l'erreur est atteinte).
+    """
+    decodeur = json.JSONDecoder()
+    with open(chemin, 'r', encoding='utf-8') as fichier:
+        tampon = ''
+        position = 0
+        fin_fichier = False
+
+        def lire_bloc():
+            """Ajoute un bloc au tampon (en oubliant ce qui est déjà décodé)"""
+            nonlocal tampon, position, fin_fichier
+            bloc = fichier.read(taille_bloc)
+            if not bloc:
+                fin_fichier = True
+            tampon = tampon[position:] + bloc
+            position = 0
+
+        def prochain_caractere():
+            """Saute les espaces et retourne le caractère suivant ('' en fin de fichier)"""
+            nonlocal position
+            while True:
+                while position < len(tampon) and tampon[position] in ' \t\r\n':
+                    position += 1
+                if position < len(tampon):
+                    return tampon[position]
+                if fin_fichier:
+                    return ''
+                lire_bloc()
+
+        def erreur(message):
+            """Retourne une erreur de décodage située dans le fichier"""
+            return json.JSONDecodeError(message, tampon, position)
+
+        if prochain_caractere() != '[':
+            raise erreur("Tableau JSON attendu")
+        position += 1
+        if prochain_caractere() == ']':
+            return
+
+        while True:
+            prochain_caractere()
+            try:
+                element, fin = decodeur.raw_decode(tampon, position)
+                # Un nombre coupé par la fin du tampon ("1." pour "1.5e3") se
+                # décode sans erreur : on exige de voir ce qui suit l'élément
+                complet = fin_fichier or (fin < len(tampon)
+                                          and tampon[fin] not in CARACTERES_NOMBRE)
+            except json.JSONDecodeError:
+                if fin_fichier:
+                    raise
+                complet = False
+            if not complet:
+                lire_bloc()
+                continue
+
+            position = fin
+            yield element
+
+            separateur = prochain_caractere()
+            position += 1
+            if separateur == ']':
+                return
+            if separateur != ',':
+                position -= 1
+                raise erreur("',' ou ']' attendu")
+
+def ecrire_tableau_json(chemin, elements):
+    """Écrit les éléments (liste ou générateur) comme un tableau JSON, un par ligne
+
+    Le fichier est écrit à côté puis renommé : un lecteur ne voit jamais de
+    tableau à moitié écrit. Retourne le nombre d'éléments écrits.
+    """
+    temporaire = f"{chemin}.tmp"
+    nombre = 0
+    try:
+        with open(temporaire, 'w', encoding='utf-8') as fichier:
+            fichier.write('[')
+            for element in elements:
+                fichier.write(',\n' if nombre else '\n')
+                fichier.write(json.dumps(element, ensure_ascii=False))
+                nombre += 1
+            fichier.write('\n]\n')
+        os.replace(temporaire, chemin)
+    except BaseException:
+        if os.path.exists(temporaire):
+            os.remove(temporaire)
+        raise
+    return nombre
@@ -0,0 +1,297 @@
+import argparse
+import os
+import random
+
+from flux_json import ecrire_tableau_json
+
+# ===============================================
+# GÉNÉRATEUR DE MONDES SYNTHÉTIQUES
+# ===============================================
+# Produit des catalogues cohérents de n'importe quelle taille (attaques,
+# monstres, missions, boutique) et des sauvegardes de personnages, pour
+# essayer le jeu à grande échelle :
+#
+#   python generateur_monde.py monde --monstres 100000 --missions 1000000 --personnages 10000
+#
+# Les références se font par numéro : "Monstre 12" existe dès qu'il y a plus
+# de 12 monstres. Aucun catalogue n'est donc gardé en mémoire : chaque
+# générateur rend ses entrées une par une et les fichiers sont écrits au fil
+# de l'eau. Même graine, mêmes tailles : même monde.
+
+TAILLES = {
+    'attaques': 200,
+    'monstres': 10_000,
+    'missions': 50_000,
+    'boutique': 1_000,
+    'personnages': 1_000,
+}
+
+ELEMENTS = ('Feu', 'Nature', 'Eau', 'Electricite', 'Lumiere', 'Obscurite', 'Bien', 'Mal', 'Terre')
+TYPES_ATTAQUE = ('Physique', 'Magique', 'Distance', 'Poison', 'Controle', 'Soin', 'Buff')
+
+# Effet des attaques de certains types (le nombre est tiré de 1 à 3)
+EFFETS_PAR_TYPE = {
+    'Poison': "poison {n} {tours}",
+    'Controle': "paralysie {n} {tours}",
+    'Buff': "initiative +{n}",
+}
+
+# Type d'objet de la boutique pour chaque slot (les slots de regles.SLOTS,
+# plus "aucun" pour les consommables)
+TYPES_PAR_SLOT = {
+    'tete': 'casque',
+    'torse': 'armure',
+    'main_droite': 'arme',
+    'main_gauche': 'bouclier',
+    'deux_mains': 'arme',
+    'pieds': 'chaussures',
+    'aucun': 'consommable',
+}
+
+# Part des missions ouvertes à toutes les classes
+PART_MISSIONS_TOUS = 0.3
+
+# Part des armes et armures qui ont un élément (affinités, voir elements.py)
+PART_OBJETS_ELEMENT = 0.3
+
+# Nombre maximal d'objets différents et de missions réussies par personnage
+OBJETS_MAX_PERSONNAGE = 8
+MISSIONS_MAX_PERSONNAGE = 20
+
+# -----------------------------------------------
+# Noms (les références entre catalogues)
+# -----------------------------------------------
+
+def nom_attaque(numero):
+    """Nom généré d'une attaque"""
+    return f"Attaque {numero}"
+
+def nom_monstre(numero):
+    """Nom généré d'un monstre"""
+    return f"Monstre {numero}"
+
+def nom_mission(numero):
+    """Nom généré d'une mission"""
+    return f"Mission {numero}"
+
+def nom_objet(numero):
+    """Nom généré d'un objet de la boutique"""
+    return f"Objet {numero}"
+
+def nom_personnage(numero):
+    """Nom généré d'un personnage"""
+    return f"Personnage {numero}"
+
+# -----------------------------------------------
+# Catalogues
+# -----------------------------------------------
+
+def generer_attaques(rng, nombre):
+    """Rend `nombre` attaques"""
+    for i in range(nombre):
+        type_attaque = rng.choice(TYPES_ATTAQUE)
+        attaque = {
+            'nom': nom_attaque(i), 'type': type_attaque,
+            'degats': rng.randint(1, 12), 'precision': rng.randint(50, 100),
+            'element': rng.choice(ELEMENTS), 'description': "Attaque générée",
+        }
+        if type_attaque == 'Soin':
+            attaque['degats'] = -attaque['degats']
+        elif type_attaque == 'Buff':
+            attaque['degats'] = 0
+        if type_attaque in EFFETS_PAR_TYPE:
+            n = rng.randint(1, 3)
+            attaque['effet'] = EFFETS_PAR_TYPE[type_attaque].format(
+                n=n, tours="tours" if n > 1 else "tour")
+        yield attaque
+
+def generer_monstres(rng, nombre, nombre_attaques):
+    """Rend `nombre` monstres dont les trois attaques existent parmi `nombre_attaques`"""
+    if nombre and nombre_attaques < 1:
+        raise ValueError("Il faut au moins une attaque pour générer des monstres")
+    for i in range(nombre):
+        if nombre_attaques >= 3:
+            attaques = rng.sample(range(nombre_attaques), 3)
+        else:
+            attaques = [rng.randrange(nombre_attaques) for _ in range(3)]
+        yield {
+            'nom': nom_monstre(i), 'pvies': rng.randint(3, 60),
+            'attaque1': nom_attaque(attaques[0]),
+            'attaque2': nom_attaque(attaques[1]),
+            'attaque3': nom_attaque(attaques[2]),
+            'initiative': rng.randint(1, 10), 'pieces_or': rng.randint(0, 50),
+            'pts_experience': rng.randint(1, 50), 'element': rng.choice(ELEMENTS),
+            'capturable': rng.random() < 0.3,
+        }
+
+def generer_missions(rng, nombre, nombre_monstres):
+    """Rend `nombre` missions dont le monstre existe parmi `nombre_monstres`"""
+    # Importé ici : regles n'est utile qu'à la génération
+    from index_catalogues import CLASSE_TOUS
+    from regles import dicoClasse
+
+    if nombre and nombre_monstres < 1:
+        raise ValueError("Il faut au moins un monstre pour générer des missions")
+    classes = list(dicoClasse.values())
+    for i in range(nombre):
+        classe = CLASSE_TOUS if rng.random() < PART_MISSIONS_TOUS else rng.choice(classes)
+        yield {
+            'nom': nom_mission(i), 'description': "Mission générée",
+            'classe': classe, 'niveauxp': rng.randint(0, 1000),
+            'xpwin': rng.randint(1, 100), 'orwin': rng.randint(1, 200),
+            'monstremission': nom_monstre(rng.randrange(nombre_monstres)),
+            'monstrenombre': rng.randint(1, 8),
+            'repetable': rng.random() < 0.5,
+        }
+
+def generer_boutique(rng, nombre):
+    """Rend `nombre` objets de boutique, un type et des statistiques adaptés à leur slot"""
+    slots = list(TYPES_PAR_SLOT)
+    for i in range(nombre):
+        slot = rng.choice(slots)
+        type_objet = TYPES_PAR_SLOT[slot]
+        if type_objet == 'arme':
+            stats = {'degats': rng.randint(1, 10), 'precision': rng.randint(50, 95)}
+        elif type_objet == 'consommable':
+            stats = {'soin': rng.randint(5, 30)}
+        else:
+            stats = {'defense': rng.randint(1, 5)}
+        objet = {
+            'nom': nom_objet(i), 'type': type_objet, 'prix': rng.randint(1, 500),
+            'stats': stats, 'description': "Objet généré", 'slot': slot,
+        }
+        if type_objet in ('arme', 'armure') and rng.random() < PART_OBJETS_ELEMENT:
+            objet['element'] = rng.choice(ELEMENTS)
+        yield objet
+
+# -----------------------------------------------
+# Personnages
+# -----------------------------------------------
+
+def generer_personnages(rng, nombre, nombre_objets, nombre_missions, boutique=None):
+    """Rend `nombre` personnages prêts à sauvegarder
+
+    Leurs objets (non portés, en piles) et leurs missions réussies existent
+    dans la boutique et les missions générées. L'équipement de départ est
+    compacté d'après `boutique`, les objets générés qui en portent le nom
+    (boutique.json du dossier courant sans elle).
+    """
+    # Importé ici : regles n'est utile qu'à la génération
+    from regles import creer_personnage, dicoClasse, donnees_a_sauvegarder
+
+    classes = list(dicoClasse.values())
+    for i in range(nombre):
+        type_attributs = rng.choice(("aleatoire", "optimise"))
+        personnage = creer_personnage(nom_personnage(i), rng.choice(classes), type_attributs, rng,
+                                      boutique)
+        personnage['experience'] = rng.randint(0, 1000)
+        personnage['pieces_or'] = rng.randint(0, 2000)
+
+        # Objets tous différents : une pile par objet, au format compact
+        # (identiques au catalogue, seuls le nom et la quantité sont gardés)
+        for numero in rng.sample(range(nombre_objets), min(nombre_objets,
+                                                             rng.randint(0, OBJETS_MAX_PERSONNAGE))):
+            personnage['inventaire'].append({'nom': nom_objet(numero),
+                                             'quantite': rng.randint(1, 5)})
+
+        reussies = rng.sample(range(nombre_missions), min(nombre_missions,
+                                                          rng.randint(0, MISSIONS_MAX_PERSONNAGE)))
+        personnage['missions_terminees'] = sorted(nom_mission(numero) for numero in reussies)
+        yield donnees_a_sauvegarder(personnage)
+
+def ecrire_sauvegardes(dossier, personnages):
+    """Écrit chaque personnage dans sa propre sauvegarde (personnage_<nom>.json)
+
+    Sans fsync ni journal, contrairement au jeu : un monde généré se
+    régénère. Retourne le nombre de sauvegardes écrites.
+    """
+    # Importé ici : le format des sauvegardes n'est utile qu'avec --sauvegardes
+    import json
+    from persistance import nom_fichier_personnage
+
+    nombre = 0
+    for personnage in personnages:
+        chemin = os.path.join(dossier, nom_fichier_personnage(personnage['nom']))
+        with open(chemin, 'w', encoding='utf-8') as fichier:
+            json.dump(personnage, fichier, ensure_ascii=False, separators=(',', ':'))
+        nombre += 1
+    return nombre
+
+# -----------------------------------------------
+# Monde complet
+# -----------------------------------------------
+
+def ecrire_monde(dossier, graine=0, tailles=None, sauvegardes=False):
+    """Écrit un monde synthétique dans un dossier et retourne le nombre d'entrées écrites
+
+    Catalogues : attaques.json, monstres.json, missions.json, boutique.json.
+    Personnages : personnages.json (tableau), et une sauvegarde par
+    personnage si `sauvegardes` est vrai.
+    """
+    tailles = {**TAILLES, **(tailles or {})}
+    rng = random.Random(graine)
+    os.makedirs(dossier, exist_ok=True)
+
+    def chemin(nom):
+        return os.path.join(dossier, nom)
+
+    ecrits = {
+        'attaques': ecrire_tableau_json(chemin('attaques.json'),
+                                        generer_attaques(rng, tailles['attaques'])),
+        'monstres': ecrire_tableau_json(chemin('monstres.json'),
+                                        generer_monstres(rng, tailles['monstres'],
+                                                         tailles['attaques'])),
+        'missions': ecrire_tableau_json(chemin('missions.json'),
+                                        generer_missions(rng, tailles['missions'],
+                                                         tailles['monstres'])),
+    }
+
+    # L'équipement de départ des personnages est compacté d'après cette
+    # boutique, pas celle du jeu : seuls les objets qui portent son nom sont
+    # gardés en mémoire, la boutique est écrite en flux comme le reste
+    # Importé ici : regles n'est utile qu'à la génération des personnages
+    from regles import EQUIPEMENT_DEPART
+    noms_depart = {objet['nom'] for objet in EQUIPEMENT_DEPART}
+    objets_depart = []
+
+    def objets_boutique():
+        for objet in generer_boutique(rng, tailles['boutique']):
+            if objet['nom'] in noms_depart:
+                objets_depart.append(objet)
+            yield objet
+
+    ecrits['boutique'] = ecrire_tableau_json(chemin('boutique.json'), objets_boutique())
+    personnages = generer_personnages(rng, tailles['personnages'],
+                                      tailles['boutique'], tailles['missions'], objets_depart)
+    if sauvegardes:
+        ecrits['personnages'] = ecrire_sauvegardes(dossier, personnages)
+    else:
+        ecrits['personnages'] = ecrire_tableau_json(chemin('personnages.json'), personnages)
+    return ecrits
+
+def main():
+    """Point d'entrée en ligne de commande"""
+    parser = argparse.ArgumentParser(description="Génère un monde synthétique (catalogues et personnages)")
+    parser.add_argument('dossier', help="dossier où écrire le monde (créé si besoin)")
+    parser.add_argument('--graine', type=int, default=0)
+    for nom, taille in TAILLES.items():
+        parser.add_argument(f"--{nom}", type=int, default=taille,
+                            help=f"nombre de {nom} (défaut : {taille})")
+    parser.add_argument('--sauvegardes', action='store_true',
+                        help="une sauvegarde personnage_<nom>.json par personnage "
+                             "au lieu de personnages.json")
+    args = parser.parse_args()
+
+    tailles = {nom: getattr(args, nom) for nom in TAILLES}
+    for nom, taille in tailles.items():
+        if taille < 0:
+            parser.error(f"--{nom} doit être positif ou nul")
+    try:
+        ecrits = ecrire_monde(args.dossier, args.graine, tailles, args.sauvegardes)
+    except ValueError as e:
+        parser.error(str(e))
+    for nom, nombre in ecrits.items():
+        print(f"{nom} : {nombre}")
+
+if __name__ == "__main__":
+    main()
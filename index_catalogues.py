@@ -0,0 +1,157 @@
+from bisect import bisect_right
+from operator import itemgetter
+
+# ===============================================
+# INDEX DES CATALOGUES
+# ===============================================
+# Index par nom (insensible à la casse) et par attributs pour les monstres,
+# attaques, objets de la boutique et missions. Un index est reconstruit
+# seulement quand le registre fournit une nouvelle liste (fichier modifié).
+
+# Champs indexés pour chaque catalogue (en plus du nom)
+CHAMPS_INDEXES = {
+    'monstres': ('element',),
+    'attaques': ('type', 'element'),
+    'boutique': ('type', 'slot'),
+    'missions': ('classe', 'niveauxp'),
+}
+
+# Classe des missions ouvertes à tout le monde
+CLASSE_TOUS = 'tous'
+
+# Champs des monstres qui font référence à une attaque
+CHAMPS_ATTAQUES_MONSTRE = ('attaque1', 'attaque2', 'attaque3')
+
+def normaliser(valeur):
+    """Retourne la clé d'index d'une valeur (texte sans distinction de casse)"""
+    if isinstance(valeur, str):
+        return valeur.casefold()
+    return valeur
+
+class IndexCatalogue:
+    """Index d'une liste d'entrées par nom et par champs secondaires"""
+
+    def __init__(self, entrees, champs=()):
+        self.entrees = entrees
+        self.par_nom = {}
+        self.par_champ = {champ: {} for champ in champs}
+
+        for entree in entrees:
+            # Garder la première entrée d'un nom, comme l'ancienne recherche linéaire
+            self.par_nom.setdefault(normaliser(entree['nom']), entree)
+            for champ in champs:
+                valeur = entree.get(champ)
+                if valeur is not None:
+                    self.par_champ[champ].setdefault(normaliser(valeur), []).append(entree)
+
+    def chercher(self, nom):
+        """Retourne l'entrée portant ce nom, ou None"""
+        return self.par_nom.get(normaliser(nom))
+
+    def contient(self, nom):
+        """Indique si une entrée porte ce nom"""
+        return normaliser(nom) in self.par_nom
+
+    def filtrer(self, champ, valeur):
+        """Retourne les entrées dont le champ vaut cette valeur (dans l'ordre du fichier)"""
+        return list(self.par_champ[champ].get(normaliser(valeur), ()))
+
+    def valeurs(self, champ):
+        """Retourne les valeurs distinctes (normalisées) présentes pour un champ"""
+        return list(self.par_champ[champ])
+
+class IndexMissions(IndexCatalogue):
+    """Index des missions avec, par classe, les seuils d'XP triés
+
+    Les missions accessibles à un niveau d'XP sont un préfixe de chaque
+    groupe trié : un bisect suffit, sans parcourir tout le catalogue.
+    """
+
+    def __init__(self, entrees, champs=()):
+        super().__init__(entrees, champs)
+        groupes = {}
+        for position, mission in enumerate(entrees):
+            groupes.setdefault(normaliser(mission['classe']), []).append(
+                (mission['niveauxp'], position, mission))
+        # classe -> (seuils d'XP triés, [(position, mission)] dans le même ordre)
+        self.par_classe = {}
+        for classe, missions in groupes.items():
+            missions.sort(key=itemgetter(0, 1))
+            self.par_classe[classe] = ([niveau for niveau, _p, _m in missions],
+                                       [(position, mission) for _n, position, mission in missions])
+
+    def _groupes(self, classe):
+        """Retourne les groupes 'tous' et celui de la classe (s'ils existent)"""
+        cles = dict.fromkeys((CLASSE_TOUS, normaliser(classe)))
+        return [self.par_classe[cle] for cle in cles if cle in self.par_classe]
+
+    def accessibles(self, classe, experience):
+        """Retourne les missions de cette classe (ou 'tous') dont l'XP requise est atteinte
+
+        Les missions sont rendues dans l'ordre du fichier.
+        """
+        retenues = []
+        for seuils, missions in self._groupes(classe):
+            retenues.extend(missions[:bisect_right(seuils, experience)])
+        if len(retenues) > 1:
+            retenues.sort(key=itemgetter(0))
+        return [mission for _position, mission in retenues]
+
+    def prochain_seuil(self, classe, experience):
+        """Retourne l'XP à laquelle la prochaine mission se débloque, ou None"""
+        prochains = []
+        for seuils, _missions in self._groupes(classe):
+            rang = bisect_right(seuils, experience)
+            if rang < len(seuils):
+                prochains.append(seuils[rang])
+        return min(prochains, default=None)
+
+# Classe d'index propre à certains catalogues
+CLASSES_INDEX = {'missions': IndexMissions}
+
+# Index courant de chaque catalogue
+_index = {}
+# Références inconnues déjà signalées (pour ne les afficher qu'une fois)
+_references_signalees = set()
+
+def indexer(nom_catalogue, entrees):
+    """Retourne l'index du catalogue, reconstruit seulement si la liste a changé"""
+    index = _index.get(nom_catalogue)
+    if index is None or index.entrees is not entrees:
+        classe_index = CLASSES_INDEX.get(nom_catalogue, IndexCatalogue)
+        index = classe_index(entrees, CHAMPS_INDEXES.get(nom_catalogue, ()))
+        _index[nom_catalogue] = index
+        signaler_references_inconnues()
+    return index
+
+def references_inconnues():
+    """Liste les références croisées qui ne correspondent à aucune entrée
+
+    Seuls les catalogues déjà indexés sont comparés entre eux.
+    """
+    anomalies = []
+    monstres = _index.get('monstres')
+    attaques = _index.get('attaques')
+    missions = _index.get('missions')
+
+    if missions is not None and monstres is not None:
+        for mission in missions.entrees:
+            nom_monstre = mission.get('monstremission')
+            if nom_monstre and not monstres.contient(nom_monstre):
+                anomalies.append(f"Mission '{mission['nom']}' : monstre inconnu '{nom_monstre}'")
+
+    if monstres is not None and attaques is not None:
+        for monstre in monstres.entrees:
+            for champ in CHAMPS_ATTAQUES_MONSTRE:
+                nom_attaque = monstre.get(champ)
+                if nom_attaque and not attaques.contient(nom_attaque):
+                    anomalies.append(f"Monstre '{monstre['nom']}' : {champ} inconnue '{nom_attaque}'")
+
+    return anomalies
+
+def signaler_references_inconnues():
+    """Affiche une seule fois chaque référence inconnue entre catalogues"""
+    for anomalie in references_inconnues():
+        if anomalie not in _references_signalees:
+            _references_signalees.add(anomalie)
+            print(f"Attention : {anomalie}")
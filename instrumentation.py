@@ -0,0 +1,157 @@
+import atexit
+import functools
+import json
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+# ===============================================
+# INSTRUMENTATION (OPTIONNELLE)
+# ===============================================
+# Compte les appels et mesure la durée des actions du jeu (tours de combat,
+# chargement des catalogues, sauvegardes, achats et ventes) et les octets
+# JSON lus et écrits. Désactivée par défaut : chaque point de mesure se
+# réduit alors à un test de ACTIF.
+#
+# Activation : variable d'environnement DONJON_INSTRUMENTATION=rapport.json
+# (le rapport est écrit à la fin du programme ; "1" écrit instrumentation.json),
+# ou activer() depuis le code. instantane() donne l'état à tout moment.
+
+VARIABLE_ACTIVATION = 'DONJON_INSTRUMENTATION'
+FICHIER_PAR_DEFAUT = 'instrumentation.json'
+
+# Nombre maximal de durées gardées par mesure pour les percentiles
+# (échantillonnage par réservoir au-delà)
+TAILLE_ECHANTILLON = 4096
+
+PERCENTILES = (50, 90, 99)
+
+ACTIF = False
+
+_verrou = threading.Lock()
+_mesures = {}
+_compteurs = {}
+_hasard = random.Random(0)
+_fichier_rapport = None
+
+def activer(fichier=None):
+    """Active les mesures ; le rapport sera écrit dans `fichier` à la sortie (si donné)"""
+    global ACTIF, _fichier_rapport
+    if fichier is not None and _fichier_rapport is None:
+        atexit.register(_ecrire_a_la_sortie)
+    if fichier is not None:
+        # Chemin absolu : le dossier courant peut changer avant la sortie
+        _fichier_rapport = os.path.abspath(fichier)
+    ACTIF = True
+
+def desactiver():
+    """Arrête les mesures (celles déjà prises sont gardées)"""
+    global ACTIF
+    ACTIF = False
+
+def reinitialiser():
+    """Oublie toutes les mesures et tous les compteurs"""
+    with _verrou:
+        _mesures.clear()
+        _compteurs.clear()
+
+def enregistrer(nom, duree):
+    """Ajoute une durée (secondes) à la mesure `nom`"""
+    with _verrou:
+        mesure = _mesures.get(nom)
+        if mesure is None:
+            mesure = _mesures[nom] = {'appels': 0, 'total': 0.0, 'max': 0.0, 'echantillon': []}
+        mesure['appels'] += 1
+        mesure['total'] += duree
+        if duree > mesure['max']:
+            mesure['max'] = duree
+        echantillon = mesure['echantillon']
+        if len(echantillon) < TAILLE_ECHANTILLON:
+            echantillon.append(duree)
+        else:
+            rang = _hasard.randrange(mesure['appels'])
+            if rang < TAILLE_ECHANTILLON:
+                echantillon[rang] = duree
+
+def compter(nom, quantite=1):
+    """Ajoute une quantité au compteur `nom` (par exemple des octets)"""
+    with _verrou:
+        _compteurs[nom] = _compteurs.get(nom, 0) + quantite
+
+# Bloc sans mesure, partagé (nullcontext est réutilisable) : rien à créer
+# quand l'instrumentation est désactivée
+_SANS_MESURE = nullcontext()
+
+def mesure(nom):
+    """Mesure la durée d'un bloc : with mesure('nom'): ..."""
+    if not ACTIF:
+        return _SANS_MESURE
+    return _mesurer(nom)
+
+@contextmanager
+def _mesurer(nom):
+    """Générateur de mesure d'un bloc (instrumentation active)"""
+    debut = time.perf_counter()
+    try:
+        yield
+    finally:
+        enregistrer(nom, time.perf_counter() - debut)
+
+def chronometrer(nom):
+    """Décorateur : mesure chaque appel de la fonction sous le nom donné"""
+    def decorateur(fonction):
+        @functools.wraps(fonction)
+        def enveloppe(*args, **kwargs):
+            if not ACTIF:
+                return fonction(*args, **kwargs)
+            debut = time.perf_counter()
+            try:
+                return fonction(*args, **kwargs)
+            finally:
+                enregistrer(nom, time.perf_counter() - debut)
+        return enveloppe
+    return decorateur
+
+def _percentile(valeurs_triees, p):
+    """Percentile p (0-100) d'une liste triée, au rang le plus proche"""
+    rang = max(0, min(len(valeurs_triees) - 1, round(p / 100 * len(valeurs_triees)) - 1))
+    return valeurs_triees[rang]
+
+def instantane():
+    """Retourne l'état des mesures (durées en microsecondes) et des compteurs"""
+    with _verrou:
+        mesures = {nom: (m['appels'], m['total'], m['max'], sorted(m['echantillon']))
+                   for nom, m in _mesures.items()}
+        compteurs = dict(_compteurs)
+
+    resultat = {}
+    for nom, (appels, total, maximum, echantillon) in sorted(mesures.items()):
+        resume = {
+            'appels': appels,
+            'total_s': total,
+            'moyenne_us': total / appels * 1e6,
+            'max_us': maximum * 1e6,
+        }
+        for p in PERCENTILES:
+            resume[f"p{p}_us"] = _percentile(echantillon, p) * 1e6
+        resultat[nom] = resume
+    return {'actif': ACTIF, 'mesures': resultat, 'compteurs': dict(sorted(compteurs.items()))}
+
+def ecrire_rapport(fichier):
+    """Écrit l'instantané des mesures dans un fichier JSON"""
+    with open(fichier, 'w', encoding='utf-8') as sortie:
+        json.dump(instantane(), sortie, indent=2, ensure_ascii=False)
+
+def _ecrire_a_la_sortie():
+    """Écrit le rapport à la fin du programme (atexit)"""
+    if _fichier_rapport is not None:
+        try:
+            ecrire_rapport(_fichier_rapport)
+        except OSError as e:
+            print(f"Erreur lors de l'écriture du rapport d'instrumentation : {e}")
+
+_valeur = os.environ.get(VARIABLE_ACTIVATION)
+if _valeur:
+    activer(FICHIER_PAR_DEFAUT if _valeur == '1' else _valeur)
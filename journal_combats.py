@@ -0,0 +1,324 @@
+import os
+import random
+import struct
+
+import instrumentation
+import moteur
+
+# ===============================================
+# JOURNAL BINAIRE DES COMBATS (REJOUABLE)
+# ===============================================
+# Chaque combat lancé par commencer_combat peut être ajouté à un journal
+# binaire : sa graine, ce qui décide du combat côté personnage, chaque tirage
+# de dés, chaque choix de cible, le début de chaque tour et l'issue.
+# rejouer_combat() rejoue le combat avec la même graine, vérifie chaque
+# tirage, puis l'issue et les PV finaux : un combat dont le résultat a été
+# modifié ne se rejoue pas à l'identique.
+#
+# Le fichier est une suite d'enregistrements de 10 octets, toujours ajoutés à
+# la fin (petit-boutiste) :
+#   ENREGISTREMENT : type, code, mot, valeur  ('<BBIi')
+#   ENREGISTREMENT_TEXTE : type, code, 8 octets de texte UTF-8  ('<BB8s')
+#
+#   type     code            mot              valeur
+#   ENTETE   VERSION         MARQUE           taille d'un enregistrement (début du fichier)
+#   DEBUT    -               nombre de monstres  graine
+#   STAT     code de stat    -                valeur
+#   TEXTE    code de texte   (8 octets du texte, complétés par des octets nuls)
+#   TOUR     -               numéro           PV du personnage au début du tour
+#   TIRAGE   -               borne n          résultat, de 0 à n - 1
+#   CIBLE    -               nombre de cibles indice choisi (-1 : choix invalide)
+#   FIN      1 si victoire   nombre de tours  PV finaux
+#
+# Activation : variable d'environnement DONJON_JOURNAL_COMBATS=combats.journal,
+# ou activer() depuis le code. Rejeu : python journal_combats.py combats.journal
+
+VARIABLE_ACTIVATION = 'DONJON_JOURNAL_COMBATS'
+FICHIER_PAR_DEFAUT = 'combats.journal'
+
+# mot sur 32 bits : une borne de tirage ou un nombre de monstres ne déborde pas
+ENREGISTREMENT = struct.Struct('<BBIi')
+ENREGISTREMENT_TEXTE = struct.Struct('<BB8s')
+TAILLE_TEXTE = 8
+
+VERSION = 2
+MARQUE = 0x4A44  # "DJ"
+
+# Types d'enregistrement
+ENTETE = 0
+DEBUT = 1
+STAT = 2
+TEXTE = 3
+TOUR = 4
+TIRAGE = 5
+CIBLE = 6
+FIN = 7
+
+# Codes des statistiques et des textes (indices dans ces tuples)
+NOMS_STATS = ('pv_depart', 'pv_max', 'attaque', 'defense', 'initiative')
+NOMS_TEXTES = ('personnage', 'mission', 'monstre', 'element_arme', 'element_armure')
+
+# Journal actif (None : les combats ne sont pas notés)
+FICHIER = None
+
+def activer(fichier=FICHIER_PAR_DEFAUT):
+    """Ajoute désormais chaque combat de la console au journal `fichier`"""
+    global FICHIER
+    # Chemin absolu : le dossier courant peut changer pendant la partie
+    FICHIER = os.path.abspath(fichier)
+
+def desactiver():
+    """Arrête de noter les combats"""
+    global FICHIER
+    FICHIER = None
+
+# -----------------------------------------------
+# Écriture
+# -----------------------------------------------
+
+def _ajouter(tampon, type_enregistrement, code=0, mot=0, valeur=0):
+    """Ajoute un enregistrement à la fin du tampon"""
+    tampon += ENREGISTREMENT.pack(type_enregistrement, code, mot, valeur)
+
+def _ajouter_texte(tampon, code, texte):
+    """Ajoute un texte au tampon, par morceaux de 8 octets (au moins un)"""
+    octets = texte.encode('utf-8')
+    for debut in range(0, max(len(octets), 1), TAILLE_TEXTE):
+        tampon += ENREGISTREMENT_TEXTE.pack(TEXTE, code, octets[debut:debut + TAILLE_TEXTE])
+
+class TiragesObserves:
+    """Générateur d'un combat qui signale chaque tirage à `observer(borne, resultat)`
+
+    Seuls randint et randrange, ceux du moteur, sont fournis ; la suite des
+    tirages est celle du générateur enveloppé.
+    """
+
+    def __init__(self, rng, observer):
+        self._rng = rng
+        self._observer = observer
+
+    def randrange(self, n):
+        resultat = self._rng.randrange(n)
+        self._observer(n, resultat)
+        return resultat
+
+    def randint(self, a, b):
+        resultat = self._rng.randint(a, b)
+        self._observer(b - a + 1, resultat - a)
+        return resultat
+
+def _ecrire(fichier, tampon):
+    """Ajoute les enregistrements d'un combat à la fin du journal (en-tête si le fichier est neuf)"""
+    with open(fichier, 'ab') as sortie:
+        if sortie.tell() == 0:
+            sortie.write(ENREGISTREMENT.pack(ENTETE, VERSION, MARQUE, ENREGISTREMENT.size))
+        sortie.write(tampon)
+        sortie.flush()
+        os.fsync(sortie.fileno())
+    if instrumentation.ACTIF:
+        instrumentation.compter('combats.octets_ecrits', len(tampon))
+
+def combattre_journalise(personnage, mission, choisir_cible=None, emettre=None,
+                         fichier=None, graine=None):
+    """moteur.combattre, avec une graine propre au combat, puis ajout du combat au journal
+
+    Retourne (victoire, événements) comme moteur.combattre.
+    """
+    if fichier is None:
+        fichier = FICHIER or FICHIER_PAR_DEFAUT
+    if graine is None:
+        graine = random.getrandbits(31)
+
+    profil = moteur.profil_combat(personnage)
+    stats = profil['stats']
+    tampon = bytearray()
+    _ajouter(tampon, DEBUT, mot=mission['monstrenombre'], valeur=graine)
+    for code, valeur in enumerate((personnage['points_de_vie_actuels'], stats['pv'],
+                                   stats['attaque'], stats['defense'], stats['initiative'])):
+        _ajouter(tampon, STAT, code, valeur=valeur)
+    for code, texte in enumerate((personnage['nom'], mission['nom'], mission['monstremission'],
+                                  *profil['elements'])):
+        if texte is not None:
+            _ajouter_texte(tampon, code, texte)
+
+    def noter_tirage(borne, resultat):
+        _ajouter(tampon, TIRAGE, mot=borne, valeur=resultat)
+
+    choisir = None
+    if choisir_cible is not None:
+        def choisir(monstres):
+            choix = choisir_cible(monstres)
+            _ajouter(tampon, CIBLE, mot=len(monstres), valeur=-1 if choix is None else choix)
+            return choix
+
+    tours = 0
+
+    def transmettre(evenement):
+        nonlocal tours
+        if evenement['type'] == 'tour':
+            tours = evenement['numero']
+            _ajouter(tampon, TOUR, mot=tours, valeur=evenement['pv'])
+        if emettre is not None:
+            emettre(evenement)
+
+    victoire, evenements = moteur.combattre(
+        personnage, mission, choisir_cible=choisir, emettre=transmettre,
+        rng=TiragesObserves(random.Random(graine), noter_tirage), profil=profil)
+    _ajouter(tampon, FIN, int(victoire), tours, personnage['points_de_vie_actuels'])
+
+    try:
+        _ecrire(fichier, tampon)
+    except OSError as e:
+        print(f"Erreur lors de l'écriture du journal des combats : {e}")
+    return victoire, evenements
+
+# -----------------------------------------------
+# Lecture et rejeu
+# -----------------------------------------------
+
+def lire_combats(fichier):
+    """Retourne les combats complets du journal, dans l'ordre
+
+    Un combat est un dictionnaire : graine, nombre_monstres, stats, textes,
+    tours [(numéro, pv)], tirages [(borne, résultat)], cibles [(nombre, choix)]
+    et fin {'victoire', 'tours', 'pv'}. Un combat sans FIN (programme
+    interrompu pendant l'écriture) est ignoré.
+    Lève ValueError si le fichier n'est pas un journal de combats.
+    """
+    with open(fichier, 'rb') as entree:
+        donnees = entree.read()
+    if instrumentation.ACTIF:
+        instrumentation.compter('combats.octets_lus', len(donnees))
+    # Un dernier enregistrement coupé est ignoré
+    utiles = memoryview(donnees)[:len(donnees) - len(donnees) % ENREGISTREMENT.size]
+    if (len(utiles) < ENREGISTREMENT.size
+            or ENREGISTREMENT.unpack_from(utiles) != (ENTETE, VERSION, MARQUE, ENREGISTREMENT.size)):
+        raise ValueError(f"{fichier} n'est pas un journal de combats (version {VERSION})")
+
+    combats = []
+    combat = None
+    for rang, (type_enregistrement, code, mot, valeur) in enumerate(
+            ENREGISTREMENT.iter_unpack(utiles)):
+        if type_enregistrement == DEBUT:
+            combat = {'graine': valeur, 'nombre_monstres': mot, 'stats': {}, 'textes': {},
+                      'tours': [], 'tirages': [], 'cibles': [], 'fin': None}
+            morceaux = {}
+        elif combat is None:
+            # En-tête, ou reste d'un combat coupé
+            continue
+        elif type_enregistrement == TIRAGE:
+            combat['tirages'].append((mot, valeur))
+        elif type_enregistrement == TOUR:
+            combat['tours'].append((mot, valeur))
+        elif type_enregistrement == CIBLE:
+            combat['cibles'].append((mot, valeur))
+        elif type_enregistrement == STAT:
+            combat['stats'][NOMS_STATS[code]] = valeur
+        elif type_enregistrement == TEXTE:
+            debut = rang * ENREGISTREMENT.size + 2
+            morceaux.setdefault(code, bytearray()).extend(
+                bytes(utiles[debut:debut + TAILLE_TEXTE]).rstrip(b'\0'))
+        elif type_enregistrement == FIN:
+            combat['textes'] = {NOMS_TEXTES[code]: bytes(octets).decode('utf-8')
+                                for code, octets in morceaux.items()}
+            combat['fin'] = {'victoire': bool(code), 'tours': mot, 'pv': valeur}
+            combats.append(combat)
+            combat = None
+    return combats
+
+def rejouer_combat(combat):
+    """Rejoue un combat du journal ; retourne (conforme, message)
+
+    Le combat est rejoué par le moteur avec la même graine, les mêmes
+    statistiques et les mêmes choix de cible, contre le monstre du catalogue
+    actuel. Chaque tirage doit être celui du journal, puis les tours,
+    l'issue et les PV finaux.
+    """
+    stats = combat['stats']
+    textes = combat['textes']
+    personnage = {'nom': textes.get('personnage', ''), 'points_de_vie_actuels': stats['pv_depart'],
+                  'experience': 0, 'pieces_or': 0, 'missions_terminees': []}
+    mission = {'nom': textes.get('mission', ''), 'monstremission': textes.get('monstre', ''),
+               'monstrenombre': combat['nombre_monstres'], 'xpwin': 0, 'orwin': 0}
+    profil = {'stats': {'pv': stats['pv_max'], 'attaque': stats['attaque'],
+                        'defense': stats['defense'], 'initiative': stats['initiative']},
+              'elements': (textes.get('element_arme'), textes.get('element_armure'))}
+
+    tirages = iter(combat['tirages'])
+    cibles = iter(combat['cibles'])
+    compte = {'tirages': 0}
+
+    def verifier_tirage(borne, resultat):
+        attendu = next(tirages, None)
+        compte['tirages'] += 1
+        if attendu != (borne, resultat):
+            raise ValueError(f"tirage n° {compte['tirages']} : {resultat} sur {borne}, "
+                             f"le journal donne {attendu}")
+
+    def choisir(monstres):
+        attendu = next(cibles, None)
+        if attendu is None or attendu[0] != len(monstres):
+            raise ValueError(f"choix de cible parmi {len(monstres)} monstres, "
+                             f"le journal donne {attendu}")
+        return None if attendu[1] < 0 else attendu[1]
+
+    try:
+        victoire, evenements = moteur.combattre(
+            personnage, mission, choisir_cible=choisir if combat['cibles'] else None,
+            rng=TiragesObserves(random.Random(combat['graine']), verifier_tirage), profil=profil)
+    except ValueError as e:
+        return False, f"divergence au {e}"
+
+    if next(tirages, None) is not None:
+        return False, "le journal contient des tirages que le rejeu n'a pas faits"
+    if next(cibles, None) is not None:
+        return False, "le journal contient des choix de cible que le rejeu n'a pas demandés"
+    tours = [(e['numero'], e['pv']) for e in evenements if e['type'] == 'tour']
+    if tours != combat['tours']:
+        return False, "les tours rejoués diffèrent du journal"
+    obtenu = {'victoire': victoire, 'tours': len(tours), 'pv': personnage['points_de_vie_actuels']}
+    if obtenu != combat['fin']:
+        return False, f"issue rejouée {obtenu}, le journal donne {combat['fin']}"
+    return True, f"conforme ({'victoire' if victoire else 'défaite'}, {obtenu['pv']} PV)"
+
+def main():
+    """Point d'entrée en ligne de commande : rejoue et vérifie les combats d'un journal"""
+    # Importé ici : le jeu importe ce module à chaque lancement, argparse ne
+    # sert qu'à la ligne de commande
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Rejoue et vérifie les combats d'un journal")
+    parser.add_argument('fichier', nargs='?', default=FICHIER_PAR_DEFAUT)
+    parser.add_argument('--combat', type=int, help="ne rejouer que ce combat (numéro à partir de 1)")
+    args = parser.parse_args()
+
+    try:
+        combats = lire_combats(args.fichier)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    numeros = range(1, len(combats) + 1)
+    if args.combat is not None:
+        if not 1 <= args.combat <= len(combats):
+            parser.error(f"--combat doit être entre 1 et {len(combats)}")
+        numeros = [args.combat]
+
+    divergents = 0
+    for numero in numeros:
+        combat = combats[numero - 1]
+        conforme, message = rejouer_combat(combat)
+        divergents += not conforme
+        print(f"Combat {numero} ({combat['textes'].get('personnage', '?')}, "
+              f"{combat['textes'].get('mission', '?')}) : {message}")
+
+    taille = os.path.getsize(args.fichier)
+    print(f"{len(numeros)} combat(s) rejoué(s), {divergents} divergent(s) ; "
+          f"journal de {taille} octets ({taille // max(len(combats), 1)} par combat)")
+    if divergents:
+        raise SystemExit(1)
+
+_valeur = os.environ.get(VARIABLE_ACTIVATION)
+if _valeur:
+    activer(FICHIER_PAR_DEFAUT if _valeur == '1' else _valeur)
+
+if __name__ == "__main__":
+    main()
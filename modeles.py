@@ -0,0 +1,215 @@
+from collections.abc import MutableMapping
+from dataclasses import dataclass, fields
+from functools import cache
+from typing import Optional
+
+# ===============================================
+# MODÈLES COMPACTS (PERSONNAGE, MONSTRE, ATTAQUE, OBJET, COMBATTANT)
+# ===============================================
+# Les fichiers JSON donnent des dictionnaires. Ces classes à __slots__ en sont
+# la version typée et compacte : pas de dictionnaire par instance, accès aux
+# champs par attribut. Le registre range les entrées des catalogues
+# (monstres, attaques, boutique) dans ces modèles, et la partie en cours
+# garde son personnage dans un Personnage.
+#
+# Un modèle se lit et se modifie aussi comme le dictionnaire JSON d'origine
+# (modele['nom'], .get(), in, .items()...) : le reste du jeu n'a pas à
+# changer. Un champ absent du JSON vaut None et n'apparaît pas comme clé.
+# Les autres clés (champs inconnus, données de travail du personnage en "_")
+# vont dans `autres`, un dictionnaire créé seulement s'il sert.
+#
+# depuis_dict() / vers_dict() passent d'une forme à l'autre sans rien perdre
+# (vers_dict() laisse de côté les données de travail, comme la sauvegarde).
+#
+# Combattant est l'instance d'un monstre pendant un combat : seulement ce dont
+# le moteur a besoin (nom, PV, initiative, effets en cours).
+
+@cache
+def _noms_champs(classe):
+    """Retourne les noms des champs d'un modèle, sans `autres`"""
+    return frozenset(champ.name for champ in fields(classe) if champ.name != 'autres')
+
+class _Modele(MutableMapping):
+    """Accès « dictionnaire » commun aux modèles des fichiers JSON"""
+    __slots__ = ()
+
+    @classmethod
+    def depuis_dict(cls, donnees):
+        """Construit un modèle à partir d'un dictionnaire (champs inconnus dans `autres`)"""
+        if 'autres' not in donnees:
+            try:
+                # Cas courant au chargement d'un catalogue : rien que des champs connus
+                return cls(**donnees)
+            except TypeError:
+                pass
+        noms = _noms_champs(cls)
+        modele = cls(**{nom: valeur for nom, valeur in donnees.items() if nom in noms})
+        autres = {cle: valeur for cle, valeur in donnees.items() if cle not in noms}
+        if autres:
+            modele.autres = autres
+        return modele
+
+    def vers_dict(self):
+        """Retourne le dictionnaire JSON du modèle (sans les clés en "_")"""
+        return {cle: valeur for cle, valeur in self.items() if not cle.startswith('_')}
+
+    def __getitem__(self, cle):
+        if cle in _noms_champs(type(self)):
+            valeur = getattr(self, cle)
+            if valeur is not None:
+                return valeur
+        elif self.autres is not None:
+            return self.autres[cle]
+        raise KeyError(cle)
+
+    def get(self, cle, defaut=None):
+        if cle in _noms_champs(type(self)):
+            valeur = getattr(self, cle)
+            return defaut if valeur is None else valeur
+        if self.autres is not None:
+            return self.autres.get(cle, defaut)
+        return defaut
+
+    def __contains__(self, cle):
+        if cle in _noms_champs(type(self)):
+            return getattr(self, cle) is not None
+        return self.autres is not None and cle in self.autres
+
+    def __setitem__(self, cle, valeur):
+        if cle in _noms_champs(type(self)):
+            setattr(self, cle, valeur)
+        elif self.autres is None:
+            self.autres = {cle: valeur}
+        else:
+            self.autres[cle] = valeur
+
+    def __delitem__(self, cle):
+        if cle not in self:
+            raise KeyError(cle)
+        if cle in _noms_champs(type(self)):
+            setattr(self, cle, None)
+        else:
+            del self.autres[cle]
+
+    def __iter__(self):
+        for champ in fields(self):
+            if champ.name != 'autres' and getattr(self, champ.name) is not None:
+                yield champ.name
+        if self.autres is not None:
+            yield from self.autres
+
+    def __len__(self):
+        return sum(1 for _cle in self)
+
+    def copy(self):
+        """Copie superficielle, comme dict.copy()"""
+        return type(self).depuis_dict(self)
+
+# -----------------------------------------------
+# Catalogues
+# -----------------------------------------------
+
+@dataclass(slots=True, eq=False)
+class Attaque(_Modele):
+    """Attaque du catalogue (attaques.json)"""
+    nom: str
+    type: Optional[str] = None
+    degats: Optional[int] = None
+    precision: Optional[int] = None
+    element: Optional[str] = None
+    description: Optional[str] = None
+    effet: Optional[str] = None
+    autres: Optional[dict] = None
+
+@dataclass(slots=True, eq=False)
+class Monstre(_Modele):
+    """Monstre du catalogue (monstres.json)"""
+    nom: str
+    pvies: Optional[int] = None
+    attaque1: Optional[str] = None
+    attaque2: Optional[str] = None
+    attaque3: Optional[str] = None
+    initiative: Optional[int] = None
+    pieces_or: Optional[int] = None
+    pts_experience: Optional[int] = None
+    element: Optional[str] = None
+    capturable: Optional[bool] = None
+    autres: Optional[dict] = None
+
+    @property
+    def attaques(self):
+        """Noms des attaques du monstre (sans les emplacements vides)"""
+        return tuple(nom for nom in (self.attaque1, self.attaque2, self.attaque3) if nom)
+
+@dataclass(slots=True, eq=False)
+class Objet(_Modele):
+    """Objet complet : entrée de la boutique (boutique.json) ou pile d'inventaire complétée"""
+    nom: str
+    type: Optional[str] = None
+    prix: Optional[int] = None
+    stats: Optional[dict] = None
+    description: Optional[str] = None
+    slot: Optional[str] = None
+    quantite: Optional[int] = None
+    porte: Optional[bool] = None
+    autres: Optional[dict] = None
+
+    @classmethod
+    def depuis_entree(cls, entree):
+        """Construit l'objet d'une pile d'inventaire, complétée par le catalogue"""
+        # Importé ici : regles lit la boutique par le registre
+        from regles import details_objet
+        return cls.depuis_dict(dict(details_objet(entree)))
+
+# -----------------------------------------------
+# Personnage
+# -----------------------------------------------
+
+@dataclass(slots=True, eq=False)
+class Personnage(_Modele):
+    """Personnage de la partie en cours
+
+    L'inventaire reste la liste des piles de la sauvegarde (voir regles) ;
+    Objet.depuis_entree donne la version complète d'une pile. Les données de
+    travail (équipement porté, cache des statistiques...) vont dans `autres`.
+    """
+    nom: str
+    classe: Optional[str] = None
+    attributs: Optional[dict] = None
+    total_points: Optional[int] = None
+    type_creation: Optional[str] = None
+    experience: Optional[int] = None
+    pieces_or: Optional[int] = None
+    inventaire: Optional[list] = None
+    missions_terminees: Optional[list] = None
+    points_de_vie_actuels: Optional[int] = None
+    autres: Optional[dict] = None
+
+    def objets(self):
+        """Retourne les piles de l'inventaire sous forme d'Objet complets"""
+        return [Objet.depuis_entree(entree) for entree in self.inventaire or ()]
+
+# -----------------------------------------------
+# Combat
+# -----------------------------------------------
+
+@dataclass(slots=True)
+class Combattant:
+    """Monstre engagé dans un combat (une instance par monstre de la mission)"""
+    nom: str
+    pvies: int
+    vivant: bool = True
+    initiative: int = 0
+    pv_max: Optional[int] = None
+    # Effets en cours sur le monstre : code -> [valeur, tours restants] (None sans effet)
+    effets: Optional[dict] = None
+
+    def __post_init__(self):
+        if self.pv_max is None:
+            self.pv_max = self.pvies
+
+    @classmethod
+    def depuis_monstre(cls, monstre, numero):
+        """Crée le combattant n° `numero` d'un monstre du catalogue (dictionnaire ou Monstre)"""
+        return cls(f"{monstre['nom']}{numero}", monstre['pvies'],
+                   initiative=monstre.get('initiative', 0))
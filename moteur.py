@@ -0,0 +1,416 @@
+import json
+import random
+import time
+
+import instrumentation
+from modeles import Combattant
+from ordonnanceur import FileInitiative, RANG_PERSONNAGE
+
+from regles import (calculer_stats_personnage, champ_objet, sortir_de_pile, porter_objet,
+                    ranger_dans_pile, objets_portes, retirer_objet, ajouter_objet,
+                    enlever_objet, modele_objet, terminer_mission, elements_personnage)
+from elements import affinites, affinites_combat, appliquer_affinite, SANS_AFFINITE
+from simulation import TOURS_MAX_MISSION, trouver_monstre
+from table_attaques import (table_monstre, preparer_attaques, initiative_effective, user_effets,
+                            EFFETS_DEGATS_PAR_TOUR, EFFET_PARALYSIE, NOMS_EFFETS,
+                            MODE_SOIN, MODE_SANS_DEGATS, MODE_JET)
+
+# ===============================================
+# MOTEUR DU JEU (COMMANDES ET ÉVÉNEMENTS)
+# ===============================================
+# Les actions du jeu (combat, achat, vente, équipement, repos) sont des
+# commandes qui modifient le personnage et décrivent ce qui s'est passé par
+# une liste d'événements : des dictionnaires {'type': ..., autres champs}.
+# Le moteur n'affiche rien et ne demande rien. La console (Donjonreplit.py)
+# affiche les événements ; un simulateur ou un serveur peut les ignorer ou
+# les transmettre tels quels.
+#
+# Événements du combat :
+#   combat_debut        mission
+#   monstre_inconnu     nom
+#   statistiques        pv, pv_max, attaque, defense, initiative
+#   monstres            monstres [(nom, pv)]
+#   affinite            element, pourcentage (arme du personnage contre l'élément
+#                       du monstre, seulement si elle n'est pas de 100 %)
+#   tour                numero, pv, monstres [(nom, pv)] encore en vie
+#   cible_invalide      (la cible choisie n'existe pas : premier monstre)
+#   degats_effet        effet, degats, pv, tours_restants (poison... quand le personnage joue)
+#   personnage_paralyse tours_restants (le personnage perd son attaque)
+#   attaque_personnage  cible, degats, pv_cible
+#   monstre_vaincu      monstre
+#   attaque_monstre     monstre, attaque, degats, pv
+#   attaque_ratee       monstre, attaque
+#   soin_monstre        monstre, attaque, soin, pv_monstre
+#   effet_applique      monstre, attaque, effet, valeur, tours, sur_lanceur
+#                       (sur_lanceur : le monstre lui-même, sinon le personnage)
+#   fuite_monstres
+#   mission_reussie     mission, xp, pieces_or, experience, total_or
+#   mission_echouee     mission, vaincus, total
+# Événements des autres commandes :
+#   objet_achete        nom, prix
+#   or_insuffisant      prix, pieces_or
+#   objet_vendu         nom, prix
+#   objet_invendable    nom
+#   objet_introuvable   nom
+#   objet_equipe        nom
+#   objet_non_equipable nom
+#   objet_desequipe     nom, remplace (True si retiré pour faire place à un autre)
+#   objet_non_porte     nom
+#   personnage_mort
+#   pv_deja_au_maximum
+#   repos               pv_recupere, pv, pv_max
+
+class Evenements(list):
+    """Événements d'une commande, transmis aussi un par un à `emettre` s'il est donné"""
+
+    def __init__(self, emettre=None):
+        super().__init__()
+        self.emettre = emettre
+
+    def publier(self, type_evenement, **donnees):
+        """Ajoute un événement (et le transmet tout de suite)"""
+        evenement = {'type': type_evenement, **donnees}
+        self.append(evenement)
+        if self.emettre is not None:
+            self.emettre(evenement)
+        return evenement
+
+# -----------------------------------------------
+# Combat
+# -----------------------------------------------
+
+def _chercher_monstre(nom):
+    """Retourne le modèle de monstre, ou None (catalogue absent ou illisible)"""
+    try:
+        return trouver_monstre(nom)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+def profil_combat(personnage):
+    """Ce qui, du personnage, décide d'un combat : {'stats', 'elements'}
+
+    stats vient de calculer_stats_personnage, elements de elements_personnage.
+    """
+    return {'stats': calculer_stats_personnage(personnage),
+            'elements': elements_personnage(personnage)}
+
+@instrumentation.chronometrer('combat')
+def combattre(personnage, mission, choisir_cible=None, emettre=None, rng=random,
+              monstre=None, profil=None):
+    """Joue le combat d'une mission ; retourne (victoire, événements)
+
+    choisir_cible(monstres) reçoit les monstres encore en vie (des
+    Combattant, s'il y en a plusieurs) et retourne l'indice de la cible, ou None pour un choix
+    invalide. Sans choisir_cible, le personnage frappe le premier monstre.
+    Les tirages sont ceux de la version console : même graine, même combat.
+    profil (voir profil_combat) remplace les statistiques et les éléments
+    calculés depuis le personnage, pour rejouer un combat enregistré.
+    """
+    evenements = Evenements(emettre)
+    evenements.publier('combat_debut', mission=mission)
+
+    # Charger les données du monstre
+    monstre_template = monstre if monstre is not None else _chercher_monstre(mission['monstremission'])
+    if not monstre_template:
+        evenements.publier('monstre_inconnu', nom=mission['monstremission'])
+        return False, evenements
+
+    if profil is None:
+        profil = profil_combat(personnage)
+    stats_personnage = profil['stats']
+    evenements.publier('statistiques', pv=personnage['points_de_vie_actuels'],
+                       pv_max=stats_personnage['pv'], attaque=stats_personnage['attaque'],
+                       defense=stats_personnage['defense'],
+                       initiative=stats_personnage['initiative'])
+
+    # Créer plusieurs instances des monstres (nom, PV et état seulement)
+    monstres_combat = [Combattant.depuis_monstre(monstre_template, i + 1)
+                       for i in range(mission['monstrenombre'])]
+    evenements.publier('monstres', monstres=[(m.nom, m.pvies) for m in monstres_combat])
+
+    attaque = stats_personnage['attaque']
+    reduction = stats_personnage['defense'] // 2
+    table_affinites = affinites()
+    affinite, element_armure = affinites_combat(profil['elements'], monstre_template,
+                                                table_affinites)
+    # Attaques du monstre, avec leurs dégâts déjà calculés pour ce personnage
+    # (affinité avec l'élément de son armure, puis défense)
+    attaques_monstre = preparer_attaques(table_monstre(monstre_template), reduction, element_armure,
+                                         table_affinites)
+    nombre_attaques = len(attaques_monstre)
+    # Dégâts du personnage pour chaque tirage de randint(0, 2), affinité comprise
+    degats_personnage = tuple(max(1, appliquer_affinite(attaque - ecart, affinite))
+                              for ecart in range(3))
+    if affinite != SANS_AFFINITE:
+        evenements.publier('affinite', element=monstre_template.get('element'), pourcentage=affinite)
+
+    # Combat tour par tour : à chaque tour, le personnage et les monstres
+    # vivants jouent une fois, par initiative décroissante (ordonnanceur.py)
+    pv_personnage = personnage['points_de_vie_actuels']
+    initiative_personnage = stats_personnage['initiative']
+    # Monstres en vie, dans l'ordre de la mission (tenu à jour à chaque victoire)
+    monstres_actifs = list(monstres_combat)
+    file = FileInitiative([(initiative_personnage, RANG_PERSONNAGE, None)]
+                          + [(monstre.initiative, rang, monstre)
+                             for rang, monstre in enumerate(monstres_combat, 1)])
+    # Effets en cours sur le personnage : code -> [valeur, tours restants]
+    effets_personnage = {}
+    tour = 0
+    # Durée de chaque tour (instrumentation) : un simple test quand elle est coupée
+    mesurer_tours = instrumentation.ACTIF
+
+    while pv_personnage > 0 and monstres_actifs:
+        tour_acteur, rang, monstre = file.suivant()
+        if monstre is not None and not monstre.vivant:
+            # Monstre vaincu : il sort de la file sans jouer
+            continue
+
+        if tour_acteur != tour:
+            if mesurer_tours:
+                if tour:
+                    instrumentation.enregistrer('combat.tour', time.perf_counter() - debut_tour)
+                debut_tour = time.perf_counter()
+            tour = tour_acteur
+            # Éviter les combats infiniment longs
+            if tour > TOURS_MAX_MISSION:
+                evenements.publier('fuite_monstres')
+                monstres_actifs = []
+                break
+            evenements.publier('tour', numero=tour, pv=pv_personnage,
+                               monstres=[(m.nom, m.pvies) for m in monstres_actifs])
+
+        if rang == RANG_PERSONNAGE:
+            # Poison, brûlure... : dégâts au début de l'action du personnage
+            if effets_personnage:
+                for code in EFFETS_DEGATS_PAR_TOUR:
+                    en_cours = effets_personnage.get(code)
+                    if en_cours is not None:
+                        pv_personnage -= en_cours[0]
+                        en_cours[1] -= 1
+                        if en_cours[1] == 0:
+                            del effets_personnage[code]
+                        evenements.publier('degats_effet', effet=NOMS_EFFETS[code],
+                                           degats=en_cours[0], pv=pv_personnage,
+                                           tours_restants=en_cours[1])
+                if pv_personnage <= 0:
+                    break
+
+            paralysie = effets_personnage.get(EFFET_PARALYSIE)
+            if paralysie is not None:
+                # Le personnage perd son attaque
+                paralysie[1] -= 1
+                if paralysie[1] == 0:
+                    del effets_personnage[EFFET_PARALYSIE]
+                evenements.publier('personnage_paralyse', tours_restants=paralysie[1])
+            else:
+                # Choix de la cible
+                cible = monstres_actifs[0]
+                if len(monstres_actifs) > 1 and choisir_cible is not None:
+                    choix = choisir_cible(monstres_actifs)
+                    if choix is not None and 0 <= choix < len(monstres_actifs):
+                        cible = monstres_actifs[choix]
+                    else:
+                        evenements.publier('cible_invalide')
+
+                # Attaque du personnage
+                degats_perso = degats_personnage[rng.randint(0, 2)]
+                cible.pvies -= degats_perso
+                evenements.publier('attaque_personnage', cible=cible.nom, degats=degats_perso,
+                                   pv_cible=cible.pvies)
+
+                if cible.pvies <= 0:
+                    evenements.publier('monstre_vaincu', monstre=cible.nom)
+                    cible.vivant = False
+                    monstres_actifs.remove(cible)
+                    if not monstres_actifs:
+                        break
+
+            file.rejouer(tour, initiative_personnage, rang, None)
+            continue
+
+        # Action d'un monstre
+        nom_attaque, valeur, precision, mode, effet = (
+            attaques_monstre[rng.randrange(nombre_attaques)] if nombre_attaques > 1
+            else attaques_monstre[0])
+        if precision < 100 and rng.randrange(100) >= precision:
+            evenements.publier('attaque_ratee', monstre=monstre.nom, attaque=nom_attaque)
+            effet = None
+        elif mode == MODE_SOIN:
+            soin = min(valeur, monstre.pv_max - monstre.pvies)
+            monstre.pvies += soin
+            evenements.publier('soin_monstre', monstre=monstre.nom, attaque=nom_attaque,
+                               soin=soin, pv_monstre=monstre.pvies)
+        elif mode != MODE_SANS_DEGATS:
+            if mode == MODE_JET:
+                valeur = valeur[rng.randrange(len(valeur))]
+            pv_personnage -= valeur
+            evenements.publier('attaque_monstre', monstre=monstre.nom, attaque=nom_attaque,
+                               degats=valeur, pv=pv_personnage)
+
+        if effet is not None:
+            code, sur_lanceur, valeur_effet, duree = effet
+            if sur_lanceur:
+                if monstre.effets is None:
+                    monstre.effets = {}
+                monstre.effets[code] = [valeur_effet, duree]
+            else:
+                # Un effet déjà en cours est prolongé, pas cumulé
+                en_cours = effets_personnage.get(code)
+                if en_cours is not None:
+                    duree = max(duree, en_cours[1])
+                effets_personnage[code] = [valeur_effet, duree]
+            evenements.publier('effet_applique', monstre=monstre.nom, attaque=nom_attaque,
+                               effet=NOMS_EFFETS[code], valeur=valeur_effet, tours=duree,
+                               sur_lanceur=sur_lanceur)
+
+        if pv_personnage <= 0:
+            break
+
+        # Le bonus d'initiative en cours compte pour la place du prochain tour, puis s'use
+        file.rejouer(tour, initiative_effective(monstre), rang, monstre)
+        if monstre.effets:
+            user_effets(monstre.effets)
+
+    if mesurer_tours and tour:
+        instrumentation.enregistrer('combat.tour', time.perf_counter() - debut_tour)
+    monstres_vivants = len(monstres_actifs)
+
+    # Mettre à jour les PV actuels du personnage (victoire ou échec)
+    personnage['points_de_vie_actuels'] = pv_personnage
+
+    if monstres_vivants == 0 and pv_personnage > 0:
+        # Distribuer les récompenses et noter la mission pour ce personnage
+        personnage['experience'] += mission['xpwin']
+        personnage['pieces_or'] += mission['orwin']
+        terminer_mission(personnage, mission)
+        evenements.publier('mission_reussie', mission=mission, xp=mission['xpwin'],
+                           pieces_or=mission['orwin'], experience=personnage['experience'],
+                           total_or=personnage['pieces_or'])
+        return True, evenements
+
+    evenements.publier('mission_echouee', mission=mission,
+                       vaincus=mission['monstrenombre'] - monstres_vivants,
+                       total=mission['monstrenombre'])
+    return False, evenements
+
+# -----------------------------------------------
+# Boutique, inventaire et repos
+# -----------------------------------------------
+
+@instrumentation.chronometrer('boutique.achat')
+def acheter(personnage, objet, emettre=None):
+    """Achète un objet de la boutique (dictionnaire du catalogue ou nom)"""
+    evenements = Evenements(emettre)
+    if isinstance(objet, str):
+        nom = objet
+        objet = modele_objet(nom)
+        if objet is None:
+            evenements.publier('objet_introuvable', nom=nom)
+            return False, evenements
+
+    if personnage['pieces_or'] < objet['prix']:
+        evenements.publier('or_insuffisant', prix=objet['prix'], pieces_or=personnage['pieces_or'])
+        return False, evenements
+
+    personnage['pieces_or'] -= objet['prix']
+    # Ajouter l'objet (non porté : les statistiques en cache ne changent
+    # pas) sur la pile du même objet s'il y en a déjà une
+    ajouter_objet(personnage, objet)
+    evenements.publier('objet_achete', nom=objet['nom'], prix=objet['prix'])
+    return True, evenements
+
+@instrumentation.chronometrer('boutique.vente')
+def vendre(personnage, nom_objet, emettre=None):
+    """Vend un exemplaire d'un objet de l'inventaire à 50% de sa valeur"""
+    evenements = Evenements(emettre)
+    for objet in personnage['inventaire']:
+        if objet['nom'] == nom_objet:
+            prix = champ_objet(objet, 'prix')
+            if prix == 0:
+                evenements.publier('objet_invendable', nom=nom_objet)
+                return False, evenements
+
+            # Un objet porté est d'abord déséquipé, ce qui retire ses bonus
+            prix_vente = prix // 2
+            personnage['pieces_or'] += prix_vente
+            enlever_objet(personnage, objet)
+            evenements.publier('objet_vendu', nom=nom_objet, prix=prix_vente)
+            return True, evenements
+
+    evenements.publier('objet_introuvable', nom=nom_objet)
+    return False, evenements
+
+def equiper(personnage, nom_objet, emettre=None):
+    """Équipe un objet de l'inventaire (en retirant ce qui occupe son slot)"""
+    evenements = Evenements(emettre)
+    for objet in personnage['inventaire']:
+        if objet['nom'] == nom_objet and not objet.get('porte', False):
+            if champ_objet(objet, 'slot') == "aucun":
+                evenements.publier('objet_non_equipable', nom=nom_objet)
+                return False, evenements
+
+            # Prendre un seul exemplaire de la pile
+            objet = sortir_de_pile(personnage, objet)
+            for retire in porter_objet(personnage, objet):
+                evenements.publier('objet_desequipe', nom=retire['nom'], remplace=True)
+                ranger_dans_pile(personnage, retire)
+
+            evenements.publier('objet_equipe', nom=nom_objet)
+            return True, evenements
+
+    evenements.publier('objet_introuvable', nom=nom_objet)
+    return False, evenements
+
+def desequiper(personnage, nom_objet, emettre=None):
+    """Déséquipe un objet porté"""
+    evenements = Evenements(emettre)
+    for objet in objets_portes(personnage):
+        if objet['nom'] == nom_objet:
+            retirer_objet(personnage, objet)
+            ranger_dans_pile(personnage, objet)
+            evenements.publier('objet_desequipe', nom=nom_objet, remplace=False)
+            return True, evenements
+
+    evenements.publier('objet_non_porte', nom=nom_objet)
+    return False, evenements
+
+def se_reposer(personnage, emettre=None):
+    """Rend au personnage tous ses points de vie (sauf s'il est mort)"""
+    evenements = Evenements(emettre)
+    if personnage['points_de_vie_actuels'] <= 0:
+        evenements.publier('personnage_mort')
+        return False, evenements
+
+    pv_max = calculer_stats_personnage(personnage)['pv']
+    pv_recupere = pv_max - personnage['points_de_vie_actuels']
+    if pv_recupere <= 0:
+        evenements.publier('pv_deja_au_maximum')
+        return False, evenements
+
+    personnage['points_de_vie_actuels'] = pv_max
+    evenements.publier('repos', pv_recupere=pv_recupere, pv=pv_max, pv_max=pv_max)
+    return True, evenements
+
+# -----------------------------------------------
+# Commandes sous forme de données
+# -----------------------------------------------
+
+COMMANDES = {
+    'combattre': combattre,
+    'acheter': acheter,
+    'vendre': vendre,
+    'equiper': equiper,
+    'desequiper': desequiper,
+    'se_reposer': se_reposer,
+}
+
+def executer(personnage, commande, emettre=None):
+    """Exécute une commande {'action': ..., paramètres} ; retourne (succès, événements)
+
+    Exemple : executer(personnage, {'action': 'vendre', 'nom_objet': 'Dague'})
+    """
+    parametres = {cle: valeur for cle, valeur in commande.items() if cle != 'action'}
+    action = COMMANDES.get(commande.get('action'))
+    if action is None:
+        raise ValueError(f"Commande inconnue : {commande.get('action')}")
+    return action(personnage, emettre=emettre, **parametres)
@@ -0,0 +1,40 @@
+import heapq
+
+# ===============================================
+# ORDRE DE JEU (FILE D'INITIATIVE)
+# ===============================================
+# À chaque tour de combat, chaque combattant vivant (le personnage et les
+# monstres) joue une fois, par initiative décroissante.
+#
+# La file est un tas de (tour, -initiative, rang, combattant) : celui qui sort
+# du tas joue, puis il y est remis pour le tour suivant avec l'initiative
+# qu'il aura alors (un bonus comme "initiative +2" de Cri de Guerre compte
+# donc au tour suivant, puis disparaît). Un combattant vaincu n'est pas
+# cherché dans le tas : il est ignoré quand il en sort. Chaque action coûte
+# O(log n), même contre une horde de plusieurs centaines de monstres.
+#
+# À initiative égale, le rang départage : le personnage (rang 0) joue avant
+# les monstres, et les monstres jouent dans l'ordre de la mission (rang 1, 2...).
+
+RANG_PERSONNAGE = 0
+
+class FileInitiative:
+    """File des combattants d'un combat, par tour puis par initiative décroissante"""
+
+    def __init__(self, combattants=()):
+        """combattants : des (initiative, rang, combattant), tous au tour 1"""
+        self._tas = [(1, -initiative, rang, combattant)
+                     for initiative, rang, combattant in combattants]
+        heapq.heapify(self._tas)
+
+    def __len__(self):
+        return len(self._tas)
+
+    def suivant(self):
+        """Retire le prochain à jouer et retourne (tour, rang, combattant)"""
+        tour, _initiative, rang, combattant = heapq.heappop(self._tas)
+        return tour, rang, combattant
+
+    def rejouer(self, tour, initiative, rang, combattant):
+        """Remet au tour suivant un combattant qui vient de jouer au tour `tour`"""
+        heapq.heappush(self._tas, (tour + 1, -initiative, rang, combattant))
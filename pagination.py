@@ -0,0 +1,92 @@
+import os
+from itertools import islice
+
+from registre import registre
+from flux_json import iterer_tableau_json
+
+# ===============================================
+# PAGINATION DES LISTES
+# ===============================================
+# Une Pagination lit les entrées de sa source au fur et à mesure qu'on
+# demande des pages : la première page s'affiche sans parcourir le reste.
+# La source est une liste ou une fonction qui retourne un nouvel itérateur
+# (par exemple la lecture en flux d'un catalogue trop gros pour la mémoire).
+
+TAILLE_PAGE = 10
+
+# Au-delà de cette taille, les listes d'un catalogue sont lues en flux depuis
+# le disque au lieu de charger tout le fichier dans le registre
+TAILLE_LECTURE_EN_FLUX = 8 * 1024 * 1024
+
+class Pagination:
+    """Découpe une source d'entrées en pages lues à la demande"""
+
+    def __init__(self, source, taille_page=TAILLE_PAGE):
+        self.source = source
+        self.taille_page = taille_page
+        # Entrées déjà lues : revenir en arrière ou choisir un numéro ne
+        # relit pas la source
+        self._lues = source if isinstance(source, list) else []
+        self._iterateur = None
+        self._fin = isinstance(source, list)
+
+    def _lire_jusqu_a(self, nombre):
+        """Lit la source jusqu'à avoir `nombre` entrées (ou jusqu'à sa fin)"""
+        manquantes = nombre - len(self._lues)
+        if manquantes <= 0 or self._fin:
+            return
+        if self._iterateur is None:
+            self._iterateur = iter(self.source())
+        avant = len(self._lues)
+        self._lues.extend(islice(self._iterateur, manquantes))
+        if len(self._lues) - avant < manquantes:
+            self._fin = True
+            self._iterateur = None
+
+    def page(self, numero):
+        """Retourne les entrées de la page (numérotée à partir de 1)"""
+        debut = (numero - 1) * self.taille_page
+        # Une entrée de plus pour savoir s'il existe une page suivante
+        self._lire_jusqu_a(debut + self.taille_page + 1)
+        return self._lues[debut:debut + self.taille_page]
+
+    def page_suivante_existe(self, numero):
+        """Indique s'il y a des entrées après la page donnée"""
+        fin = numero * self.taille_page
+        self._lire_jusqu_a(fin + 1)
+        return len(self._lues) > fin
+
+    def entree(self, numero):
+        """Retourne l'entrée de ce numéro (à partir de 1), ou None"""
+        if numero < 1:
+            return None
+        self._lire_jusqu_a(numero)
+        if numero > len(self._lues):
+            return None
+        return self._lues[numero - 1]
+
+    def total(self):
+        """Retourne le nombre d'entrées, ou None s'il n'est pas encore connu"""
+        return len(self._lues) if self._fin else None
+
+    def total_pages(self):
+        """Retourne le nombre de pages, ou None s'il n'est pas encore connu"""
+        total = self.total()
+        if total is None:
+            return None
+        return max(1, (total + self.taille_page - 1) // self.taille_page)
+
+def source_catalogue(nom_fichier, taille_max=TAILLE_LECTURE_EN_FLUX):
+    """Retourne la source d'entrées d'un catalogue pour une Pagination
+
+    Un catalogue déjà en mémoire ou de taille raisonnable vient du registre ;
+    un fichier plus gros est lu en flux. Lève FileNotFoundError si le fichier
+    n'existe pas.
+    """
+    if registre.version(nom_fichier) is None and os.path.getsize(nom_fichier) > taille_max:
+        return lambda: iterer_tableau_json(nom_fichier)
+    return registre.obtenir(nom_fichier)
+
+def paginer_catalogue(nom_fichier, taille_page=TAILLE_PAGE):
+    """Retourne une Pagination sur les entrées d'un fichier de catalogue"""
+    return Pagination(source_catalogue(nom_fichier), taille_page)
@@ -0,0 +1,194 @@
+import copy
+import json
+import os
+
+import instrumentation
+from regles import donnees_a_sauvegarder
+
+# ===============================================
+# SAUVEGARDE DES PERSONNAGES (INSTANTANÉ + JOURNAL)
+# ===============================================
+# personnage_<nom>.json     : instantané complet, remplacé de façon atomique
+#                             (écriture dans un fichier temporaire puis rename)
+# personnage_<nom>.journal  : une ligne JSON par sauvegarde, avec seulement les
+#                             champs modifiés depuis la précédente
+#
+# Chaque ligne du journal donne la nouvelle valeur des champs (pas une
+# différence) : rejouer une ligne deux fois ne change rien. Le journal est
+# fusionné dans l'instantané tous les JOURNAL_MAX enregistrements.
+#
+# L'instantané et chaque ligne du journal portent une génération (clé
+# _generation), augmentée à chaque nouvel instantané. Au chargement, les
+# lignes d'une génération plus ancienne que l'instantané sont ignorées : elles
+# restent d'un journal qui n'a pas pu être supprimé, et l'instantané contient
+# déjà des valeurs plus récentes que les leurs.
+
+JOURNAL_MAX = 50
+
+# Données de travail gardées dans le personnage (jamais sauvegardées)
+CLE_PERSISTANCE = '_persistance'
+
+# Génération de l'instantané et des lignes du journal (0 : sauvegarde d'avant
+# les générations)
+CLE_GENERATION = '_generation'
+
+def nom_fichier_personnage(nom):
+    """Retourne le nom du fichier de sauvegarde d'un personnage"""
+    return f"personnage_{nom.lower().replace(' ', '_')}.json"
+
+def chemin_journal(nom_fichier):
+    """Retourne le chemin du journal associé à un fichier de sauvegarde"""
+    racine, _extension = os.path.splitext(nom_fichier)
+    return racine + '.journal'
+
+def ecrire_json_atomique(chemin, donnees):
+    """Écrit un fichier JSON sans jamais laisser de fichier à moitié écrit"""
+    # Importé ici : inutile tant que rien n'est sauvegardé (démarrage plus rapide)
+    import tempfile
+    dossier = os.path.dirname(os.path.abspath(chemin))
+    descripteur, temporaire = tempfile.mkstemp(dir=dossier, prefix='.tmp_', suffix='.json')
+    try:
+        with os.fdopen(descripteur, 'w', encoding='utf-8') as fichier:
+            json.dump(donnees, fichier, ensure_ascii=False, separators=(',', ':'))
+            fichier.flush()
+            os.fsync(fichier.fileno())
+            if instrumentation.ACTIF:
+                instrumentation.compter('json.octets_ecrits', os.fstat(fichier.fileno()).st_size)
+        os.replace(temporaire, chemin)
+    except BaseException:
+        if os.path.exists(temporaire):
+            os.remove(temporaire)
+        raise
+
+def _ajouter_au_journal(chemin, enregistrement):
+    """Ajoute une ligne au journal et la force sur le disque"""
+    ligne = json.dumps(enregistrement, ensure_ascii=False, separators=(',', ':')) + '\n'
+    with open(chemin, 'a', encoding='utf-8') as fichier:
+        fichier.write(ligne)
+        fichier.flush()
+        os.fsync(fichier.fileno())
+    if instrumentation.ACTIF:
+        instrumentation.compter('json.octets_ecrits', len(ligne.encode('utf-8')))
+
+def lire_journal(chemin):
+    """Retourne (enregistrements, complet) ; une dernière ligne coupée est ignorée"""
+    enregistrements = []
+    try:
+        with open(chemin, 'r', encoding='utf-8') as fichier:
+            for ligne in fichier:
+                if instrumentation.ACTIF:
+                    instrumentation.compter('json.octets_lus', len(ligne.encode('utf-8')))
+                try:
+                    enregistrements.append(json.loads(ligne))
+                except json.JSONDecodeError:
+                    # Écriture interrompue par un arrêt brutal : rien d'utile après
+                    return enregistrements, False
+    except FileNotFoundError:
+        pass
+    return enregistrements, True
+
+def _memoriser_etat(personnage, nom_fichier, donnees, entrees_journal, generation):
+    """Garde l'état enregistré, pour ne journaliser ensuite que les changements"""
+    personnage[CLE_PERSISTANCE] = {
+        'fichier': nom_fichier,
+        'etat': copy.deepcopy(donnees),
+        'entrees_journal': entrees_journal,
+        'generation': generation,
+    }
+
+def _generation_fichier(nom_fichier):
+    """Génération de l'instantané déjà sur le disque (0 s'il est absent ou illisible)"""
+    try:
+        with open(nom_fichier, 'r', encoding='utf-8') as fichier:
+            return json.load(fichier).get(CLE_GENERATION, 0)
+    except (OSError, json.JSONDecodeError, AttributeError):
+        return 0
+
+def lire_personnage(nom_fichier):
+    """Charge un personnage : instantané puis journal rejoué
+
+    Lève FileNotFoundError ou json.JSONDecodeError si l'instantané est absent
+    ou illisible.
+    """
+    with open(nom_fichier, 'r', encoding='utf-8') as fichier:
+        personnage = json.load(fichier)
+        if instrumentation.ACTIF:
+            instrumentation.compter('json.octets_lus', os.fstat(fichier.fileno()).st_size)
+
+    generation = personnage.pop(CLE_GENERATION, 0)
+
+    journal, complet = lire_journal(chemin_journal(nom_fichier))
+    obsoletes = 0
+    for enregistrement in journal:
+        if enregistrement.pop(CLE_GENERATION, 0) < generation:
+            # Reste d'un journal d'avant l'instantané : ses valeurs sont plus anciennes
+            obsoletes += 1
+            continue
+        personnage.update(enregistrement)
+
+    # Un journal abîmé ou périmé ne doit plus recevoir de lignes : la
+    # prochaine sauvegarde écrira un instantané complet et le remplacera
+    entrees = len(journal) if complet and not obsoletes else JOURNAL_MAX
+    _memoriser_etat(personnage, nom_fichier, donnees_a_sauvegarder(personnage), entrees,
+                    generation)
+    return personnage
+
+def ecrire_instantane(personnage, nom_fichier=None):
+    """Écrit l'instantané complet et vide le journal"""
+    if nom_fichier is None:
+        nom_fichier = nom_fichier_personnage(personnage['nom'])
+    persistance = personnage.get(CLE_PERSISTANCE)
+    if persistance is not None and persistance['fichier'] == nom_fichier:
+        precedente = persistance['generation']
+    else:
+        # Personnage nouveau ou enregistré sous un autre nom : la génération
+        # doit dépasser celle du journal éventuellement laissé dans ce fichier
+        precedente = _generation_fichier(nom_fichier)
+    generation = precedente + 1
+
+    donnees = donnees_a_sauvegarder(personnage)
+    ecrire_json_atomique(nom_fichier, {**donnees, CLE_GENERATION: generation})
+    # Le journal n'est vidé qu'après le remplacement de l'instantané. En cas
+    # d'arrêt entre les deux, ses lignes sont d'une génération plus ancienne
+    # que le nouvel instantané : le chargement les ignore
+    journal = chemin_journal(nom_fichier)
+    if os.path.exists(journal):
+        os.remove(journal)
+    _memoriser_etat(personnage, nom_fichier, donnees, 0, generation)
+    return nom_fichier
+
+def enregistrer_personnage(personnage, nom_fichier=None):
+    """Enregistre les changements du personnage
+
+    Ajoute au journal les champs modifiés depuis le dernier enregistrement,
+    ou écrit un instantané complet (premier enregistrement, autre fichier,
+    ou journal trop long). Retourne le nom du fichier de sauvegarde.
+    """
+    if nom_fichier is None:
+        nom_fichier = nom_fichier_personnage(personnage['nom'])
+    persistance = personnage.get(CLE_PERSISTANCE)
+
+    if (persistance is None or persistance['fichier'] != nom_fichier
+            or persistance['entrees_journal'] >= JOURNAL_MAX
+            or not os.path.exists(nom_fichier)):
+        return ecrire_instantane(personnage, nom_fichier)
+
+    donnees = donnees_a_sauvegarder(personnage)
+    etat = persistance['etat']
+    changements = {cle: valeur for cle, valeur in donnees.items() if etat.get(cle) != valeur}
+    if any(cle not in donnees for cle in etat):
+        # Un champ a disparu : le journal ne sait pas l'exprimer
+        return ecrire_instantane(personnage, nom_fichier)
+    if not changements:
+        return nom_fichier
+
+    _ajouter_au_journal(chemin_journal(nom_fichier),
+                        {CLE_GENERATION: persistance['generation'], **changements})
+    for cle, valeur in changements.items():
+        etat[cle] = copy.deepcopy(valeur)
+    persistance['entrees_journal'] += 1
+    return nom_fichier
+
+def compacter_sauvegarde(nom_fichier):
+    """Fusionne le journal d'une sauvegarde dans son instantané"""
+    return ecrire_instantane(lire_personnage(nom_fichier), nom_fichier)
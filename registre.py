@@ -0,0 +1,84 @@
+import json
+import os
+import threading
+
+import instrumentation
+from modeles import Attaque, Monstre, Objet
+
+# ===============================================
+# REGISTRE DES DONNÉES DU JEU
+# ===============================================
+# Les catalogues (monstres, missions, attaques, boutique) sont lus une seule
+# fois puis gardés en mémoire. Le fichier n'est relu que si sa date de
+# modification ou sa taille change sur le disque.
+#
+# Les entrées des catalogues de monstres, d'attaques et de la boutique sont
+# rangées dans les modèles compacts de modeles.py (lus comme des
+# dictionnaires) : un catalogue chargé prend beaucoup moins de mémoire.
+
+# Fichier -> modèle de ses entrées
+MODELES_PAR_FICHIER = {'monstres.json': Monstre, 'attaques.json': Attaque, 'boutique.json': Objet}
+
+class RegistreDonnees:
+    """Cache en mémoire des fichiers JSON du jeu, partagé par tout le processus"""
+
+    def __init__(self):
+        # chemin absolu -> (signature du fichier, données chargées)
+        self._cache = {}
+        self._verrou = threading.Lock()
+
+    @staticmethod
+    def _signature(chemin):
+        """Retourne (date de modification, taille) du fichier"""
+        infos = os.stat(chemin)
+        return (infos.st_mtime_ns, infos.st_size)
+
+    def obtenir(self, nom_fichier):
+        """Retourne le contenu du fichier JSON, relu seulement s'il a changé
+
+        Les données renvoyées sont partagées : il ne faut pas les modifier.
+        Lève FileNotFoundError ou json.JSONDecodeError comme json.load.
+        """
+        chemin = os.path.abspath(nom_fichier)
+        with self._verrou:
+            try:
+                signature = self._signature(chemin)
+            except FileNotFoundError:
+                # Le fichier a disparu : oublier l'ancienne version
+                self._cache.pop(chemin, None)
+                raise
+
+            entree = self._cache.get(chemin)
+            if entree is not None and entree[0] == signature:
+                return entree[1]
+
+            with instrumentation.mesure('catalogue.lecture_fichier'):
+                with open(chemin, 'r', encoding='utf-8') as fichier:
+                    donnees = json.load(fichier)
+                modele = MODELES_PAR_FICHIER.get(os.path.basename(chemin))
+                if modele is not None and isinstance(donnees, list):
+                    donnees = [modele.depuis_dict(entree)
+                               if isinstance(entree, dict) and 'nom' in entree else entree
+                               for entree in donnees]
+            if instrumentation.ACTIF:
+                instrumentation.compter('json.octets_lus', signature[1])
+            self._cache[chemin] = (signature, donnees)
+            return donnees
+
+    def version(self, nom_fichier):
+        """Retourne la signature de la version actuellement en cache (ou None)"""
+        entree = self._cache.get(os.path.abspath(nom_fichier))
+        if entree is None:
+            return None
+        return entree[0]
+
+    def invalider(self, nom_fichier=None):
+        """Oublie un fichier (ou tout le cache) pour forcer une relecture"""
+        with self._verrou:
+            if nom_fichier is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(os.path.abspath(nom_fichier), None)
+
+# Registre unique utilisé par tout le jeu
+registre = RegistreDonnees()
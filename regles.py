@@ -0,0 +1,581 @@
+import bisect
+import itertools
+import json
+import math
+import os
+import random
+from collections import ChainMap
+from fractions import Fraction
+
+from registre import registre
+from index_catalogues import indexer
+
+# ===============================================
+# RÈGLES DU PERSONNAGE
+# ===============================================
+# Classes, attributs, création et statistiques de combat. Ces fonctions
+# n'affichent rien et ne demandent rien : le jeu (Donjonreplit.py) et les
+# simulations les utilisent de la même façon.
+
+# Dictionnaire des classes disponibles (lettre -> nom complet)
+dicoClasse = {"G": "Guerrier", "P": "Paladin", "B": "Barbare",
+              "D": "Druide", "V": "Voleur", "M": "Mage"}
+
+# Liste des attributs du personnage (code, nom complet)
+ATTRS = [("F", "Force"), ("H", "Habileté"), ("E", "Endurance"),
+         ("I", "Intelligence"), ("S", "Sagesse"), ("C", "Charisme")]
+
+# Règles pour les attributs
+MIN_ATTR = 1    # Minimum pour chaque attribut
+MAX_ATTR = 5    # Maximum pour chaque attribut
+TOTAL_POINTS = 18  # Total de points à répartir
+
+# ===============================================
+# CRÉATION DU PERSONNAGE
+# ===============================================
+
+# Attributs mis au maximum par generer_attributs_optimises, selon la classe
+# (indices dans ATTRS : F, H, E, I, S, C)
+ATTRIBUTS_PRINCIPAUX = {
+    "Guerrier": (0, 2),   # Force et Endurance
+    "Barbare": (0, 2),    # Force et Endurance
+    "Paladin": (5, 4),    # Charisme et Sagesse
+    "Voleur": (1, 2),     # Habileté et Endurance
+    "Druide": (4, 3),     # Sagesse et Intelligence
+    "Mage": (3, 5),       # Intelligence et Charisme
+}
+
+# -----------------------------------------------
+# Tables de répartition des attributs
+# -----------------------------------------------
+# Les attributs se répartissaient point par point : chaque point restant
+# allait à un attribut tiré au hasard parmi ceux qui n'étaient pas au
+# maximum. Ce tirage ne rend pas toutes les répartitions également probables.
+# Pour garder exactement la même loi sans refaire la boucle, la probabilité de
+# chaque répartition finale est calculée une fois (en entiers, par
+# programmation dynamique sur la boucle d'origine) ; une répartition se tire
+# ensuite d'un seul nombre aléatoire, par bisection sur les poids cumulés.
+
+# Tables déjà calculées, par répartition de départ
+_tables_attributs = {}
+
+def attributs_de_depart(classe=None):
+    """Attributs avant la répartition des points : le minimum partout, les principaux de la classe au maximum"""
+    attributs = [MIN_ATTR] * len(ATTRS)
+    for i in ATTRIBUTS_PRINCIPAUX.get(classe, ()):
+        attributs[i] = MAX_ATTR
+    return tuple(attributs)
+
+def table_attributs(depart):
+    """Retourne (répartitions, poids cumulés, poids total) pour une répartition de départ
+
+    Le poids de chaque répartition est proportionnel à sa probabilité avec
+    la distribution point par point (entiers : aucune erreur d'arrondi).
+    """
+    depart = tuple(depart)
+    table = _tables_attributs.get(depart)
+    if table is not None:
+        return table
+
+    # Poids des répartitions après chaque point, à un facteur commun près :
+    # chaque point multiplie les poids par 60 (divisible par 1 à 6 attributs
+    # possibles), puis divise par le nombre d'attributs possibles
+    commun = 60
+    poids = {depart: 1}
+    for _ in range(TOTAL_POINTS - sum(depart)):
+        suivants = {}
+        for attributs, p in poids.items():
+            possibles = [i for i in range(len(attributs)) if attributs[i] < MAX_ATTR]
+            if not possibles:
+                suivants[attributs] = suivants.get(attributs, 0) + p * commun
+                continue
+            part = p * (commun // len(possibles))
+            for i in possibles:
+                suivant = attributs[:i] + (attributs[i] + 1,) + attributs[i + 1:]
+                suivants[suivant] = suivants.get(suivant, 0) + part
+        poids = suivants
+
+    repartitions = sorted(poids)
+    diviseur = 0
+    for p in poids.values():
+        diviseur = math.gcd(diviseur, p)
+    cumules = list(itertools.accumulate(poids[r] // diviseur for r in repartitions))
+    table = (repartitions, cumules, cumules[-1])
+    _tables_attributs[depart] = table
+    return table
+
+def probabilites_attributs(classe=None):
+    """Probabilité exacte (Fraction) de chaque répartition finale : {répartition: probabilité}"""
+    repartitions, cumules, total = table_attributs(attributs_de_depart(classe))
+    precedent = 0
+    probabilites = {}
+    for repartition, cumule in zip(repartitions, cumules):
+        probabilites[repartition] = Fraction(cumule - precedent, total)
+        precedent = cumule
+    return probabilites
+
+def generer_lot_attributs(nombre, classe=None, rng=random):
+    """Crée `nombre` répartitions d'attributs d'un coup (listes de 6 valeurs)
+
+    classe : attributs optimisés pour cette classe ; None : répartition aléatoire.
+    Même loi que la distribution point par point, un tirage par répartition.
+    """
+    repartitions, cumules, total = table_attributs(attributs_de_depart(classe))
+    tirer = rng.randrange
+    return [list(repartitions[bisect.bisect_right(cumules, tirer(total))])
+            for _ in range(nombre)]
+
+def generer_attributs(rng=random):
+    """Crée des attributs aléatoires qui respectent les règles du jeu
+
+    rng permet d'utiliser un générateur random.Random à part (simulations).
+    """
+    return generer_lot_attributs(1, None, rng)[0]
+
+def generer_attributs_optimises(classe, rng=random):
+    """Crée des attributs optimisés selon la classe choisie (attributs principaux au maximum)"""
+    return generer_lot_attributs(1, classe, rng)[0]
+
+# Équipement de base porté par tout nouveau personnage
+EQUIPEMENT_DEPART = (
+    {
+        "nom": "Vêtements",
+        "type": "armure",
+        "prix": 0,
+        "stats": {"defense": 1},
+        "description": "Vêtements simples",
+        "slot": "torse",
+        "porte": True
+    },
+    {
+        "nom": "Dague",
+        "type": "arme",
+        "prix": 15,
+        "stats": {"degats": 3, "precision": 85},
+        "description": "Une dague simple mais efficace",
+        "slot": "main_droite",
+        "porte": True
+    },
+)
+
+def creer_personnage(nom, classe, type_attributs, rng=random, boutique=None):
+    """Crée un personnage complet avec tous ses détails
+
+    boutique : catalogue d'après lequel compacter l'équipement de départ
+    (celui de boutique.json par défaut, voir compacter_objet).
+    """
+    # Générer les valeurs d'attributs selon le type choisi
+    if type_attributs == "optimise":
+        valeurs_attributs = generer_attributs_optimises(classe, rng)
+    else:
+        valeurs_attributs = generer_attributs(rng)
+
+    # Créer un dictionnaire pour les attributs (plus facile à lire)
+    mes_attributs = {}
+    for i in range(len(ATTRS)):
+        nom_attribut = ATTRS[i][1]  # Prendre le nom complet
+        valeur = valeurs_attributs[i]
+        mes_attributs[nom_attribut] = valeur
+
+    # Inventaire de départ avec équipement de base (rangé en piles)
+    inventaire_depart = [compacter_objet(objet, boutique=boutique) for objet in EQUIPEMENT_DEPART]
+
+    # Créer le personnage final
+    mon_personnage = {
+        "nom": nom,
+        "classe": classe,
+        "attributs": mes_attributs,
+        "total_points": sum(valeurs_attributs),
+        "type_creation": type_attributs,
+        "experience": 0,
+        "pieces_or": 50,  # Un peu d'argent de départ
+        "inventaire": inventaire_depart,
+        "missions_terminees": [],
+        "points_de_vie_actuels": 10 + (mes_attributs.get("Endurance", 1) * 3) # Initialiser les PV actuels
+    }
+
+    return mon_personnage
+
+# ===============================================
+# STATISTIQUES DE COMBAT
+# ===============================================
+
+# Les clés qui commencent par "_" dans le personnage sont des données de
+# travail : elles ne sont jamais écrites dans la sauvegarde
+CLE_CACHE_STATS = '_stats'
+
+# Bonus d'équipement qui s'ajoutent à une statistique de base
+# (les autres bonus, comme la précision, gardent leur propre nom)
+STATS_EQUIPEMENT = {'degats': 'attaque', 'defense': 'defense'}
+
+# Statistiques toujours présentes, même sans équipement
+STATS_BASE = ('pv', 'attaque', 'defense', 'precision', 'initiative')
+
+# Mode vérification (tests) : chaque lecture du cache est comparée à un
+# calcul complet. Activable avec la variable d'environnement DONJON_VERIFIER_STATS=1
+VERIFIER_STATS = os.environ.get('DONJON_VERIFIER_STATS') == '1'
+
+def stats_de_base(personnage):
+    """Calcule les statistiques sans équipement à partir des attributs"""
+    force = personnage['attributs']['Force']
+    endurance = personnage['attributs']['Endurance']
+    habilete = personnage['attributs']['Habileté']
+
+    return {
+        'pv': 10 + (endurance * 3),
+        'attaque': 5 + force,
+        'defense': 2 + (endurance // 2),
+        'precision': 0,
+        # Ordre de jeu en combat, comparé à l'initiative des monstres (1 à 8)
+        'initiative': 1 + habilete
+    }
+
+def _appliquer_bonus(stats, bonus, signe=1):
+    """Ajoute (ou retire si signe=-1) les bonus d'un objet aux statistiques"""
+    for stat, valeur in bonus.items():
+        cle = STATS_EQUIPEMENT.get(stat, stat)
+        stats[cle] = stats.get(cle, 0) + signe * valeur
+        # Un bonus retiré ne laisse pas de statistique à zéro derrière lui
+        if stats[cle] == 0 and cle not in STATS_BASE:
+            del stats[cle]
+
+def recalculer_stats_personnage(personnage):
+    """Calcule les statistiques en parcourant tout l'inventaire (sans cache)"""
+    stats = stats_de_base(personnage)
+    for objet in personnage['inventaire']:
+        if objet.get('porte', False):
+            _appliquer_bonus(stats, champ_objet(objet, 'stats'))
+    return stats
+
+def initialiser_stats_personnage(personnage):
+    """(Re)construit le cache des statistiques du personnage"""
+    personnage[CLE_CACHE_STATS] = recalculer_stats_personnage(personnage)
+    return personnage[CLE_CACHE_STATS]
+
+def verifier_stats_personnage(personnage):
+    """Vérifie que le cache correspond à un calcul complet (lève AssertionError sinon)"""
+    attendu = recalculer_stats_personnage(personnage)
+    cache = personnage.get(CLE_CACHE_STATS)
+    if cache is not None and cache != attendu:
+        raise AssertionError(f"Cache des statistiques incohérent pour {personnage['nom']} : "
+                             f"{cache} au lieu de {attendu}")
+
+def calculer_stats_personnage(personnage):
+    """Retourne les statistiques de combat du personnage (depuis le cache)"""
+    stats = personnage.get(CLE_CACHE_STATS)
+    if stats is None:
+        stats = initialiser_stats_personnage(personnage)
+    elif VERIFIER_STATS:
+        verifier_stats_personnage(personnage)
+    return dict(stats)
+
+def donnees_a_sauvegarder(personnage):
+    """Retourne le personnage sans ses données de travail (clés en "_")"""
+    return {cle: valeur for cle, valeur in personnage.items() if not cle.startswith('_')}
+
+# ===============================================
+# ÉQUIPEMENT
+# ===============================================
+# En plus du drapeau 'porte' de chaque objet (format de sauvegarde), le
+# personnage garde une carte slot -> objet porté dans personnage['_equipement'].
+# Les conflits de slots se vérifient ainsi sans parcourir l'inventaire.
+
+CLE_EQUIPEMENT = '_equipement'
+
+# Emplacements d'équipement ("aucun" = objet qui ne se porte pas)
+SLOTS = ('tete', 'torse', 'main_droite', 'main_gauche', 'deux_mains', 'pieds')
+MAINS = ('main_droite', 'main_gauche')
+
+def slots_en_conflit(slot):
+    """Retourne les slots à libérer pour porter un objet dans ce slot"""
+    if slot == 'deux_mains':
+        return ('deux_mains',) + MAINS
+    if slot in MAINS:
+        return (slot, 'deux_mains')
+    return (slot,)
+
+def initialiser_equipement(personnage):
+    """(Re)construit la carte des objets portés à partir de l'inventaire"""
+    equipement = {}
+    for objet in personnage['inventaire']:
+        if objet.get('porte', False):
+            slot = champ_objet(objet, 'slot')
+            if slot in equipement:
+                # Sauvegarde incohérente : deux objets portés au même endroit
+                objet['porte'] = False
+                continue
+            equipement[slot] = objet
+    personnage[CLE_EQUIPEMENT] = equipement
+    # Les statistiques en cache dépendent de ce qui est porté
+    personnage.pop(CLE_CACHE_STATS, None)
+    return equipement
+
+def equipement_personnage(personnage):
+    """Retourne la carte slot -> objet porté du personnage"""
+    equipement = personnage.get(CLE_EQUIPEMENT)
+    if equipement is None:
+        equipement = initialiser_equipement(personnage)
+    return equipement
+
+def objets_portes(personnage):
+    """Retourne les objets portés, dans l'ordre des slots"""
+    equipement = equipement_personnage(personnage)
+    return [equipement[slot] for slot in SLOTS if slot in equipement]
+
+# Slots qui donnent au personnage l'élément de ses attaques et de sa défense
+# (champ facultatif 'element' de l'objet porté, Neutre sans objet ou sans élément)
+SLOTS_ELEMENT_ATTAQUE = ('deux_mains', 'main_droite')
+SLOT_ELEMENT_DEFENSE = 'torse'
+
+def elements_personnage(personnage):
+    """Retourne (élément de l'arme, élément de l'armure) du personnage (None : Neutre)"""
+    equipement = equipement_personnage(personnage)
+    element_attaque = None
+    for slot in SLOTS_ELEMENT_ATTAQUE:
+        if slot in equipement:
+            element_attaque = champ_objet(equipement[slot], 'element')
+            break
+    armure = equipement.get(SLOT_ELEMENT_DEFENSE)
+    element_defense = champ_objet(armure, 'element') if armure is not None else None
+    return element_attaque, element_defense
+
+def porter_objet(personnage, objet):
+    """Porte un objet et retourne la liste des objets retirés pour lui faire place
+
+    Met à jour la carte d'équipement et les statistiques en cache.
+    L'objet doit être seul dans sa pile (voir sortir_de_pile).
+    """
+    slot_objet = champ_objet(objet, 'slot')
+    if objet.get('porte', False) or slot_objet == "aucun":
+        return []
+    equipement = equipement_personnage(personnage)
+
+    retires = []
+    for slot in slots_en_conflit(slot_objet):
+        ancien = equipement.get(slot)
+        if ancien is not None:
+            retirer_objet(personnage, ancien)
+            retires.append(ancien)
+
+    objet['porte'] = True
+    equipement[slot_objet] = objet
+    stats = personnage.get(CLE_CACHE_STATS)
+    if stats is not None:
+        _appliquer_bonus(stats, champ_objet(objet, 'stats'))
+    return retires
+
+def retirer_objet(personnage, objet):
+    """Retire un objet porté et enlève ses bonus du cache"""
+    if not objet.get('porte', False):
+        return
+    equipement = equipement_personnage(personnage)
+    objet['porte'] = False
+    slot = champ_objet(objet, 'slot')
+    if equipement.get(slot) is objet:
+        del equipement[slot]
+    stats = personnage.get(CLE_CACHE_STATS)
+    if stats is not None:
+        _appliquer_bonus(stats, champ_objet(objet, 'stats'), -1)
+
+# ===============================================
+# INVENTAIRE EN PILES
+# ===============================================
+# Une entrée d'inventaire est une pile {"nom": ..., "quantite": n} qui renvoie
+# à l'objet du même nom dans boutique.json. L'entrée ne garde que les champs
+# qui diffèrent du catalogue (par exemple "porte") ; un objet absent du
+# catalogue garde tous ses champs. Un objet porté est toujours seul dans sa pile.
+
+# Valeurs utilisées quand ni l'entrée ni le catalogue ne donnent un champ
+DEFAUTS_OBJET = {'type': 'divers', 'prix': 0, 'stats': {}, 'description': '', 'slot': 'aucun'}
+
+# Champs propres à une pile, ignorés pour savoir si deux piles se regroupent
+CHAMPS_PILE = ('quantite', 'porte')
+
+def modele_objet(nom, boutique=None):
+    """Retourne l'objet du catalogue de la boutique portant ce nom (ou None)
+
+    boutique : liste d'objets à consulter au lieu de boutique.json (monde généré...).
+    """
+    if boutique is None:
+        try:
+            boutique = registre.obtenir('boutique.json')
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+    return indexer('boutique', boutique).chercher(nom)
+
+def details_objet(entree):
+    """Retourne une vue complète (lecture seule) d'une entrée d'inventaire"""
+    return ChainMap(entree, modele_objet(entree['nom']) or {}, DEFAUTS_OBJET)
+
+def champ_objet(entree, cle):
+    """Retourne un champ d'une entrée d'inventaire, complété par le catalogue"""
+    if cle in entree:
+        return entree[cle]
+    modele = modele_objet(entree['nom'])
+    if modele is not None and cle in modele:
+        return modele[cle]
+    return DEFAUTS_OBJET.get(cle)
+
+def quantite_objet(entree):
+    """Retourne le nombre d'exemplaires d'une pile"""
+    return entree.get('quantite', 1)
+
+def compter_objets(personnage, portes=None):
+    """Compte les exemplaires de l'inventaire (tous, portés ou non portés)"""
+    return sum(quantite_objet(entree) for entree in personnage['inventaire']
+               if portes is None or entree.get('porte', False) == portes)
+
+def compacter_objet(objet, quantite=1, boutique=None):
+    """Réduit un objet complet à une entrée de pile (champs différents du catalogue)"""
+    modele = modele_objet(objet['nom'], boutique)
+    entree = {'nom': objet['nom'], 'quantite': quantite}
+    for cle, valeur in objet.items():
+        if cle in ('nom', 'quantite'):
+            continue
+        if cle == 'porte':
+            if valeur:
+                entree['porte'] = True
+        elif modele is None or modele.get(cle) != valeur:
+            entree[cle] = valeur
+    return entree
+
+def _cle_pile(entree):
+    """Retourne une clé identique pour deux entrées qui peuvent s'empiler"""
+    return json.dumps({cle: valeur for cle, valeur in entree.items() if cle not in CHAMPS_PILE},
+                      sort_keys=True, ensure_ascii=False)
+
+def _trouver_pile(personnage, entree):
+    """Retourne la pile non portée où ranger cette entrée, ou None"""
+    cle = _cle_pile(entree)
+    for pile in personnage['inventaire']:
+        if pile is not entree and not pile.get('porte', False) and pile['nom'] == entree['nom'] \
+                and _cle_pile(pile) == cle:
+            return pile
+    return None
+
+def _retirer_entree(personnage, entree):
+    """Enlève une entrée de l'inventaire (par identité, pas par égalité)"""
+    inventaire = personnage['inventaire']
+    for i, pile in enumerate(inventaire):
+        if pile is entree:
+            del inventaire[i]
+            return
+
+def ajouter_objet(personnage, objet, quantite=1):
+    """Ajoute des exemplaires non portés d'un objet, sur une pile existante si possible"""
+    entree = compacter_objet(objet, quantite)
+    entree.pop('porte', None)
+    pile = _trouver_pile(personnage, entree)
+    if pile is not None:
+        pile['quantite'] = quantite_objet(pile) + quantite
+        return pile
+    personnage['inventaire'].append(entree)
+    return entree
+
+def enlever_objet(personnage, entree, quantite=1):
+    """Enlève des exemplaires d'une pile (la pile disparaît à zéro)"""
+    if entree.get('porte', False):
+        retirer_objet(personnage, entree)
+    reste = quantite_objet(entree) - quantite
+    if reste > 0:
+        entree['quantite'] = reste
+    else:
+        _retirer_entree(personnage, entree)
+
+def sortir_de_pile(personnage, entree):
+    """Sépare un exemplaire d'une pile et le retourne (pour le porter)"""
+    if quantite_objet(entree) <= 1:
+        return entree
+    entree['quantite'] = quantite_objet(entree) - 1
+    seul = dict(entree)
+    seul['quantite'] = 1
+    personnage['inventaire'].append(seul)
+    return seul
+
+def ranger_dans_pile(personnage, entree):
+    """Remet un objet non porté sur une pile identique s'il y en a une"""
+    if entree.get('porte', False):
+        return entree
+    pile = _trouver_pile(personnage, entree)
+    if pile is None:
+        return entree
+    pile['quantite'] = quantite_objet(pile) + quantite_objet(entree)
+    _retirer_entree(personnage, entree)
+    return pile
+
+def migrer_inventaire(personnage):
+    """Convertit un ancien inventaire (un dictionnaire complet par objet) en piles
+
+    Retourne True si l'inventaire a été modifié.
+    """
+    inventaire = personnage['inventaire']
+    if all('quantite' in entree for entree in inventaire):
+        return False
+
+    piles = []
+    piles_par_cle = {}
+    for objet in inventaire:
+        entree = dict(objet) if 'quantite' in objet else compacter_objet(objet)
+        if entree.get('porte', False):
+            # Un objet porté reste seul (une pile par exemplaire)
+            for _ in range(quantite_objet(entree)):
+                seul = dict(entree)
+                seul['quantite'] = 1
+                piles.append(seul)
+            continue
+        cle = (entree['nom'], _cle_pile(entree))
+        pile = piles_par_cle.get(cle)
+        if pile is None:
+            piles_par_cle[cle] = entree
+            piles.append(entree)
+        else:
+            pile['quantite'] += quantite_objet(entree)
+
+    personnage['inventaire'] = piles
+    personnage.pop(CLE_EQUIPEMENT, None)
+    personnage.pop(CLE_CACHE_STATS, None)
+    return True
+
+# ===============================================
+# MISSIONS TERMINÉES
+# ===============================================
+# Chaque personnage garde la liste triée des noms de missions qu'il a
+# réussies (personnage['missions_terminees'], format de sauvegarde) et un
+# ensemble pour les tests d'appartenance (personnage['_missions']).
+# missions.json n'est jamais modifié par le jeu.
+
+CLE_MISSIONS = '_missions'
+
+def initialiser_missions(personnage):
+    """(Re)construit l'ensemble des missions réussies à partir de la sauvegarde"""
+    terminees = sorted(set(personnage.get('missions_terminees', [])))
+    personnage['missions_terminees'] = terminees
+    personnage[CLE_MISSIONS] = set(terminees)
+    return personnage[CLE_MISSIONS]
+
+def missions_terminees(personnage):
+    """Retourne l'ensemble des noms de missions réussies par le personnage"""
+    terminees = personnage.get(CLE_MISSIONS)
+    if terminees is None:
+        terminees = initialiser_missions(personnage)
+    return terminees
+
+def mission_terminee(personnage, mission):
+    """Indique si le personnage a déjà réussi cette mission"""
+    return mission['nom'] in missions_terminees(personnage)
+
+def terminer_mission(personnage, mission):
+    """Note une mission réussie ; retourne False si elle l'était déjà"""
+    terminees = missions_terminees(personnage)
+    if mission['nom'] in terminees:
+        return False
+    terminees.add(mission['nom'])
+    bisect.insort(personnage['missions_terminees'], mission['nom'])
+    return True
+
+def mission_disponible(personnage, mission):
+    """Indique si le personnage peut lancer cette mission (classe, XP, déjà faite)"""
+    classe_ok = (mission['classe'] == 'tous' or mission['classe'] == personnage['classe'])
+    niveau_ok = personnage['experience'] >= mission['niveauxp']
+    pas_faite = mission['repetable'] or not mission_terminee(personnage, mission)
+    return classe_ok and niveau_ok and pas_faite
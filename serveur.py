@@ -0,0 +1,183 @@
+import argparse
+import asyncio
+import builtins
+import contextvars
+import queue
+import sys
+import threading
+
+import Donjonreplit as jeu
+
+# ===============================================
+# SERVEUR DE JEU (TCP, UNE LIGNE PAR COMMANDE)
+# ===============================================
+# Chaque connexion joue sa propre partie : les menus du jeu tournent dans un
+# fil d'exécution de la session, et leurs print()/input() passent par la
+# connexion au lieu du terminal. sys.stdout est remplacé par un aiguillage
+# qui écrit vers la session du fil courant (variable de contexte) : les
+# affichages de tous les modules (moteur, journal des combats,
+# instrumentation...) vont au bon joueur. La boucle asyncio ne fait que lire les
+# lignes des joueurs et envoyer les textes : elle ne bloque jamais.
+# Les catalogues sont chargés une seule fois (registre partagé).
+#
+# Essai en local :  python serveur.py --port 8765   puis   nc localhost 8765
+
+HOTE = '127.0.0.1'
+PORT = 8765
+
+# Les menus n'ont pas besoin d'une grosse pile : plus de parties par processus
+TAILLE_PILE_SESSION = 512 * 1024
+
+# Longueur maximale d'une ligne envoyée par un joueur
+TAILLE_LIGNE_MAX = 4096
+
+# Marque la déconnexion du joueur dans la file de ses lignes
+_FIN = None
+
+# Session jouée par le fil courant (None : pas de session, le terminal)
+_session_courante = contextvars.ContextVar('session', default=None)
+
+class Session:
+    """Partie d'un joueur connecté"""
+
+    def __init__(self, boucle, writer):
+        self.boucle = boucle
+        self.writer = writer
+        # Lignes reçues du joueur, lues par le fil de la partie
+        self.entrees = queue.Queue()
+        # Texte affiché par la partie depuis le dernier envoi
+        self._sortie = []
+
+    def ecrire(self, texte):
+        """Ajoute du texte à envoyer au joueur (envoyé à la prochaine question)"""
+        self._sortie.append(texte)
+
+    def envoyer(self):
+        """Envoie au joueur le texte en attente (appelé depuis le fil de la partie)"""
+        if self._sortie:
+            donnees = ''.join(self._sortie).encode('utf-8')
+            self._sortie.clear()
+            self.boucle.call_soon_threadsafe(self._ecrire_connexion, donnees)
+
+    def _ecrire_connexion(self, donnees):
+        """Écrit sur la connexion (dans la boucle asyncio)"""
+        if not self.writer.is_closing():
+            self.writer.write(donnees)
+
+    def lire_ligne(self, invite=''):
+        """Pose une question au joueur et attend sa réponse
+
+        Lève EOFError si le joueur s'est déconnecté, comme input() en fin de
+        fichier.
+        """
+        self.ecrire(invite)
+        self.envoyer()
+        ligne = self.entrees.get()
+        if ligne is _FIN:
+            raise EOFError("Joueur déconnecté")
+        return ligne
+
+    def jouer(self):
+        """Joue la partie (dans le fil de la session) jusqu'à la fin ou la déconnexion"""
+        _session_courante.set(self)
+        try:
+            jeu.menu_principal()
+        except EOFError:
+            pass
+        except Exception as e:
+            # Une erreur dans une partie ne doit pas arrêter le serveur
+            self.ecrire(f"Erreur interne : {e}\n")
+        finally:
+            self.envoyer()
+            self.boucle.call_soon_threadsafe(self.writer.close)
+
+# -----------------------------------------------
+# print()/input() redirigés vers la session du fil courant
+# -----------------------------------------------
+
+class SortieSessions:
+    """sys.stdout partagé : écrit vers la session du fil courant, sinon vers le terminal"""
+
+    def __init__(self, terminal):
+        self.terminal = terminal
+
+    def write(self, texte):
+        session = _session_courante.get()
+        if session is None:
+            return self.terminal.write(texte)
+        session.ecrire(texte)
+        return len(texte)
+
+    def flush(self):
+        # Le texte d'une session part à la prochaine question
+        if _session_courante.get() is None:
+            self.terminal.flush()
+
+def input_session(invite=''):
+    """input() qui lit une ligne du joueur de la session courante (sinon le clavier)"""
+    session = _session_courante.get()
+    if session is None:
+        return builtins.input(invite)
+    return session.lire_ligne(str(invite))
+
+def installer_console(module):
+    """Fait passer les print() de tous les modules et les input() d'un module par la session courante"""
+    if not isinstance(sys.stdout, SortieSessions):
+        sys.stdout = SortieSessions(sys.stdout)
+    module.input = input_session
+
+# -----------------------------------------------
+# Boucle asyncio
+# -----------------------------------------------
+
+async def servir_joueur(reader, writer):
+    """Gère une connexion : démarre sa partie puis lui transmet les lignes reçues"""
+    session = Session(asyncio.get_running_loop(), writer)
+    fil = threading.Thread(target=session.jouer, daemon=True)
+    fil.start()
+    try:
+        while True:
+            try:
+                ligne = await reader.readline()
+            except (ValueError, ConnectionError):
+                # Ligne trop longue ou connexion coupée
+                break
+            if not ligne:
+                break
+            session.entrees.put(ligne.decode('utf-8', 'replace').rstrip('\r\n'))
+            await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        session.entrees.put(_FIN)
+
+async def lancer_serveur(hote=HOTE, port=PORT):
+    """Démarre le serveur et retourne l'objet asyncio.Server"""
+    installer_console(jeu)
+    # Charger et vérifier les catalogues une fois pour toutes les parties
+    jeu.verifier_catalogues()
+    return await asyncio.start_server(servir_joueur, hote, port, limit=TAILLE_LIGNE_MAX)
+
+async def _servir(hote, port):
+    """Sert les joueurs jusqu'à l'arrêt du processus"""
+    serveur = await lancer_serveur(hote, port)
+    adresses = ', '.join(str(socket.getsockname()) for socket in serveur.sockets)
+    print(f"Serveur de jeu à l'écoute sur {adresses}")
+    async with serveur:
+        await serveur.serve_forever()
+
+def main():
+    """Point d'entrée en ligne de commande"""
+    parser = argparse.ArgumentParser(description="Serveur de jeu multi-joueurs (TCP)")
+    parser.add_argument('--hote', default=HOTE)
+    parser.add_argument('--port', type=int, default=PORT)
+    args = parser.parse_args()
+
+    threading.stack_size(TAILLE_PILE_SESSION)
+    try:
+        asyncio.run(_servir(args.hote, args.port))
+    except KeyboardInterrupt:
+        print("Serveur arrêté")
+
+if __name__ == "__main__":
+    main()
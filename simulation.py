@@ -0,0 +1,279 @@
+import random
+from collections import Counter
+
+from registre import registre
+from index_catalogues import indexer
+from ordonnanceur import FileInitiative, RANG_PERSONNAGE
+from elements import affinites_combat, appliquer_affinite, NEUTRE, SANS_AFFINITE
+from table_attaques import (table_monstre, preparer_attaques, user_effets, ATTAQUE_DE_BASE,
+                            EFFETS_DEGATS_PAR_TOUR, EFFET_PARALYSIE, EFFET_INITIATIVE,
+                            MODE_SOIN, MODE_SANS_DEGATS, MODE_JET)
+
+# ===============================================
+# SIMULATION DE COMBATS SANS AFFICHAGE
+# ===============================================
+# Mêmes règles que commencer_combat et simuler_combat_simple, mais sans
+# print() ni input() : on peut enchaîner des millions de combats pour
+# équilibrer missions.json.
+#
+# Règles reprises du jeu (moteur.combattre) :
+#   - dégâts du personnage : attaque - randint(0, 2), multipliés par l'affinité
+#     de son arme avec l'élément du monstre (elements.py), au moins 1
+#   - chaque monstre joue une de ses attaques (table_attaques.py) : précision,
+#     dégâts selon le type, effets (poison, brûlure, paralysie, initiative)
+#   - à chaque tour, le personnage et les monstres jouent par initiative
+#     décroissante (ordonnanceur.py), le personnage d'abord en cas d'égalité
+#   - le personnage frappe le premier monstre encore en vie
+#   - mission : au-delà de 30 tours les monstres fuient (compté comme réussite)
+#   - combat simple : dégâts des monstres max(1, randint(2, 6) - defense // 2) ;
+#     au-delà de 20 tours, match nul tiré à pile ou face
+
+# Issues possibles d'un combat
+VICTOIRE = 'victoire'
+DEFAITE = 'defaite'
+FUITE = 'fuite'
+
+TOURS_MAX_MISSION = 30
+TOURS_MAX_SIMPLE = 20
+
+def preparer_combat(stats_personnage, attaques=None, affinite=SANS_AFFINITE, element_armure=NEUTRE):
+    """Retourne ce qui ne change pas d'un combat à l'autre contre ce monstre
+
+    (dégâts du personnage pour chaque tirage de randint(0, 2), attaques du
+    monstre préparées par table_attaques.preparer_attaques). attaques est la
+    table compilée du monstre (table_attaques.table_monstre) ; sans table,
+    les monstres n'ont que l'attaque de base. affinite est le multiplicateur
+    (%) de l'arme du personnage contre ce monstre, element_armure le code
+    de l'élément de son armure.
+    """
+    degats_personnage = tuple(max(1, appliquer_affinite(stats_personnage['attaque'] - ecart, affinite))
+                              for ecart in range(3))
+    return degats_personnage, preparer_attaques(attaques or (ATTAQUE_DE_BASE,),
+                                                stats_personnage['defense'] // 2, element_armure)
+
+def resoudre_combat(stats_personnage, pv_depart, pv_monstre, nombre_monstres, rng,
+                    tours_max=TOURS_MAX_MISSION, attaques=None, initiative_monstre=0,
+                    affinite=SANS_AFFINITE, element_armure=NEUTRE, prepare=None):
+    """Joue un combat de mission et retourne (issue, tours, pv_restants)
+
+    attaques, affinite et element_armure sont ceux de preparer_combat ;
+    prepare est son résultat, à calculer une fois pour une série de combats.
+    L'ordre de jeu est celui du moteur (ordonnanceur.py).
+    """
+    # randrange(n) tire comme randint(0, n - 1) : même suite qu'avec le moteur
+    tirage = rng.randrange
+    initiative_personnage = stats_personnage['initiative']
+    if prepare is None:
+        prepare = preparer_combat(stats_personnage, attaques, affinite, element_armure)
+    degats_personnage, attaques = prepare
+    nombre_attaques = len(attaques)
+
+    pv_personnage = pv_depart
+    # Les monstres tombent dans l'ordre : seul le premier vivant a des PV entamés
+    pv_cible = pv_monstre
+    monstres_vivants = nombre_monstres
+    # Effets en cours : sur le personnage, et sur chaque monstre (par numéro)
+    effets = {}
+    effets_monstres = {}
+    # Dans la file, chaque monstre est représenté par son numéro
+    file = FileInitiative([(initiative_personnage, RANG_PERSONNAGE, None)]
+                          + [(initiative_monstre, numero + 1, numero)
+                             for numero in range(nombre_monstres)])
+
+    while True:
+        tour, rang, numero = file.suivant()
+        if tour > tours_max:
+            # Éviter les combats infiniment longs
+            return FUITE, tours_max, pv_personnage
+
+        if rang == RANG_PERSONNAGE:
+            # Poison, brûlure... quand le personnage joue
+            if effets:
+                for code in EFFETS_DEGATS_PAR_TOUR:
+                    en_cours = effets.get(code)
+                    if en_cours is not None:
+                        pv_personnage -= en_cours[0]
+                        en_cours[1] -= 1
+                        if en_cours[1] == 0:
+                            del effets[code]
+                if pv_personnage <= 0:
+                    return DEFAITE, tour, 0
+
+            paralysie = effets.get(EFFET_PARALYSIE)
+            if paralysie is not None:
+                paralysie[1] -= 1
+                if paralysie[1] == 0:
+                    del effets[EFFET_PARALYSIE]
+            else:
+                # Attaque du personnage sur le premier monstre vivant
+                pv_cible -= degats_personnage[tirage(3)]
+                if pv_cible <= 0:
+                    monstres_vivants -= 1
+                    if monstres_vivants == 0:
+                        return VICTOIRE, tour, pv_personnage
+                    pv_cible = pv_monstre
+
+            file.rejouer(tour, initiative_personnage, rang, None)
+            continue
+
+        premier = nombre_monstres - monstres_vivants
+        if numero < premier:
+            # Monstre vaincu : il sort de la file sans jouer
+            continue
+
+        _nom, valeur, precision, mode, effet = (
+            attaques[tirage(nombre_attaques)] if nombre_attaques > 1 else attaques[0])
+        if precision < 100 and tirage(100) >= precision:
+            effet = None
+        elif mode == MODE_SOIN:
+            # Seul le monstre visé a perdu des PV
+            if numero == premier:
+                pv_cible = min(pv_monstre, pv_cible + valeur)
+        elif mode != MODE_SANS_DEGATS:
+            if mode == MODE_JET:
+                valeur = valeur[tirage(len(valeur))]
+            pv_personnage -= valeur
+
+        if effet is not None:
+            code, sur_lanceur, valeur_effet, duree = effet
+            if sur_lanceur:
+                effets_monstres.setdefault(numero, {})[code] = [valeur_effet, duree]
+            else:
+                en_cours = effets.get(code)
+                if en_cours is not None:
+                    duree = max(duree, en_cours[1])
+                effets[code] = [valeur_effet, duree]
+
+        if pv_personnage <= 0:
+            return DEFAITE, tour, 0
+
+        # Le bonus d'initiative en cours compte pour la place du prochain tour, puis s'use
+        effets_monstre = effets_monstres.get(numero)
+        file.rejouer(tour, initiative_monstre + _bonus_initiative(effets_monstre), rang, numero)
+        if effets_monstre:
+            user_effets(effets_monstre)
+
+def _bonus_initiative(effets_monstre):
+    """Bonus d'initiative en cours d'un monstre (0 sans bonus)"""
+    if effets_monstre:
+        bonus = effets_monstre.get(EFFET_INITIATIVE)
+        if bonus is not None:
+            return bonus[0]
+    return 0
+
+def resoudre_combat_simple(stats_personnage, monstre, rng, tours_max=TOURS_MAX_SIMPLE):
+    """Joue un combat un contre un (règles de simuler_combat_simple), retourne (victoire, tours)"""
+    # randrange(n) tire comme randint(0, n - 1) : même suite qu'avec le moteur
+    tirage = rng.randrange
+    attaque = stats_personnage['attaque']
+    reduction = stats_personnage['defense'] // 2
+    pv_personnage = stats_personnage['pv']
+    pv_monstre = monstre['pvies']
+
+    tour = 1
+    while pv_personnage > 0 and pv_monstre > 0:
+        pv_monstre -= max(1, attaque - tirage(3))
+        if pv_monstre <= 0:
+            return True, tour
+
+        pv_personnage -= max(1, 2 + tirage(5) - reduction)
+
+        tour += 1
+        if tour > tours_max:
+            return rng.choice([True, False]), tours_max
+
+    return False, tour
+
+def trouver_monstre(nom):
+    """Retourne le modèle de monstre depuis le registre, sans affichage"""
+    return indexer('monstres', registre.obtenir('monstres.json')).chercher(nom)
+
+def nouveau_resultat():
+    """Crée un résultat de simulation vide (fusionnable avec fusionner_resultats)"""
+    return {
+        'combats': 0,
+        'victoires': 0,
+        'defaites': 0,
+        'fuites': 0,
+        'tours': Counter(),
+        'pv_restants': Counter(),
+    }
+
+def fusionner_resultats(total, resultat):
+    """Ajoute les comptes d'un résultat de simulation à un autre"""
+    for cle in ('combats', 'victoires', 'defaites', 'fuites'):
+        total[cle] += resultat[cle]
+    total['tours'].update(resultat['tours'])
+    total['pv_restants'].update(resultat['pv_restants'])
+    return total
+
+def resumer_resultat(resultat):
+    """Calcule taux de réussite et moyennes d'un résultat de simulation"""
+    combats = resultat['combats']
+    if combats == 0:
+        return {'combats': 0, 'taux_victoire': 0.0, 'taux_fuite': 0.0,
+                'tours_moyen': 0.0, 'pv_restants_moyen': 0.0}
+
+    tours = sum(valeur * compte for valeur, compte in resultat['tours'].items())
+    pv = sum(valeur * compte for valeur, compte in resultat['pv_restants'].items())
+    return {
+        'combats': combats,
+        # Comme dans le jeu, une fuite des monstres compte comme une réussite
+        'taux_victoire': (resultat['victoires'] + resultat['fuites']) / combats,
+        'taux_fuite': resultat['fuites'] / combats,
+        'tours_moyen': tours / combats,
+        'pv_restants_moyen': pv / combats,
+    }
+
+def simuler_mission(stats_personnage, mission, nombre=1000, graine=None,
+                    pv_depart=None, monstre=None, rng=None, elements_personnage=None):
+    """Simule N combats d'une mission et retourne les distributions obtenues
+
+    stats_personnage est le dictionnaire de calculer_stats_personnage et
+    elements_personnage celui de regles.elements_personnage (Neutre sans).
+    Les PV de départ sont les PV max, sauf si pv_depart est donné.
+    """
+    if monstre is None:
+        monstre = trouver_monstre(mission['monstremission'])
+        if monstre is None:
+            raise ValueError(f"Monstre inconnu : {mission['monstremission']}")
+    if rng is None:
+        rng = random.Random(graine)
+    if pv_depart is None:
+        pv_depart = stats_personnage['pv']
+
+    resultat = nouveau_resultat()
+    tours = resultat['tours']
+    pv_restants = resultat['pv_restants']
+    issues = Counter()
+
+    pv_monstre = monstre['pvies']
+    nombre_monstres = mission['monstrenombre']
+    attaques = table_monstre(monstre)
+    initiative_monstre = monstre.get('initiative', 0)
+    prepare = preparer_combat(stats_personnage, attaques,
+                              *affinites_combat(elements_personnage, monstre))
+    for _ in range(nombre):
+        issue, nb_tours, pv = resoudre_combat(stats_personnage, pv_depart, pv_monstre,
+                                              nombre_monstres, rng,
+                                              initiative_monstre=initiative_monstre,
+                                              prepare=prepare)
+        issues[issue] += 1
+        tours[nb_tours] += 1
+        pv_restants[pv] += 1
+
+    resultat['combats'] = nombre
+    resultat['victoires'] = issues[VICTOIRE]
+    resultat['defaites'] = issues[DEFAITE]
+    resultat['fuites'] = issues[FUITE]
+    return resultat
+
+def simuler_duels(stats_personnage, monstre, nombre=1000, graine=None, rng=None):
+    """Simule N combats simples contre un monstre, retourne le taux de victoire"""
+    if rng is None:
+        rng = random.Random(graine)
+    victoires = 0
+    for _ in range(nombre):
+        victoire, _tours = resoudre_combat_simple(stats_personnage, monstre, rng)
+        victoires += victoire
+    return victoires / nombre if nombre else 0.0
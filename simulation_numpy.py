@@ -0,0 +1,680 @@
+from collections import Counter
+
+try:
+    import numpy as np
+except ImportError:  # numpy est optionnel : seul ce moteur en a besoin
+    np = None
+
+from simulation import (VICTOIRE, DEFAITE, FUITE, TOURS_MAX_MISSION, TOURS_MAX_SIMPLE,
+                        nouveau_resultat, trouver_monstre)
+from elements import affinites, affinites_combat, NEUTRE, SANS_AFFINITE
+from table_attaques import (table_monstre, preparer_attaques, NOMS_EFFETS, EFFETS_DEGATS_PAR_TOUR,
+                            EFFET_PARALYSIE, EFFET_INITIATIVE, MODE_REDUIT, MODE_DIRECT,
+                            MODE_SOIN, MODE_JET)
+
+# ===============================================
+# SIMULATION VECTORISÉE (NUMPY)
+# ===============================================
+# Des milliers de combats avancent ensemble, un tour à la fois :
+#   - pv_personnage : PV du personnage pour chaque combat          (F,)
+#   - pv_monstres   : PV de chaque monstre de chaque combat       (F, M)
+#   - vivants       : masque des monstres encore en vie           (F, M)
+# Tous les dés d'un tour sont tirés en un seul appel. Les règles sont celles
+# de simulation.py ; seule la suite des tirages diffère (générateur numpy).
+# resoudre_lot joue les combats simples (dés 2 à 6 des monstres),
+# resoudre_lot_missions les missions (tables d'attaques des monstres).
+#
+# Pour les missions, l'issue de chaque face de dé est précalculée par table
+# (tables_numpy) : une action de monstre coûte un tirage et une lecture. Les
+# issues des monstres d'un combat sont cumulées colonne par colonne, si bien
+# que le nombre de monstres vivants choisit une colonne au lieu d'un masque.
+# Un bonus d'initiative (Cri de Guerre...) peut faire passer un monstre de
+# l'autre côté du personnage au tour suivant : chaque combat compte alors ses
+# monstres qui changent de camp, et les lignes tirées sont rangées camp par camp.
+# Les combats terminés ne sont retirés des tableaux que par paquets.
+
+# Codes d'issue dans les tableaux numpy
+CODE_DEFAITE = 0
+CODE_VICTOIRE = 1
+CODE_FUITE = 2
+ISSUES = {CODE_DEFAITE: DEFAITE, CODE_VICTOIRE: VICTOIRE, CODE_FUITE: FUITE}
+
+# Nombre de combats traités ensemble : des lots moyens gardent les tableaux
+# d'un tour dans le cache du processeur
+TAILLE_LOT = 20_000
+
+# Faces du dé d'une action de monstre (missions) : 600 se divise par le
+# nombre d'attaques (1 à 3), puis par 100 pour le jet de précision, par 3
+# pour le dé du personnage et par 5 pour le dé de l'attaque de base. Une seule face donne l'attaque jouée et son jet.
+FACES_MONSTRE = 600
+
+# Monstres dont l'action est tirée une par une à chaque tour ; au-delà
+# (hordes), les actions des autres sont comptées par tirages binomiaux
+COLONNES_MONSTRES = 8
+
+# Part de combats terminés au-delà de laquelle les tableaux sont resserrés
+PART_COMPACTAGE = 0.25
+
+def _verifier_numpy():
+    """Lève une erreur claire si numpy n'est pas installé"""
+    if np is None:
+        raise ImportError("La simulation vectorisée nécessite numpy (pip install numpy)")
+
+def resoudre_lot(attaque, reduction, pv_depart, pv_monstre, nombre_monstres, rng,
+                 tours_max=TOURS_MAX_MISSION, match_nul=FUITE):
+    """Joue un lot de combats en parallèle
+
+    Chaque paramètre est un tableau (ou un nombre) donnant, par combat,
+    l'attaque du personnage, sa réduction de dégâts (defense // 2), ses PV
+    de départ, les PV d'un monstre et le nombre de monstres.
+    match_nul vaut FUITE (les monstres fuient) ou None (pile ou face, règle
+    de simuler_combat_simple) pour les combats qui atteignent tours_max.
+    Retourne trois tableaux : codes d'issue, nombre de tours, PV restants.
+    """
+    _verifier_numpy()
+    # int32 suffit largement pour des PV et des dégâts, et va plus vite
+    attaque, reduction, pv_depart, pv_monstre, nombre_monstres = np.broadcast_arrays(
+        *(np.asarray(x, dtype=np.int32) for x in
+          (attaque, reduction, pv_depart, pv_monstre, nombre_monstres)))
+    nombre_combats = attaque.shape[0]
+    nb_max = int(nombre_monstres.max()) if nombre_combats else 0
+
+    issues = np.zeros(nombre_combats, dtype=np.int8)
+    tours = np.zeros(nombre_combats, dtype=np.int32)
+    pv_final = np.zeros(nombre_combats, dtype=np.int32)
+
+    # Tableaux de travail, réduits aux combats encore en cours à chaque tour
+    ids = np.arange(nombre_combats)
+    attaque = attaque.copy()
+    reduction = reduction.copy()
+    pv_personnage = pv_depart.copy()
+    vivants = np.arange(nb_max)[None, :] < nombre_monstres[:, None]
+    pv_monstres = np.where(vivants, pv_monstre[:, None], 0)
+
+    # Un dé à 15 faces donne à la fois un dé à 3 faces (modulo 3) et un dé à
+    # 5 faces (modulo 5) uniformes : colonne 0 = randint(0, 2) du personnage,
+    # colonnes suivantes = randint(2, 6) - 2 de chaque monstre
+    faces = 15
+    face = np.arange(faces)
+
+    # Avec un seul personnage, attaque et défense sont les mêmes partout : les
+    # dégâts se lisent alors dans une table indexée par la face du dé
+    table_personnage = table_monstres = None
+    if nombre_combats and (attaque == attaque[0]).all():
+        table_personnage = np.maximum(1, attaque[0] - face % 3).astype(np.int32)
+    if nombre_combats and (reduction == reduction[0]).all():
+        table_monstres = np.maximum(1, 2 + face % 5 - reduction[0]).astype(np.uint8)
+
+    for tour in range(1, tours_max + 1):
+        if ids.size == 0:
+            break
+        lignes = np.arange(ids.size)
+        des = rng.integers(0, faces, size=(ids.size, nb_max + 1), dtype=np.uint8)
+
+        # Attaque du personnage sur le premier monstre vivant
+        cible = vivants.argmax(axis=1)
+        if table_personnage is not None:
+            degats = table_personnage[des[:, 0]]
+        else:
+            degats = np.maximum(1, attaque - des[:, 0] % 3)
+        pv_cible = pv_monstres[lignes, cible] - degats
+        pv_monstres[lignes, cible] = pv_cible
+        vivants[lignes, cible] = pv_cible > 0
+        gagne = ~vivants.any(axis=1)
+
+        # Attaque des monstres survivants (un combat gagné n'en a plus)
+        if table_monstres is not None:
+            degats = table_monstres[des[:, 1:]]
+        else:
+            degats = np.maximum(1, 2 + (des[:, 1:] % 5).astype(np.int32) - reduction[:, None])
+        pv_personnage -= (degats * vivants).sum(axis=1, dtype=np.int32)
+        perdu = pv_personnage <= 0
+        if tour == tours_max and match_nul is None:
+            # simuler_combat_simple tire le match nul avant de regarder les PV
+            perdu[:] = False
+
+        termine = gagne | perdu
+        if termine.any():
+            fini = ids[termine]
+            issues[fini] = np.where(gagne[termine], CODE_VICTOIRE, CODE_DEFAITE)
+            tours[fini] = tour
+            pv_final[fini] = np.maximum(0, pv_personnage[termine])
+
+            garde = ~termine
+            ids = ids[garde]
+            attaque = attaque[garde]
+            reduction = reduction[garde]
+            pv_personnage = pv_personnage[garde]
+            vivants = vivants[garde]
+            pv_monstres = pv_monstres[garde]
+
+    # Combats qui s'éternisent
+    if ids.size:
+        tours[ids] = tours_max
+        if match_nul is None:
+            issues[ids] = np.where(rng.integers(0, 2, size=ids.size) == 0,
+                                   CODE_VICTOIRE, CODE_DEFAITE)
+            pv_final[ids] = np.maximum(0, pv_personnage)
+        else:
+            issues[ids] = CODE_FUITE
+            pv_final[ids] = pv_personnage
+
+    return issues, tours, pv_final
+
+def tables_numpy(tables, reduction, element_armure=NEUTRE, ecarts_initiative=None):
+    """Convertit des tables d'attaques compilées en tables d'issues numpy (une ligne par table)
+
+    Une action d'un monstre est une face de FACES_MONSTRE : l'attaque jouée
+    (face * nombre // FACES_MONSTRE) et le jet de précision (face % 100).
+    Les tableaux par face sont à plat (table * FACES_MONSTRE + face) :
+    'soin' (PV rendus au monstre) et 'mots', l'issue codée en entiers de
+    64 bits qui s'additionnent d'un monstre à l'autre. Le mot 0 porte les
+    dégâts dans ses 32 bits bas ; chaque paire (code d'effet, durée) posée
+    sur le personnage a ensuite un compteur de 4 bits, décrit dans 'paires'
+    par (mot, décalage, code, durée).
+    'valeurs' donne, par code, la valeur de l'effet pour chaque table.
+    ecarts_initiative donne, par table, l'initiative du personnage moins
+    celle du monstre : les faces dont le bonus d'initiative fait changer le
+    monstre de camp au tour suivant (avant ou après le personnage) ont aussi
+    un compteur, décrit par 'inversion' (mot, décalage), None sans elles.
+    Pour les hordes, chaque issue non nulle d'une table est une classe :
+    'probabilites', 'classes_degats', 'classes_durees' et
+    'classes_inversion' (table, classe).
+    Les dégâts sont ceux de table_attaques.preparer_attaques pour cette
+    réduction et cet élément d'armure.
+    """
+    nombre_tables = len(tables)
+    face = np.arange(FACES_MONSTRE)
+    jet = face % 100
+    degats = np.zeros((nombre_tables, FACES_MONSTRE), dtype=np.int32)
+    soin = np.zeros_like(degats)
+    inversion = np.zeros_like(degats)
+    durees = {}
+    valeurs = {}
+    for ligne, table in enumerate(tables):
+        preparees = preparer_attaques(table, reduction, element_armure)
+        rang = face * len(preparees) // FACES_MONSTRE
+        for numero, (_nom, valeur, precision, mode, effet) in enumerate(preparees):
+            touche = (rang == numero) & (jet < precision)
+            if mode == MODE_REDUIT or mode == MODE_DIRECT:
+                degats[ligne, touche] = valeur
+            elif mode == MODE_JET:
+                # Les faces qui touchent se partagent également les jets du dé
+                nombre_faces = np.count_nonzero(touche)
+                degats[ligne, touche] = np.array(valeur)[np.arange(nombre_faces) * len(valeur) // nombre_faces]
+            elif mode == MODE_SOIN:
+                soin[ligne, touche] = valeur
+            if effet is None:
+                continue
+            code, sur_lanceur, valeur_effet, duree = effet
+            if sur_lanceur:
+                # Le bonus ne compte qu'au tour suivant, et seulement s'il
+                # fait passer le monstre de l'autre côté du personnage
+                if code == EFFET_INITIATIVE and ecarts_initiative is not None:
+                    ecart = ecarts_initiative[ligne]
+                    if (valeur_effet > ecart) != (0 > ecart):
+                        inversion[ligne, touche] = 1
+            else:
+                if code not in durees:
+                    durees[code] = np.zeros_like(degats)
+                    valeurs[code] = np.zeros(nombre_tables, dtype=np.int32)
+                durees[code][ligne, touche] = duree
+                valeurs[code][ligne] = max(valeurs[code][ligne], valeur_effet)
+    codes = sorted(durees)
+    inverse = bool(inversion.any())
+
+    # Classes : issues distinctes d'une action (hors soin, qui ne vaut que
+    # pour la cible), avec leur probabilité ; l'issue nulle est omise
+    issues = np.stack([degats] + [durees[code] for code in codes]
+                      + ([inversion] if inverse else []), axis=2)
+    # Une clé entière par issue : np.unique à une dimension, bien plus
+    # rapide que selon l'axe 0
+    cles = np.ravel_multi_index(np.moveaxis(issues, 2, 0), issues.max(axis=(0, 1)) + 1)
+    classes = []
+    for ligne in range(nombre_tables):
+        _cles, premieres, comptes = np.unique(cles[ligne], return_index=True, return_counts=True)
+        uniques = issues[ligne, premieres]
+        classes.append((uniques[uniques.any(axis=1)], comptes[uniques.any(axis=1)]))
+    nombre_classes = max((len(comptes) for _uniques, comptes in classes), default=0)
+    probabilites = np.zeros((nombre_tables, nombre_classes))
+    valeurs_classes = np.zeros((nombre_tables, nombre_classes, issues.shape[2]), dtype=np.int32)
+    for ligne, (uniques, comptes) in enumerate(classes):
+        probabilites[ligne, :len(comptes)] = comptes / FACES_MONSTRE
+        valeurs_classes[ligne, :len(comptes)] = uniques
+
+    # Compteurs des paires (code, durée), puis des changements de camp : les
+    # 8 premiers dans le haut du mot 0 (le dernier jusqu'au bit de signe),
+    # puis 16 par mot (COLONNES_MONSTRES < 16 : pas de débordement)
+    mots = [degats.astype(np.int64)]
+    compteurs = [((code, duree), durees[code] == duree) for code in codes
+                 for duree in np.unique(durees[code][durees[code] > 0]).tolist()]
+    if inverse:
+        compteurs.append((None, inversion == 1))
+    paires = []
+    place_inversion = None
+    for position, (paire, faces) in enumerate(compteurs, start=8):
+        mot, decalage = divmod(position, 16)
+        if mot == len(mots):
+            mots.append(np.zeros_like(mots[0]))
+        mots[mot] += faces.astype(np.int64) << (4 * decalage)
+        if paire is None:
+            place_inversion = (mot, 4 * decalage)
+        else:
+            paires.append((mot, 4 * decalage) + paire)
+
+    return {
+        'codes': codes,
+        'mots': [mot.ravel() for mot in mots],
+        'paires': paires,
+        'inversion': place_inversion,
+        'soin': soin.ravel(),
+        'valeurs': valeurs,
+        'probabilites': probabilites,
+        'classes_degats': valeurs_classes[:, :, 0],
+        'classes_durees': {code: valeurs_classes[:, :, rang + 1] for rang, code in enumerate(codes)},
+        'classes_inversion': valeurs_classes[:, :, -1] if inverse else None,
+    }
+
+def resoudre_lot_missions(attaque, pv_depart, pv_monstre, nombre_monstres, tables, numero_table,
+                          rng, tours_max=TOURS_MAX_MISSION, monstres_avant=False,
+                          affinite=SANS_AFFINITE):
+    """Joue un lot de combats de mission (attaques des monstres) en parallèle
+
+    tables vient de tables_numpy ; numero_table donne, par combat, la ligne
+    de la table du monstre. monstres_avant indique, par combat, si les
+    monstres ont plus d'initiative que le personnage (ils jouent alors avant
+    lui, à initiative de base) ; affinite, le multiplicateur (%) de son arme
+    contre le monstre. Les bonus d'initiative qui font changer un monstre de
+    camp sont suivis (voir tables_numpy) ; l'ordre des monstres d'un même
+    camp ne change pas l'issue. Les autres paramètres sont ceux de
+    resoudre_lot. Retourne codes d'issue, nombre de tours, PV restants.
+    """
+    _verifier_numpy()
+    attaque, pv_depart, pv_monstre, nombre_monstres, numero_table, monstres_avant, affinite = (
+        np.broadcast_arrays(*(np.asarray(x, dtype=np.int32) for x in
+                              (attaque, pv_depart, pv_monstre, nombre_monstres,
+                               numero_table, monstres_avant, affinite))))
+    nombre_combats = attaque.shape[0]
+
+    issues = np.zeros(nombre_combats, dtype=np.int8)
+    tours = np.zeros(nombre_combats, dtype=np.int32)
+    pv_final = np.zeros(nombre_combats, dtype=np.int32)
+    if nombre_combats == 0:
+        return issues, tours, pv_final
+
+    codes = tables['codes']
+    degats_par_tour = [code for code in EFFETS_DEGATS_PAR_TOUR if code in codes]
+    paralysie = EFFET_PARALYSIE in codes
+    # Le suivi des camps ne sert qu'aux lots où un bonus d'initiative en fait changer
+    suivi_initiative = (tables['inversion'] is not None
+                        and bool(tables['classes_inversion'].any(axis=1)[numero_table].any()))
+
+    # État de chaque combat : seul le premier monstre vivant est entamé.
+    # Un combat terminé reste dans l'état (en_cours faux) jusqu'au prochain
+    # resserrement des tableaux
+    etat = {
+        'ids': np.arange(nombre_combats),
+        'en_cours': np.ones(nombre_combats, dtype=bool),
+        'pv': pv_depart.copy(),
+        'pv_monstre': pv_monstre,
+        'pv_cible': pv_monstre.copy(),
+        'vivants': nombre_monstres.astype(np.intp),
+        'table': numero_table,
+        'face': numero_table.astype(np.intp) * FACES_MONSTRE,
+        'attaque': attaque,
+        'affinite': affinite,
+        'avant': monstres_avant.astype(bool),
+    }
+    if suivi_initiative:
+        # Monstres qui joueront de l'autre côté du personnage ce tour-ci :
+        # la cible, et le nombre des autres
+        etat['cible_inverse'] = np.zeros(nombre_combats, dtype=bool)
+        etat['inverses'] = np.zeros(nombre_combats, dtype=np.intp)
+    # Effets sur le personnage : tours restants (et valeur, fixée par la table)
+    for code in codes:
+        etat[f"tours_{code}"] = np.zeros(nombre_combats, dtype=np.int32)
+        if code in degats_par_tour:
+            etat[f"valeur_{code}"] = tables['valeurs'][code][numero_table]
+
+    def terminer(masque, code_issue, tour, pv=None):
+        """Note l'issue des combats en cours du masque"""
+        masque &= etat['en_cours']
+        if masque.any():
+            fini = etat['ids'][masque]
+            issues[fini] = code_issue
+            tours[fini] = tour
+            pv_final[fini] = 0 if pv is None else pv[masque]
+            etat['en_cours'] &= ~masque
+
+    def jouer_monstres(actions, participe):
+        """Attaques des monstres vivants (tous, ou ceux des combats `participe`)
+
+        actions : issues cumulées des monstres tirés un par un ce tour-ci.
+        """
+        largeur, lignes, cumuls, soin = actions
+        vivants = etat['vivants']
+        presents = np.minimum(vivants, largeur)
+        if participe is not None:
+            presents = np.where(participe, presents, 0)
+            soin = np.where(presents > 0, soin, 0)
+        # Indice à plat de la ligne `presents` de chaque combat (colonne)
+        case = presents * lignes.size + lignes
+        reste = None
+        if largeur == COLONNES_MONSTRES:
+            reste = vivants - largeur
+            if participe is not None:
+                reste = np.where(participe, reste, 0)
+        jouer_groupe([cumul.take(case) for cumul in cumuls], soin, reste)
+
+    def jouer_groupe(mots, soin, reste=None):
+        """Attaques d'un groupe de monstres de chaque combat
+
+        mots : issues additionnées des monstres tirés du groupe ; soin : PV
+        rendus à la cible (0 si elle n'est pas du groupe) ; reste : nombre
+        de monstres de horde en plus. Retourne, avec le suivi de
+        l'initiative, le nombre de monstres du groupe qui changent de camp.
+        """
+        etat['pv'] -= mots[0].astype(np.int32)
+        # Seul le premier monstre (la cible) a des PV à récupérer
+        etat['pv_cible'] = np.minimum(etat['pv_monstre'],
+                                      etat['pv_cible'] + soin)
+        inversions = None
+        if suivi_initiative:
+            mot, decalage = tables['inversion']
+            inversions = (mots[mot] >> decalage) & 15
+        if tables['paires']:
+            # Peu de combats reçoivent un effet à chaque tour : seuls ceux-là
+            # sont traités (compteurs des paires non nuls). Les bits hauts du
+            # mot 0 sont testés après décalage : le dernier compteur occupe le
+            # bit de signe, un mot négatif porte donc aussi des effets
+            poses = (mots[0] >> 32) != 0
+            for mot in mots[1:]:
+                poses |= mot != 0
+            touches = np.flatnonzero(poses)
+            if touches.size:
+                mots = [mot.take(touches) for mot in mots]
+                for mot, decalage, code, duree in tables['paires']:
+                    pose = (mots[mot] >> decalage) & 15 != 0
+                    tours_effet = etat[f"tours_{code}"]
+                    tours_effet[touches] = np.maximum(tours_effet.take(touches),
+                                                      np.where(pose, duree, 0))
+
+        # Hordes : les monstres au-delà des lignes tirées sont comptés par
+        # classe d'issue (tirages binomiaux successifs)
+        if reste is not None:
+            horde = np.flatnonzero(reste > 0)
+            if horde.size:
+                inversions_horde = jouer_horde(horde, reste[horde])
+                if suivi_initiative:
+                    inversions[horde] += inversions_horde
+
+        terminer(etat['pv'] <= 0, CODE_DEFAITE, tour)
+        return inversions
+
+    def jouer_horde(lignes, restants):
+        """Actions de `restants` monstres pour chaque combat de `lignes`
+
+        Retourne le nombre de ces monstres qui changent de camp (suivi de l'initiative).
+        """
+        table = etat['table'][lignes]
+        probabilites = tables['probabilites'][table]
+        reste_probabilite = np.ones(lignes.size)
+        degats = np.zeros(lignes.size, dtype=np.int64)
+        inversions = np.zeros(lignes.size, dtype=np.int64)
+        durees = {code: np.zeros(lignes.size, dtype=np.int32) for code in codes}
+        for classe in range(probabilites.shape[1]):
+            probabilite = probabilites[:, classe]
+            conditionnelle = np.divide(probabilite, reste_probabilite,
+                                       out=np.zeros(lignes.size), where=reste_probabilite > 1e-12)
+            compte = rng.binomial(restants, np.clip(conditionnelle, 0.0, 1.0))
+            restants = restants - compte
+            reste_probabilite = reste_probabilite - probabilite
+            degats += compte * tables['classes_degats'][table, classe]
+            if suivi_initiative:
+                inversions += compte * tables['classes_inversion'][table, classe]
+            for code in codes:
+                np.maximum(durees[code],
+                           np.where(compte > 0, tables['classes_durees'][code][table, classe], 0),
+                           out=durees[code])
+        etat['pv'][lignes] -= degats.astype(np.int32)
+        for code in codes:
+            etat[f"tours_{code}"][lignes] = np.maximum(etat[f"tours_{code}"][lignes], durees[code])
+        return inversions
+
+    def jouer_personnage(de):
+        """Tour du personnage (dé de 0 à 2 modulo 3) ; retourne les combats où la cible tombe"""
+        # Poison, brûlure... quand le personnage joue
+        if degats_par_tour:
+            for code in degats_par_tour:
+                actifs = etat[f"tours_{code}"] > 0
+                etat['pv'] -= etat[f"valeur_{code}"] * actifs
+                etat[f"tours_{code}"] -= actifs
+            terminer(etat['pv'] <= 0, CODE_DEFAITE, tour)
+
+        # Attaque du personnage (sauf paralysie) sur le premier monstre vivant
+        degats = np.maximum(1, (etat['attaque'] - de % 3) * etat['affinite'] // 100)
+        if paralysie:
+            paralyse = etat[f"tours_{EFFET_PARALYSIE}"] > 0
+            etat[f"tours_{EFFET_PARALYSIE}"] -= paralyse
+            degats[paralyse] = 0
+        etat['pv_cible'] -= degats
+        tombe = etat['pv_cible'] <= 0
+        etat['vivants'] -= tombe
+        etat['pv_cible'] = np.where(tombe, etat['pv_monstre'], etat['pv_cible'])
+        terminer(etat['vivants'] == 0, CODE_VICTOIRE, tour, etat['pv'])
+        return tombe
+
+    def jouer_tour_camps(actions, de):
+        """Tour complet quand des monstres peuvent changer de camp (suivi de l'initiative)
+
+        Les lignes tirées sont rangées camp par camp : la ligne 0 (la
+        cible), puis les monstres qui jouent avant le personnage, puis ceux
+        d'après. Si la cible joue après le personnage (decale), les lignes
+        d'avant commencent à 1 et la cible rejoint le groupe d'après.
+        """
+        largeur, lignes, cumuls, soin = actions
+        avant = etat['avant']
+        vivants = etat['vivants'].copy()
+        tires = np.minimum(vivants, largeur)
+        decale = avant == etat['cible_inverse']
+        changent = etat['inverses'] + etat['cible_inverse']
+        nombre_avant = np.where(avant, vivants - changent, changent)
+        lignes_avant = np.minimum(nombre_avant, largeur - decale)
+        # Monstres au-delà des lignes tirées (hordes), dans chaque camp
+        horde = largeur == COLONNES_MONSTRES
+        horde_avant = nombre_avant - lignes_avant
+        # Cumul jusqu'à la dernière ligne d'avant, pour les deux groupes
+        case = (lignes_avant + decale) * lignes.size + lignes
+        bornes = [cumul.take(case) for cumul in cumuls]
+
+        inversions = 0
+        if nombre_avant.any():
+            mots = [borne - np.where(decale, cumul[1], 0) for borne, cumul in zip(bornes, cumuls)]
+            inversions = jouer_groupe(mots, np.where(decale, 0, soin),
+                                      horde_avant if horde else None)
+
+        tombe = jouer_personnage(de)
+
+        # Une cible tombée avant d'avoir joué ne joue pas
+        nombre_apres = vivants - nombre_avant
+        if nombre_apres.any():
+            cible_joue = decale & ~tombe
+            case = tires * lignes.size + lignes
+            mots = [cumul.take(case) - borne + np.where(cible_joue, cumul[1], 0)
+                    for borne, cumul in zip(bornes, cumuls)]
+            inversions = inversions + jouer_groupe(
+                mots, np.where(cible_joue, soin, 0),
+                vivants - tires - horde_avant if horde else None)
+
+        # Camps du prochain tour : chaque monstre qui a joué change de camp
+        # selon son action. Si la cible est tombée, la nouvelle cible est le
+        # monstre de la ligne 1 (les tirages sont indépendants : n'importe
+        # quel autre monstre tiré conviendrait)
+        mot, decalage = tables['inversion']
+        inversion_cible = (cumuls[mot][1] >> decalage) & 15
+        inversion_suivante = 0
+        if largeur > 1:
+            inversion_suivante = ((cumuls[mot][2] - cumuls[mot][1]) >> decalage) & 15
+        etat['cible_inverse'] = np.where(tombe, inversion_suivante, inversion_cible) != 0
+        etat['inverses'] = (inversions - np.where(decale & tombe, 0, inversion_cible)
+                            - np.where(tombe, inversion_suivante, 0))
+
+    colonnes = np.arange(nombre_combats)
+    for tour in range(1, tours_max + 1):
+        if etat['ids'].size == 0:
+            break
+
+        # Tous les dés du tour en un tirage, une ligne par dé et une colonne
+        # par combat : ligne 0 = randint(0, 2) du personnage (modulo 3),
+        # lignes suivantes = une face par monstre. Les issues (mots) des
+        # monstres sont cumulées ligne par ligne : la ligne k donne le total
+        # des k premiers monstres vivants
+        lignes = colonnes[:etat['ids'].size]
+        largeur = max(1, min(COLONNES_MONSTRES, int(etat['vivants'].max())))
+        des = rng.integers(0, FACES_MONSTRE, size=(largeur + 1, lignes.size), dtype=np.uint16)
+        cases = etat['face'] + des[1:]
+        cumuls = []
+        for mots in tables['mots']:
+            cumul = np.empty((largeur + 1, lignes.size), dtype=np.int64)
+            cumul[0] = 0
+            # Cumul ligne à ligne : bien plus rapide que cumsum selon l'axe 0
+            for rang in range(largeur):
+                np.add(cumul[rang], mots.take(cases[rang]), out=cumul[rang + 1])
+            cumuls.append(cumul)
+        actions = (largeur, lignes, cumuls, tables['soin'].take(cases[0]))
+
+        if suivi_initiative:
+            jouer_tour_camps(actions, des[0])
+        else:
+            # Monstres plus rapides que le personnage : ils jouent d'abord
+            avant = etat['avant']
+            tous_avant = bool(avant.all())
+            if tous_avant or avant.any():
+                jouer_monstres(actions, None if tous_avant else avant)
+            jouer_personnage(des[0])
+            # Monstres moins rapides (ou aussi rapides) que le personnage
+            if not tous_avant:
+                jouer_monstres(actions, None if not avant.any() else ~avant)
+
+        # Les combats terminés ne sont retirés que s'ils pèsent assez
+        en_cours = etat['en_cours']
+        if en_cours.size - np.count_nonzero(en_cours) > PART_COMPACTAGE * en_cours.size:
+            gardes = np.flatnonzero(en_cours)
+            for cle in etat:
+                etat[cle] = etat[cle].take(gardes, axis=0)
+
+    # Combats qui s'éternisent : les monstres fuient
+    en_cours = etat['en_cours']
+    restants = etat['ids'][en_cours]
+    issues[restants] = CODE_FUITE
+    tours[restants] = tours_max
+    pv_final[restants] = etat['pv'][en_cours]
+
+    return issues, tours, pv_final
+
+def _compter(resultat, issues, tours, pv_restants):
+    """Ajoute des tableaux d'issues/tours/PV à un résultat de simulation"""
+    codes = np.bincount(issues, minlength=3)
+    resultat['combats'] += int(issues.size)
+    resultat['defaites'] += int(codes[CODE_DEFAITE])
+    resultat['victoires'] += int(codes[CODE_VICTOIRE])
+    resultat['fuites'] += int(codes[CODE_FUITE])
+    valeurs, comptes = np.unique(tours, return_counts=True)
+    resultat['tours'].update(dict(zip(valeurs.tolist(), comptes.tolist())))
+    valeurs, comptes = np.unique(pv_restants, return_counts=True)
+    resultat['pv_restants'].update(dict(zip(valeurs.tolist(), comptes.tolist())))
+    return resultat
+
+def simuler_mission(stats_personnage, mission, nombre=1000, graine=None,
+                    pv_depart=None, monstre=None, rng=None, elements_personnage=None):
+    """Version vectorisée de simulation.simuler_mission (même format de résultat)"""
+    monstres = None
+    if monstre is not None:
+        monstres = {mission['monstremission']: monstre}
+    resultats = simuler_catalogue(stats_personnage, [mission], nombre, graine,
+                                  pv_depart=pv_depart, rng=rng, monstres=monstres,
+                                  elements_personnage=elements_personnage)
+    if mission['nom'] not in resultats:
+        raise ValueError(f"Monstre inconnu : {mission['monstremission']}")
+    return resultats[mission['nom']]
+
+def simuler_catalogue(stats_personnage, missions, nombre=1000, graine=None,
+                      pv_depart=None, rng=None, monstres=None, taille_lot=TAILLE_LOT,
+                      elements_personnage=None):
+    """Simule N combats de chaque mission en une seule passe vectorisée
+
+    Retourne un dictionnaire nom de mission -> résultat de simulation.
+    Les missions dont le monstre est inconnu sont ignorées.
+    elements_personnage vient de regles.elements_personnage (Neutre sans).
+    """
+    _verifier_numpy()
+    if rng is None:
+        rng = np.random.default_rng(graine)
+    if pv_depart is None:
+        pv_depart = stats_personnage['pv']
+
+    # Une ligne par mission jouable : PV du monstre, nombre de monstres,
+    # initiative, affinité de l'arme du personnage, attaques
+    # L'élément de l'armure ne dépend que du personnage : le même pour toutes les missions
+    table_affinites = affinites()
+    element_armure = affinites_combat(elements_personnage, {}, table_affinites)[1]
+    retenues = []
+    for mission in missions:
+        monstre = None
+        if monstres is not None:
+            monstre = monstres.get(mission['monstremission'])
+        if monstre is None:
+            monstre = trouver_monstre(mission['monstremission'])
+        if monstre is not None:
+            affinite, _element_armure = affinites_combat(elements_personnage, monstre,
+                                                         table_affinites)
+            retenues.append((mission, monstre['pvies'], mission['monstrenombre'],
+                             monstre.get('initiative', 0), affinite, table_monstre(monstre)))
+
+    resultats = {mission['nom']: nouveau_resultat() for mission, *_reste in retenues}
+    if not retenues or nombre <= 0:
+        return resultats
+    # Missions au même nombre de monstres, puis au même ordre de jeu, côte à
+    # côte : les lots gardent des matrices de monstres étroites et les
+    # monstres d'un lot jouent le plus souvent tous au même moment du tour
+    retenues.sort(key=lambda retenue: (retenue[2], retenue[3] > stats_personnage['initiative']))
+
+    # Chaque combat porte le numéro de sa mission ; on découpe en lots
+    numeros = np.repeat(np.arange(len(retenues)), nombre)
+    pv_monstre = np.array([pv for _m, pv, *_reste in retenues], dtype=np.int32)
+    nombre_monstres = np.array([nb for _m, _pv, nb, *_reste in retenues], dtype=np.int32)
+    # À initiative égale, le personnage joue avant les monstres
+    monstres_avant = np.array([initiative > stats_personnage['initiative']
+                               for *_debut, initiative, _a, _t in retenues])
+    affinites_missions = np.array([affinite for *_debut, affinite, _t in retenues], dtype=np.int32)
+    ecarts_initiative = [stats_personnage['initiative'] - initiative
+                         for *_debut, initiative, _a, _t in retenues]
+    tables = tables_numpy([table for *_debut, table in retenues],
+                          stats_personnage['defense'] // 2, element_armure, ecarts_initiative)
+
+    for debut in range(0, numeros.size, taille_lot):
+        lot = numeros[debut:debut + taille_lot]
+        issues, tours, pv_restants = resoudre_lot_missions(
+            stats_personnage['attaque'], pv_depart, pv_monstre[lot], nombre_monstres[lot],
+            tables, lot, rng, monstres_avant=monstres_avant[lot], affinite=affinites_missions[lot])
+        # Répartir les résultats du lot par mission (lot trié par numéro)
+        bornes = np.searchsorted(lot, np.arange(len(retenues) + 1))
+        for numero, (mission, *_reste) in enumerate(retenues):
+            a, b = bornes[numero], bornes[numero + 1]
+            if a < b:
+                _compter(resultats[mission['nom']], issues[a:b], tours[a:b], pv_restants[a:b])
+
+    return resultats
+
+def simuler_duels(stats_personnage, monstre, nombre=1000, graine=None, rng=None):
+    """Version vectorisée de simulation.simuler_duels (taux de victoire)"""
+    _verifier_numpy()
+    if rng is None:
+        rng = np.random.default_rng(graine)
+    if nombre <= 0:
+        return 0.0
+    issues, _tours, _pv = resoudre_lot(
+        np.full(nombre, stats_personnage['attaque']), stats_personnage['defense'] // 2,
+        stats_personnage['pv'], monstre['pvies'], 1, rng,
+        tours_max=TOURS_MAX_SIMPLE, match_nul=None)
+    return float(np.count_nonzero(issues == CODE_VICTOIRE)) / nombre
@@ -0,0 +1,149 @@
+import argparse
+import json
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+from registre import registre
+from index_catalogues import indexer
+from regles import dicoClasse, creer_personnage, calculer_stats_personnage, elements_personnage
+import simulation
+
+# ===============================================
+# BALAYAGE D'ÉQUILIBRAGE SUR PLUSIEURS CŒURS
+# ===============================================
+# Chaque tâche = (classe, mode de génération des attributs, mission, lot).
+# Une tâche crée ses personnages et joue ses combats avec son propre
+# générateur, dont la graine est dérivée du texte de la tâche : le résultat
+# ne dépend ni du nombre de processus ni de l'ordre d'exécution.
+
+MODES_ATTRIBUTS = ('aleatoire', 'optimise')
+MOTEURS = ('python', 'numpy')
+
+def graine_tache(graine, classe, mode, nom_mission, lot):
+    """Retourne la graine (texte) du générateur propre à une tâche"""
+    # random.Random(texte) passe par sha512 : stable d'un processus à l'autre
+    return f"{graine}|{classe}|{mode}|{nom_mission}|{lot}"
+
+def executer_tache(tache):
+    """Joue une tâche du balayage et retourne (clé, résultat)"""
+    (graine, classe, mode, mission, monstre, lot,
+     personnages, combats, moteur) = tache
+    rng = random.Random(graine_tache(graine, classe, mode, mission['nom'], lot))
+    if moteur == 'numpy':
+        import numpy as np
+        import simulation_numpy
+        rng_numpy = np.random.default_rng(rng.getrandbits(64))
+
+    resultat = simulation.nouveau_resultat()
+    for _ in range(personnages):
+        personnage = creer_personnage("PNJ", classe, mode, rng)
+        stats = calculer_stats_personnage(personnage)
+        elements = elements_personnage(personnage)
+        if moteur == 'numpy':
+            partiel = simulation_numpy.simuler_mission(stats, mission, combats,
+                                                       monstre=monstre, rng=rng_numpy,
+                                                       elements_personnage=elements)
+        else:
+            partiel = simulation.simuler_mission(stats, mission, combats,
+                                                 monstre=monstre, rng=rng,
+                                                 elements_personnage=elements)
+        simulation.fusionner_resultats(resultat, partiel)
+
+    return (classe, mode, mission['nom']), resultat
+
+def preparer_taches(missions, monstres, graine=0, classes=None, modes=MODES_ATTRIBUTS,
+                    personnages=10, combats=100, lots=1, moteur='python'):
+    """Construit la liste des tâches et celle des missions sans monstre connu"""
+    if classes is None:
+        classes = list(dicoClasse.values())
+
+    taches = []
+    ignorees = []
+    for mission in missions:
+        monstre = monstres.chercher(mission['monstremission'])
+        if monstre is None:
+            ignorees.append(mission['nom'])
+            continue
+        for classe in classes:
+            # Une mission réservée à une classe n'est jouée que par elle
+            if mission['classe'] != 'tous' and mission['classe'] != classe:
+                continue
+            for mode in modes:
+                for lot in range(lots):
+                    taches.append((graine, classe, mode, mission, monstre, lot,
+                                   personnages, combats, moteur))
+    return taches, ignorees
+
+def balayer(missions=None, graine=0, classes=None, modes=MODES_ATTRIBUTS,
+            personnages=10, combats=100, lots=1, processus=None, moteur='python'):
+    """Lance le balayage sur tous les cœurs et agrège les résultats
+
+    Retourne un dictionnaire avec les résultats par mission, par classe,
+    par mode de génération, par (classe, mode, mission), et la liste des
+    missions ignorées faute de monstre connu.
+    """
+    if moteur not in MOTEURS:
+        raise ValueError(f"Moteur inconnu : {moteur}")
+    if missions is None:
+        missions = registre.obtenir('missions.json')
+    monstres = indexer('monstres', registre.obtenir('monstres.json'))
+
+    taches, ignorees = preparer_taches(missions, monstres, graine, classes, modes,
+                                       personnages, combats, lots, moteur)
+
+    agregat = {
+        'par_mission': {},
+        'par_classe': {},
+        'par_mode': {},
+        'detail': {},
+        'missions_ignorees': ignorees,
+    }
+    if not taches:
+        return agregat
+
+    if processus is None:
+        processus = os.cpu_count() or 1
+    # Quelques tâches par envoi pour limiter les allers-retours entre processus
+    paquet = max(1, len(taches) // (processus * 4))
+
+    with ProcessPoolExecutor(max_workers=processus) as executeur:
+        for (classe, mode, nom_mission), resultat in executeur.map(executer_tache, taches,
+                                                                   chunksize=paquet):
+            for groupe, cle in (('par_mission', nom_mission), ('par_classe', classe),
+                                ('par_mode', mode),
+                                ('detail', f"{classe}|{mode}|{nom_mission}")):
+                total = agregat[groupe].setdefault(cle, simulation.nouveau_resultat())
+                simulation.fusionner_resultats(total, resultat)
+
+    return agregat
+
+def resumer_balayage(agregat):
+    """Remplace chaque résultat du balayage par son résumé (taux, moyennes)"""
+    resume = {'missions_ignorees': agregat['missions_ignorees']}
+    for groupe in ('par_mission', 'par_classe', 'par_mode', 'detail'):
+        resume[groupe] = {cle: simulation.resumer_resultat(resultat)
+                          for cle, resultat in agregat[groupe].items()}
+    return resume
+
+def main():
+    """Point d'entrée en ligne de commande : affiche le résumé en JSON"""
+    parser = argparse.ArgumentParser(description="Balayage d'équilibrage des missions")
+    parser.add_argument('--graine', type=int, default=0)
+    parser.add_argument('--personnages', type=int, default=10,
+                        help="personnages générés par tâche")
+    parser.add_argument('--combats', type=int, default=100,
+                        help="combats par personnage")
+    parser.add_argument('--lots', type=int, default=1,
+                        help="découpage de chaque (classe, mode, mission)")
+    parser.add_argument('--processus', type=int, default=None)
+    parser.add_argument('--moteur', choices=MOTEURS, default='python')
+    args = parser.parse_args()
+
+    agregat = balayer(graine=args.graine, personnages=args.personnages,
+                      combats=args.combats, lots=args.lots,
+                      processus=args.processus, moteur=args.moteur)
+    print(json.dumps(resumer_balayage(agregat), indent=2, ensure_ascii=False))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+import json
+import os
+import threading
+
+from regles import donnees_a_sauvegarder, migrer_inventaire
+
+# ===============================================
+# STOCKAGE SQLITE (OPTIONNEL)
+# ===============================================
+# Par défaut chaque personnage est un fichier personnage_<nom>.json. Si la
+# variable d'environnement DONJON_BASE donne le chemin d'une base SQLite,
+# sauvegarde, chargement et liste des personnages passent par cette base.
+#
+# Tables :
+#   personnages         une ligne par personnage (colonnes indexées + reste en JSON)
+#   inventaire          une ligne par pile d'objets
+#   missions_terminees  (personnage, mission) : personnage['missions_terminees']
+#
+# Les catalogues (monstres, attaques, boutique, missions) restent des fichiers
+# JSON, lus par le registre.
+
+VARIABLE_BASE = 'DONJON_BASE'
+
+# Colonnes des personnages gardées à part pour les requêtes indexées
+COLONNES_PERSONNAGE = ('nom', 'classe', 'experience', 'pieces_or', 'points_de_vie_actuels')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS personnages (
+    cle TEXT PRIMARY KEY,
+    nom TEXT NOT NULL,
+    classe TEXT NOT NULL,
+    experience INTEGER NOT NULL,
+    pieces_or INTEGER NOT NULL,
+    points_de_vie_actuels INTEGER,
+    donnees TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS personnages_classe ON personnages (classe, experience);
+
+CREATE TABLE IF NOT EXISTS inventaire (
+    personnage TEXT NOT NULL REFERENCES personnages (cle) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    nom TEXT NOT NULL,
+    quantite INTEGER NOT NULL,
+    porte INTEGER NOT NULL,
+    donnees TEXT NOT NULL,
+    PRIMARY KEY (personnage, position)
+);
+CREATE INDEX IF NOT EXISTS inventaire_nom ON inventaire (nom);
+
+-- Pas de clé étrangère : une mission peut être réussie avant la première
+-- sauvegarde du personnage
+CREATE TABLE IF NOT EXISTS missions_terminees (
+    personnage TEXT NOT NULL,
+    mission TEXT NOT NULL,
+    PRIMARY KEY (personnage, mission)
+);
+"""
+
+def cle_personnage(nom):
+    """Retourne la clé d'un personnage (même règle que les noms de fichiers)"""
+    return nom.lower().replace(' ', '_')
+
+def ouvrir_base(chemin):
+    """Ouvre (et crée si besoin) la base SQLite"""
+    # Importé ici : le jeu importe ce module même quand la base n'est pas utilisée
+    import sqlite3
+    connexion = sqlite3.connect(chemin)
+    connexion.row_factory = sqlite3.Row
+    # WAL : les lectures ne bloquent pas pendant qu'un autre processus écrit
+    connexion.execute("PRAGMA journal_mode=WAL")
+    connexion.execute("PRAGMA foreign_keys=ON")
+    connexion.executescript(SCHEMA)
+    connexion.commit()
+    return connexion
+
+# Une connexion par fil d'exécution (une connexion SQLite ne se partage pas
+# entre fils ; le serveur de jeu joue chaque partie dans son propre fil)
+_connexions = threading.local()
+
+def base_configuree():
+    """Retourne la connexion à la base de DONJON_BASE, ou None (fichiers JSON)"""
+    chemin = os.environ.get(VARIABLE_BASE)
+    if not chemin:
+        return None
+    connexion = getattr(_connexions, 'connexion', None)
+    if connexion is None:
+        connexion = _connexions.connexion = ouvrir_base(chemin)
+    return connexion
+
+# -----------------------------------------------
+# Personnages
+# -----------------------------------------------
+
+def sauvegarder_personnage(connexion, personnage):
+    """Enregistre un personnage, son inventaire et ses missions en une seule transaction"""
+    donnees = donnees_a_sauvegarder(personnage)
+    cle = cle_personnage(personnage['nom'])
+    inventaire = donnees.pop('inventaire', [])
+    terminees = donnees.pop('missions_terminees', [])
+    reste = {champ: valeur for champ, valeur in donnees.items() if champ not in COLONNES_PERSONNAGE}
+
+    with connexion:
+        connexion.execute(
+            "INSERT INTO personnages (cle, nom, classe, experience, pieces_or, "
+            "points_de_vie_actuels, donnees) VALUES (?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (cle) DO UPDATE SET nom = excluded.nom, classe = excluded.classe, "
+            "experience = excluded.experience, pieces_or = excluded.pieces_or, "
+            "points_de_vie_actuels = excluded.points_de_vie_actuels, donnees = excluded.donnees",
+            (cle, donnees['nom'], donnees['classe'], donnees['experience'], donnees['pieces_or'],
+             donnees.get('points_de_vie_actuels'), json.dumps(reste, ensure_ascii=False)))
+        connexion.execute("DELETE FROM inventaire WHERE personnage = ?", (cle,))
+        connexion.executemany(
+            "INSERT INTO inventaire (personnage, position, nom, quantite, porte, donnees) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [(cle, position, entree['nom'], entree.get('quantite', 1),
+              int(entree.get('porte', False)), json.dumps(entree, ensure_ascii=False))
+             for position, entree in enumerate(inventaire)])
+        connexion.execute("DELETE FROM missions_terminees WHERE personnage = ?", (cle,))
+        connexion.executemany(
+            "INSERT INTO missions_terminees (personnage, mission) VALUES (?, ?)",
+            [(cle, mission) for mission in terminees])
+    return cle
+
+def charger_personnage(connexion, nom):
+    """Charge un personnage par son nom (ou sa clé), ou retourne None"""
+    ligne = connexion.execute("SELECT * FROM personnages WHERE cle = ?",
+                              (cle_personnage(nom),)).fetchone()
+    if ligne is None:
+        return None
+
+    personnage = {colonne: ligne[colonne] for colonne in COLONNES_PERSONNAGE}
+    if personnage['points_de_vie_actuels'] is None:
+        del personnage['points_de_vie_actuels']
+    personnage.update(json.loads(ligne['donnees']))
+    personnage['inventaire'] = [
+        json.loads(entree['donnees']) for entree in connexion.execute(
+            "SELECT donnees FROM inventaire WHERE personnage = ? ORDER BY position",
+            (ligne['cle'],))]
+    personnage['missions_terminees'] = sorted(missions_terminees(connexion, ligne['cle']))
+    return personnage
+
+def lister_personnages(connexion, classe=None, limite=None):
+    """Retourne les noms des personnages (filtrés par classe si demandé)"""
+    requete = "SELECT nom FROM personnages"
+    parametres = []
+    if classe is not None:
+        requete += " WHERE classe = ?"
+        parametres.append(classe)
+    requete += " ORDER BY nom"
+    if limite is not None:
+        requete += " LIMIT ?"
+        parametres.append(limite)
+    return [ligne['nom'] for ligne in connexion.execute(requete, parametres)]
+
+# -----------------------------------------------
+# Missions terminées
+# -----------------------------------------------
+
+def missions_terminees(connexion, nom_personnage):
+    """Retourne l'ensemble des missions réussies par un personnage"""
+    return {ligne['mission'] for ligne in connexion.execute(
+        "SELECT mission FROM missions_terminees WHERE personnage = ?",
+        (cle_personnage(nom_personnage),))}
+
+# -----------------------------------------------
+# Import des fichiers JSON existants
+# -----------------------------------------------
+
+def importer_json(connexion, dossier='.'):
+    """Importe tous les personnage_*.json d'un dossier
+
+    Une sauvegarde illisible ou incomplète est signalée et ignorée.
+    Retourne le nombre de personnages importés et la liste des fichiers ignorés.
+    """
+    # Importé ici : persistance n'est utile qu'à l'import
+    import sqlite3
+    from persistance import lire_personnage
+
+    nombre = 0
+    ignores = []
+    for fichier in sorted(os.listdir(dossier)):
+        if fichier.startswith('personnage_') and fichier.endswith('.json'):
+            try:
+                # lire_personnage rejoue aussi le journal de la sauvegarde ;
+                # une ancienne sauvegarde (un objet par entrée) est convertie
+                # en piles, comme au chargement dans le jeu
+                personnage = lire_personnage(os.path.join(dossier, fichier))
+                migrer_inventaire(personnage)
+                sauvegarder_personnage(connexion, personnage)
+            except (OSError, ValueError, KeyError, TypeError, AttributeError,
+                    sqlite3.Error) as erreur:
+                # La transaction de ce personnage est annulée, les autres continuent
+                print(f"Sauvegarde ignorée : {fichier} ({type(erreur).__name__} : {erreur})")
+                ignores.append(fichier)
+                continue
+            nombre += 1
+    return nombre, ignores
+
+def main():
+    """Outil en ligne de commande : import des fichiers JSON dans une base"""
+    # Importé ici : le jeu importe ce module sans se servir de l'outil
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Import des données du jeu dans SQLite")
+    parser.add_argument('base', help="chemin de la base SQLite (créée si besoin)")
+    parser.add_argument('--dossier', default='.', help="dossier des fichiers JSON")
+    args = parser.parse_args()
+
+    connexion = ouvrir_base(args.base)
+    nombre, ignores = importer_json(connexion, args.dossier)
+    print(f"{nombre} personnage(s) importé(s) dans {args.base}")
+    if ignores:
+        print(f"{len(ignores)} sauvegarde(s) ignorée(s)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+import json
+import re
+
+from registre import registre
+from index_catalogues import indexer, normaliser, CHAMPS_ATTAQUES_MONSTRE
+from elements import affinites, code_element, multiplicateur, appliquer_affinite, NEUTRE
+
+# ===============================================
+# TABLES D'ATTAQUES DES MONSTRES
+# ===============================================
+# Pendant un combat, chaque monstre joue une de ses attaques (attaque1..3 de
+# monstres.json, définies dans attaques.json) : tirage de précision, dégâts
+# selon le type de l'attaque, puis effet éventuel ("poison 3 tours",
+# "initiative +2"...).
+#
+# Les attaques sont compilées une seule fois, quand les catalogues sont
+# chargés : chaque monstre a sa table, un tuple d'attaques compilées, et le
+# texte des effets est déjà traduit en codes. Le combat ne fait plus que lire
+# des tuples et des tables.
+#
+# Attaque compilée : (nom, degats, precision, mode, effet, element)
+#   degats  : dégâts (ou soin) ; pour MODE_JET, (minimum, maximum) du dé
+#   mode    : MODE_REDUIT, MODE_DIRECT, MODE_SOIN, MODE_SANS_DEGATS ou MODE_JET
+#   effet   : None ou (code, sur_lanceur, valeur, duree)
+#   element : code de l'élément (elements.py), pour l'affinité avec la cible
+
+# Façon dont une attaque touche
+MODE_REDUIT = 0        # dégâts diminués par la défense (defense // 2)
+MODE_DIRECT = 1        # dégâts qui ignorent la défense
+MODE_SOIN = 2          # le monstre se soigne de abs(degats), sans dépasser ses PV de départ
+MODE_SANS_DEGATS = 3   # seulement l'effet (bonus...)
+MODE_JET = 4           # dégâts tirés au dé (de minimum à maximum), diminués par la défense
+
+# Type d'attaque (champ 'type') -> mode ; un type inconnu compte comme Physique
+MODES_PAR_TYPE = {
+    'Physique': MODE_REDUIT,
+    'Distance': MODE_REDUIT,
+    'Controle': MODE_REDUIT,
+    'Magique': MODE_DIRECT,
+    'Poison': MODE_DIRECT,
+    'Soin': MODE_SOIN,
+    'Buff': MODE_SANS_DEGATS,
+}
+
+# Codes des effets (indices dans NOMS_EFFETS)
+EFFET_POISON = 0
+EFFET_BRULURE = 1
+EFFET_PARALYSIE = 2
+EFFET_INITIATIVE = 3
+
+NOMS_EFFETS = ('poison', 'brulure', 'paralysie', 'initiative')
+
+# Effets (premier mot du champ 'effet') :
+#   sur_lanceur : l'effet s'applique au monstre lui-même (sinon au personnage)
+#   nombre      : sens du nombre écrit dans l'effet ('duree' ou 'valeur')
+#   valeur      : dégâts par tour ou bonus, si le nombre est la durée
+#   duree       : nombre de tours, si le nombre est la valeur
+EFFETS = {
+    'poison': {'code': EFFET_POISON, 'sur_lanceur': False, 'nombre': 'duree', 'valeur': 1},
+    'brulure': {'code': EFFET_BRULURE, 'sur_lanceur': False, 'nombre': 'duree', 'valeur': 2},
+    'paralysie': {'code': EFFET_PARALYSIE, 'sur_lanceur': False, 'nombre': 'duree', 'valeur': 0},
+    'initiative': {'code': EFFET_INITIATIVE, 'sur_lanceur': True, 'nombre': 'valeur', 'duree': 1},
+}
+
+# Effets qui font perdre des PV au début de chaque tour
+EFFETS_DEGATS_PAR_TOUR = (EFFET_POISON, EFFET_BRULURE)
+
+# "poison 3 tours", "initiative +2", "paralysie 1 tour"
+_FORMAT_EFFET = re.compile(r'^\s*(\w+)\s+([+-]?\d+)(?:\s+tours?)?\s*$')
+
+# Attaque des monstres sans attaque connue (ancienne règle : dé de 2 à 6 dégâts)
+ATTAQUE_DE_BASE = ('Attaque', (2, 6), 100, MODE_JET, None, NEUTRE)
+
+def compiler_effet(texte):
+    """Traduit le texte d'un effet en (code, sur_lanceur, valeur, duree), ou None"""
+    if not texte:
+        return None
+    correspondance = _FORMAT_EFFET.match(texte)
+    if correspondance is None:
+        return None
+    definition = EFFETS.get(normaliser(correspondance.group(1)))
+    if definition is None:
+        return None
+    nombre = int(correspondance.group(2))
+    if definition['nombre'] == 'duree':
+        valeur, duree = definition['valeur'], nombre
+    else:
+        valeur, duree = nombre, definition['duree']
+    if duree <= 0:
+        return None
+    return (definition['code'], definition['sur_lanceur'], valeur, duree)
+
+def compiler_attaque(attaque):
+    """Traduit une attaque du catalogue en attaque compilée"""
+    return (attaque['nom'], abs(attaque.get('degats', 0)), attaque.get('precision', 100),
+            MODES_PAR_TYPE.get(attaque.get('type'), MODE_REDUIT),
+            compiler_effet(attaque.get('effet')), code_element(attaque.get('element')))
+
+# -----------------------------------------------
+# Tables des monstres
+# -----------------------------------------------
+
+# Tables compilées pour les listes actuelles du registre
+_tables = {'monstres': None, 'attaques': None, 'elements': None,
+           'par_nom': {}, 'attaques_compilees': {}}
+
+def _compiler_table(monstre, attaques_compilees):
+    """Retourne la table d'un monstre à partir des attaques compilées (par nom normalisé)"""
+    table = tuple(attaques_compilees[normaliser(monstre[champ])]
+                  for champ in CHAMPS_ATTAQUES_MONSTRE
+                  if monstre.get(champ) and normaliser(monstre[champ]) in attaques_compilees)
+    return table or (ATTAQUE_DE_BASE,)
+
+# Catalogue absent ou illisible (toujours la même liste : pas de recompilation)
+_CATALOGUE_VIDE = []
+
+def _catalogue(nom_fichier):
+    """Retourne un catalogue du registre, ou une liste vide s'il est absent ou illisible"""
+    try:
+        return registre.obtenir(nom_fichier)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return _CATALOGUE_VIDE
+
+def _tables_a_jour():
+    """Retourne les tables compilées, recompilées si un catalogue (ou elements.json) a changé"""
+    monstres = _catalogue('monstres.json')
+    attaques = _catalogue('attaques.json')
+    elements = affinites()
+    if (_tables['monstres'] is not monstres or _tables['attaques'] is not attaques
+            or _tables['elements'] is not elements):
+        compilees = {nom: compiler_attaque(attaque)
+                     for nom, attaque in indexer('attaques', attaques).par_nom.items()}
+        _tables['par_nom'] = {nom: (monstre, _compiler_table(monstre, compilees))
+                              for nom, monstre in indexer('monstres', monstres).par_nom.items()}
+        _tables['attaques_compilees'] = compilees
+        _tables['monstres'] = monstres
+        _tables['attaques'] = attaques
+        _tables['elements'] = elements
+    return _tables
+
+def table_monstre(monstre):
+    """Retourne la table d'attaques compilées d'un monstre (au moins une attaque)
+
+    Un monstre du catalogue a sa table compilée au chargement ; un autre
+    dictionnaire (monstre modifié, généré...) est compilé à la demande.
+    """
+    tables = _tables_a_jour()
+    entree = tables['par_nom'].get(normaliser(monstre['nom']))
+    if entree is not None and entree[0] is monstre:
+        return entree[1]
+    return _compiler_table(monstre, tables['attaques_compilees'])
+
+def preparer_attaques(table, reduction, element_cible=NEUTRE, table_affinites=None):
+    """Retourne la table d'un monstre pour un combat : (nom, valeur, precision, mode, effet)
+
+    valeur est déjà calculée pour ce personnage : dégâts multipliés par
+    l'affinité avec son élément (element_cible, un code), puis diminués par
+    sa défense (au moins 1), PV soignés, ou 0 pour une attaque sans dégâts.
+    Pour MODE_JET, valeur est le tuple des dégâts de chaque jet du dé (du
+    minimum au maximum) : le combat en tire un avec randrange(len(valeur)).
+    table_affinites : affinités déjà obtenues par elements.affinites().
+    """
+    if table_affinites is None:
+        table_affinites = affinites()
+    preparees = []
+    for nom, degats, precision, mode, effet, element in table:
+        if mode == MODE_REDUIT or mode == MODE_DIRECT or mode == MODE_JET:
+            affinite = multiplicateur(element, element_cible, table_affinites)
+        if mode == MODE_REDUIT:
+            valeur = max(1, appliquer_affinite(degats, affinite) - reduction)
+        elif mode == MODE_DIRECT:
+            valeur = max(1, appliquer_affinite(degats, affinite))
+        elif mode == MODE_JET:
+            valeur = tuple(max(1, appliquer_affinite(jet, affinite) - reduction)
+                           for jet in range(degats[0], degats[1] + 1))
+        elif mode == MODE_SOIN:
+            valeur = degats
+        else:
+            valeur = 0
+        preparees.append((nom, valeur, precision, mode, effet))
+    return tuple(preparees)
+
+def initiative_effective(combattant):
+    """Initiative d'un combattant avec son bonus d'initiative en cours"""
+    if combattant.effets:
+        bonus = combattant.effets.get(EFFET_INITIATIVE)
+        if bonus is not None:
+            return combattant.initiative + bonus[0]
+    return combattant.initiative
+
+def user_effets(effets):
+    """Retire un tour à chaque effet en cours (code -> [valeur, tours]) ; les effets finis disparaissent"""
+    for code in list(effets):
+        en_cours = effets[code]
+        en_cours[1] -= 1
+        if en_cours[1] <= 0:
+            del effets[code]